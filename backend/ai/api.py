@@ -1,19 +1,260 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import pandas as pd
-import numpy as np
-from dropout_prediction import DropoutPredictionModel
+from dropout_prediction import DropoutPredictionModel, TRAINING_PROFILES, RISK_LEVELS
+from cascade import CascadePredictor, CASCADE_MARGIN
+from training_jobs import TrainingJobQueue, QueueFullError
+from training_ingest import read_training_stream, STREAMING_TYPES, TrainingDataError
+from score_table import ScoreTableCache
+from model_registry import ModelRegistry, UnknownModelError, artifact_mtime
+from metrics import MetricsRegistry, Gauge, StageTimer, TRAINING_BUCKETS
+from profiling import RequestProfiler, install_profiler
+from drift import population_stability
+from response_formats import (negotiate, encode_msgpack, encode_score_columns, iter_ndjson_results,
+                              RESPONSE_FORMATS)
 import os
+import threading
+import time
+
+# Upper bound on the number of students scored by one /predict/batch request
+MAX_BATCH_SIZE = 10000
+
+# Training jobs waiting behind the running one before /train starts returning 429
+MAX_QUEUED_TRAINING_JOBS = int(os.environ.get('DROPOUT_MAX_QUEUED_JOBS', 4))
+
+# Job state shared by the gunicorn workers, so any worker can report on any training job
+TRAINING_JOBS_DIR = os.environ.get('DROPOUT_JOBS_DIR', 'training_jobs')
+
+# How often a worker checks whether the default model was saved again by another process
+# (a training job in another worker, or a training script) and reloads it
+MODEL_CHECK_SECONDS = float(os.environ.get('DROPOUT_MODEL_CHECK_SECONDS', 5))
+
+# A retrained model below this held-out accuracy is rejected instead of swapped in
+MIN_TRAINING_ACCURACY = float(os.environ.get('DROPOUT_MIN_ACCURACY', 0.5))
+
+# Forest settings for full retraining, 'default' or 'compact' (see TRAINING_PROFILES);
+# a request can override it with ?profile=
+TRAINING_PROFILE = os.environ.get('DROPOUT_TRAINING_PROFILE', 'default')
+
+# Cascade scoring for full retraining (see cascade.py): a logistic regression scores every
+# row and only rows within the margin of a risk-level boundary reach the forest.
+# A request can override it with ?cascade=true|false
+TRAINING_CASCADE = os.environ.get('DROPOUT_CASCADE', '').lower() in ('1', 'true', 'yes')
+TRAINING_CASCADE_MARGIN = float(os.environ.get('DROPOUT_CASCADE_MARGIN', CASCADE_MARGIN))
+
+# Incremental retraining: trees added per update and the cap before the oldest are retired
+INCREMENTAL_NEW_TREES = int(os.environ.get('DROPOUT_INCREMENTAL_TREES', 20))
+INCREMENTAL_MAX_TREES = int(os.environ.get('DROPOUT_MAX_TREES', 300))
+
+# Precomputed score table written by `python score_table.py`, and how old it may get
+# before /at-risk stops serving it
+SCORE_TABLE_PATH = os.environ.get('DROPOUT_SCORE_TABLE', 'dropout_scores')
+SCORE_TABLE_TTL = int(os.environ.get('DROPOUT_SCORE_TTL', 24 * 3600))
+
+# The default model, served when a request does not pick one with ?model=<name>
+DEFAULT_MODEL_PATH = os.environ.get('DROPOUT_MODEL_PATH', 'dropout_model.pkl')
+DEFAULT_MODEL_NAME = os.path.splitext(os.path.basename(DEFAULT_MODEL_PATH.rstrip('/')))[0]
+
+# Other models are looked up in the registry directory, loaded on first use and kept
+# in LRU order within a count and a memory budget (see model_registry.py)
+MODEL_DIR = os.environ.get('DROPOUT_MODEL_DIR', os.path.dirname(DEFAULT_MODEL_PATH) or '.')
+MAX_LOADED_MODELS = int(os.environ.get('DROPOUT_MAX_MODELS', 4))
+MODEL_MEMORY_BUDGET = int(os.environ.get('DROPOUT_MODEL_BUDGET_MB', 1024)) * 1024 * 1024
+
+# Opt-in request profiling (see profiling.py): requests with an X-Profile header holding the
+# token, or the given fraction of all requests, are profiled into DROPOUT_PROFILE_DIR.
+# Unset, nothing is installed; without a token the header is ignored.
+PROFILE_DIR = os.environ.get('DROPOUT_PROFILE_DIR')
+PROFILE_SAMPLE_RATE = float(os.environ.get('DROPOUT_PROFILE_SAMPLE_RATE', 0))
+PROFILE_TOKEN = os.environ.get('DROPOUT_PROFILE_TOKEN')
+
+# Directory shared by the gunicorn workers for their request metrics, so /metrics reports
+# all workers (set by gunicorn.conf.py; unset, /metrics covers this process only)
+METRICS_DIR = os.environ.get('DROPOUT_METRICS_DIR')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Initialize the model
-model = DropoutPredictionModel()
+# Prometheus metrics served at /metrics (summed over the workers sharing METRICS_DIR, see metrics.py)
+metrics = MetricsRegistry(METRICS_DIR)
+REQUESTS = metrics.counter('dropout_api_requests_total', 'Requests handled, by route and status code',
+                           ('endpoint', 'status'))
+REQUEST_SECONDS = metrics.histogram('dropout_api_request_duration_seconds', 'Request latency by route',
+                                    ('endpoint',))
+STAGE_SECONDS = metrics.histogram('dropout_api_stage_duration_seconds',
+                                  'Time spent in each stage of a prediction request', ('endpoint', 'stage'))
+IN_FLIGHT = metrics.gauge('dropout_api_requests_in_flight', 'Requests currently being handled')
+TRAINING_SECONDS = metrics.histogram('dropout_training_duration_seconds', 'Training job duration',
+                                     ('mode', 'status'), buckets=TRAINING_BUCKETS)
+MODEL_INFO = Gauge('dropout_model_info', 'Loaded models; the value is always 1',
+                   ('model', 'version', 'engine', 'default'))
+MODEL_LOAD_SECONDS = Gauge('dropout_model_load_seconds', 'Time it took to load each loaded model',
+                           ('model', 'version'))
+MODEL_TRAINED_AT = Gauge('dropout_model_trained_timestamp_seconds', 'When each loaded model was trained',
+                         ('model', 'version'))
+CASCADE_ROWS = Gauge('dropout_cascade_rows', 'Rows scored by cascade models since they were loaded, '
+                     'by the tier that decided the score', ('model', 'version', 'tier'))
+FEATURE_DRIFT = Gauge('dropout_feature_drift_psi', 'Population stability index of the features seen by this '
+                      'process against the training data (see /drift)', ('model', 'version', 'feature'))
+DRIFT_ROWS = Gauge('dropout_drift_live_rows', 'Rows in the live drift histograms of this process',
+                   ('model', 'version'))
+
+def create_model(model_path=DEFAULT_MODEL_PATH):
+    """Create an empty model configured for this process"""
+    # A .pkl file or a directory artifact, and the 'sklearn' or 'flat' inference engine
+    return DropoutPredictionModel(
+        model_path=model_path,
+        engine=os.environ.get('DROPOUT_ENGINE', 'sklearn')
+    )
+
+def load_serving_model():
+    """Create the model served by this process, load it from disk if it exists and warm it up"""
+    serving_model = create_model()
+    
+    # Load the model if it exists, otherwise it will be trained when data is provided
+    if os.path.exists(serving_model.model_path):
+        serving_model.load_model()
+        serving_model.warm_up()
+    return serving_model
+
+def saved_model_mtime():
+    """Modification time of the saved default model, or None if it was never saved"""
+    try:
+        return artifact_mtime(DEFAULT_MODEL_PATH)
+    except FileNotFoundError:
+        return None
+
+def swap_model(new_model, mtime=None):
+    """Put a fully loaded model into service with a single reference assignment"""
+    global model, model_mtime
+    model_mtime = mtime if mtime is not None else saved_model_mtime()
+    model = new_model
+
+def reload_model():
+    """Reload the model from disk and swap it in"""
+    swap_model(load_serving_model())
+    return model
+
+def select_model():
+    """
+    The model a request picked with ?model=<name>&version=<version>, or the default model
+    Raises UnknownModelError if the registry has no such model or version
+    """
+    name = request.args.get('model', DEFAULT_MODEL_NAME)
+    version = request.args.get('version')
+    if name == DEFAULT_MODEL_NAME and version is None:
+        return model
+    return model_registry.get(name, version)
+
+def wants_explanations():
+    """Predictions include top_reasons unless the request asks for ?explain=false"""
+    # Only scores-only requests go through a cascade model's linear tier; explained ones
+    # are scored by the forest their reasons come from
+    return request.args.get('explain', 'true').lower() not in ('0', 'false', 'no')
+
+# Initialize the model. Under gunicorn (gunicorn.conf.py) this runs once in the
+# master before workers are forked, so all workers share the loaded forest.
+# Handlers read the global once into a local so a hot-swap never changes the
+# model underneath a request that is already running.
+model_mtime = saved_model_mtime()
+model = load_serving_model()
+model_checked_at = time.monotonic()
+model_reload_lock = threading.Lock()
+
+# Retraining happens in the background and swaps the new model in when it validates
+def observe_training_job(job):
+    """Record how long a finished training job ran"""
+    if job.started_at is not None:
+        TRAINING_SECONDS.observe(job.finished_at - job.started_at, job.mode, job.status)
+
+training_jobs = TrainingJobQueue(create_model, swap_model,
+                                 max_queued=MAX_QUEUED_TRAINING_JOBS,
+                                 min_accuracy=MIN_TRAINING_ACCURACY,
+                                 on_finished=observe_training_job,
+                                 jobs_dir=TRAINING_JOBS_DIR)
 
-# Load the model if it exists, otherwise it will be trained when data is provided
-if os.path.exists('dropout_model.pkl'):
-    model.load_model()
+# Models picked per request with ?model= are loaded lazily and evicted least recently used first
+model_registry = ModelRegistry(MODEL_DIR, create_model,
+                               max_models=MAX_LOADED_MODELS, max_bytes=MODEL_MEMORY_BUDGET)
+
+# At-risk queries are answered from the newest score table without running the model
+score_tables = ScoreTableCache(SCORE_TABLE_PATH)
+
+def collect_model_metrics():
+    """Describe the default model and every registry model currently loaded"""
+    served = [(DEFAULT_MODEL_NAME, model, 'true')]
+    with model_registry.lock:
+        served += [(name, entry['model'], 'false') for (name, _), entry in model_registry.loaded.items()]
+    
+    info, load_seconds, trained_at, cascade_rows, drift, drift_rows = {}, {}, {}, {}, {}, {}
+    for name, serving_model, is_default in served:
+        snapshot = serving_model.snapshot
+        if snapshot is None:
+            continue
+        version = snapshot.trained_at.isoformat() if snapshot.trained_at else ''
+        info[(name, version, serving_model.engine, is_default)] = 1
+        if serving_model.load_seconds is not None:
+            load_seconds[(name, version)] = serving_model.load_seconds
+        if snapshot.trained_at:
+            trained_at[(name, version)] = snapshot.trained_at.timestamp()
+        predictor = snapshot.predictor
+        if isinstance(predictor, CascadePredictor):
+            cascade_rows[(name, version, 'linear')] = predictor.rows_scored - predictor.rows_forwarded
+            cascade_rows[(name, version, 'forest')] = predictor.rows_forwarded
+        if snapshot.drift is not None:
+            live = snapshot.drift.live()
+            drift_rows[(name, version)] = live.n_rows
+            for feature, psi in zip(live.features, population_stability(snapshot.drift.reference, live)):
+                drift[(name, version, feature)] = float(psi)
+    return [(MODEL_INFO, info), (MODEL_LOAD_SECONDS, load_seconds), (MODEL_TRAINED_AT, trained_at),
+            (CASCADE_ROWS, cascade_rows), (FEATURE_DRIFT, drift), (DRIFT_ROWS, drift_rows)]
+
+metrics.add_collector(collect_model_metrics)
+
+def observe_stages(endpoint, timer):
+    """Record the stage durations of one prediction request"""
+    for stage, seconds in timer.durations.items():
+        STAGE_SECONDS.observe(seconds, endpoint, stage)
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    IN_FLIGHT.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    # Label by route pattern (/train/jobs/<job_id>), not by path, to keep the series bounded
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUESTS.inc(endpoint, str(response.status_code))
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, endpoint)
+    metrics.maybe_flush()
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    IN_FLIGHT.dec()
+
+@app.before_request
+def reload_saved_model():
+    """Swap in the default model when another process has saved a new one"""
+    global model_checked_at
+    now = time.monotonic()
+    if now - model_checked_at < MODEL_CHECK_SECONDS:
+        return
+    model_checked_at = now
+    mtime = saved_model_mtime()
+    # One request reloads; the others keep being served by the current model meanwhile
+    if mtime is None or mtime == model_mtime or not model_reload_lock.acquire(blocking=False):
+        return
+    try:
+        swap_model(load_serving_model(), mtime)
+        print(f"Reloaded the model saved to {DEFAULT_MODEL_PATH}")
+    except Exception as e:
+        print(f"Could not reload the model from {DEFAULT_MODEL_PATH}: {e}")
+    finally:
+        model_reload_lock.release()
+
+if PROFILE_DIR:
+    install_profiler(app, RequestProfiler(PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_TOKEN))
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -23,29 +264,132 @@ def health_check():
         'message': 'Dropout Prediction API is running'
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check: 200 once a trained model is loaded and warmed up"""
+    serving_model = model
+    if not serving_model.ready:
+        return jsonify({
+            'status': 'not_ready',
+            'message': 'Model not trained yet' if serving_model.model is None else 'Model is warming up'
+        }), 503
+    
+    return jsonify({
+        'status': 'ready',
+        'model_path': serving_model.model_path,
+        'engine': serving_model.engine
+    })
+
 @app.route('/predict', methods=['POST'])
 def predict_dropout():
     """Predict dropout risk for a student"""
     try:
+        timer = StageTimer()
+        
         # Get student data from request
         student_data = request.json
+        timer.mark('parse')
         
-        # Validate required fields
-        required_fields = ['attendance', 'cgpa', 'backlogs', 'assignments_submitted', 'pending_fee_ratio']
-        for field in required_fields:
-            if field not in student_data:
-                return jsonify({
-                    'error': f'Missing required field: {field}'
-                }), 400
+        # Same checks as every row of /predict/batch: required fields present and numeric
+        serving_model = select_model()
+        error = serving_model.validate_student_data(student_data)
+        if error:
+            return jsonify({
+                'error': error
+            }), 400
+        timer.mark('validate')
         
-        # Make prediction
-        result = model.predict_dropout_risk(student_data)
+        # Make prediction; the model adds its preprocess, predict_proba and top_reasons stages
+        result = serving_model.predict_dropout_risk(student_data, explain=wants_explanations(),
+                                                    timings=timer.durations)
+        timer.skip()
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'data': result
         })
+        timer.mark('serialize')
+        observe_stages('/predict', timer)
+        return response
+        
+    except UnknownModelError as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_dropout_batch():
+    """
+    Predict dropout risk for many students in one request
+    The Accept header picks JSON (default), NDJSON, MessagePack or columnar binary results
+    (see response_formats.py)
+    """
+    try:
+        timer = StageTimer()
+        response_format = negotiate(request.accept_mimetypes)
+        if response_format is None:
+            return jsonify({
+                'error': 'Not acceptable; results are available as ' +
+                         ', '.join(types[0] for types in RESPONSE_FORMATS.values())
+            }), 406
+        
+        # Accept either a bare list of students or {"students": [...]}
+        payload = request.json
+        timer.mark('parse')
+        students = payload.get('students') if isinstance(payload, dict) else payload
+        
+        if not isinstance(students, list):
+            return jsonify({
+                'error': 'Request body must be a list of students or an object with a "students" list'
+            }), 400
+        
+        if len(students) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f'Batch too large: {len(students)} students (maximum is {MAX_BATCH_SIZE})'
+            }), 400
+        
+        # Invalid rows are reported individually instead of failing the batch; the model
+        # adds its validate, preprocess, predict_proba and top_reasons stages
+        serving_model = select_model()
+        explain = wants_explanations()
+        mimetype = RESPONSE_FORMATS[response_format][0]
         
+        if response_format == 'ndjson':
+            # Rows are scored and written chunk by chunk; stages are recorded once the stream ends
+            def stream_results():
+                yield from iter_ndjson_results(serving_model, students, explain, timer.durations)
+                observe_stages('/predict/batch', timer)
+            return Response(stream_results(), mimetype=mimetype)
+        
+        if response_format == 'columnar':
+            scores = serving_model.score_records(students, explain, timer.durations)
+            timer.skip()
+            response = Response(encode_score_columns(scores), mimetype=mimetype)
+        else:
+            results = serving_model.predict_dropout_risk_batch(students, explain=explain,
+                                                               timings=timer.durations)
+            timer.skip()
+            payload = {
+                'success': True,
+                'data': results,
+                'count': len(results)
+            }
+            if response_format == 'msgpack':
+                response = Response(encode_msgpack(payload), mimetype=mimetype)
+            else:
+                response = jsonify(payload)
+        timer.mark('serialize')
+        observe_stages('/predict/batch', timer)
+        return response
+        
+    except UnknownModelError as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
     except Exception as e:
         return jsonify({
             'error': str(e)
@@ -53,28 +397,155 @@ def predict_dropout():
 
 @app.route('/train', methods=['POST'])
 def train_model():
-    """Train the model with provided data"""
+    """
+    Queue a background training job with the provided data
+    The body is a JSON list of rows, or a streamed NDJSON, CSV or columnar binary
+    upload selected by Content-Type (see training_ingest.py). Returns 202 with a job id; poll /train/jobs/<job_id> for progress.
+    Pass ?mode=incremental to add trees fitted on just these records to the current
+    model instead of refitting, ?profile=compact to refit a compact forest, ?cascade=true
+    to fit the cascade's linear model with it, and ?wait=true to block until the job has finished.
+    """
     try:
-        # Get training data from request
-        training_data = request.json
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(training_data)
+        if request.mimetype in STREAMING_TYPES:
+            # NDJSON, CSV or columnar binary: parsed in chunks straight into column buffers
+            try:
+                df = read_training_stream(request.stream, request.mimetype)
+            except TrainingDataError as e:
+                return jsonify({
+                    'error': str(e)
+                }), 400
+        else:
+            import pandas as pd
+            
+            # Get training data from request
+            training_data = request.json
+            
+            # Convert to DataFrame
+            df = pd.DataFrame(training_data)
+            
+            # Validate required columns
+            required_columns = ['attendance', 'cgpa', 'backlogs', 'assignments_submitted', 'pending_fee_ratio', 'dropout']
+            for column in required_columns:
+                if column not in df.columns:
+                    return jsonify({
+                        'error': f'Missing required column: {column}'
+                    }), 400
         
-        # Validate required columns
-        required_columns = ['attendance', 'cgpa', 'backlogs', 'assignments_submitted', 'pending_fee_ratio', 'dropout']
-        for column in required_columns:
-            if column not in df.columns:
+        mode = request.args.get('mode', 'full')
+        if mode not in ('full', 'incremental'):
+            return jsonify({
+                'error': f"Unknown training mode '{mode}', expected 'full' or 'incremental'"
+            }), 400
+        if mode == 'incremental':
+            options = {'n_new_trees': INCREMENTAL_NEW_TREES, 'max_trees': INCREMENTAL_MAX_TREES}
+        else:
+            profile = request.args.get('profile', TRAINING_PROFILE)
+            if profile not in TRAINING_PROFILES:
                 return jsonify({
-                    'error': f'Missing required column: {column}'
+                    'error': f"Unknown training profile '{profile}', expected one of {', '.join(TRAINING_PROFILES)}"
                 }), 400
+            cascade = request.args.get('cascade')
+            if cascade is None:
+                cascade = TRAINING_CASCADE
+            else:
+                cascade = cascade.lower() in ('1', 'true', 'yes')
+            options = {'profile': profile, 'cascade': cascade, 'cascade_margin': TRAINING_CASCADE_MARGIN}
         
-        # Train model
-        model.train_model(df)
+        # Train in the background; the serving model is swapped only after validation
+        try:
+            job = training_jobs.submit(df, mode, options)
+        except QueueFullError as e:
+            return jsonify({
+                'error': str(e)
+            }), 429
+        
+        if request.args.get('wait', '').lower() in ('1', 'true', 'yes'):
+            job = training_jobs.wait(job.id)
+            if job.status == 'failed':
+                return jsonify({
+                    'error': job.error,
+                    'job': job.to_dict()
+                }), 500
+            return jsonify({
+                'success': True,
+                'message': 'Model trained successfully',
+                'job': job.to_dict()
+            })
         
         return jsonify({
             'success': True,
-            'message': 'Model trained successfully'
+            'message': 'Training job queued',
+            'job': job.to_dict(),
+            'status_url': f'/train/jobs/{job.id}'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@app.route('/train/jobs', methods=['GET'])
+def list_training_jobs():
+    """List recent training jobs, newest first"""
+    jobs = [job.to_dict() for job in reversed(training_jobs.list())]
+    return jsonify({
+        'success': True,
+        'data': jobs,
+        'count': len(jobs)
+    })
+
+@app.route('/train/jobs/<job_id>', methods=['GET'])
+def get_training_job(job_id):
+    """Get the status and progress of a training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'error': f'Training job not found: {job_id}'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': job.to_dict()
+    })
+
+@app.route('/at-risk', methods=['GET'])
+def get_at_risk_students():
+    """
+    At-risk students from the precomputed score table, highest risk first
+    ?level=High,Medium (default) selects levels and ?limit=N caps the result.
+    Returns 503 if no table exists or it is older than DROPOUT_SCORE_TTL seconds.
+    """
+    try:
+        levels = [level.strip().title() for level in request.args.get('level', 'High,Medium').split(',')]
+        unknown = [level for level in levels if level not in RISK_LEVELS]
+        if unknown:
+            return jsonify({
+                'error': f"Unknown risk level '{unknown[0]}', expected one of {', '.join(RISK_LEVELS)}"
+            }), 400
+        limit = request.args.get('limit', type=int)
+        
+        table = score_tables.get()
+        if table is None:
+            return jsonify({
+                'error': 'No score table yet; run score_table.py to precompute risk scores'
+            }), 503
+        if not table.is_fresh(SCORE_TABLE_TTL):
+            return jsonify({
+                'error': f'Score table is stale ({table.age_seconds():.0f}s old, TTL {SCORE_TABLE_TTL}s)',
+                'table': table.info(SCORE_TABLE_TTL)
+            }), 503
+        
+        students = table.at_risk(levels, limit)
+        serving_model = model
+        table_info = table.info(SCORE_TABLE_TTL)
+        table_info['model_current'] = table_info['model_version'] == (
+            serving_model.trained_at.isoformat() if serving_model.trained_at else None)
+        
+        return jsonify({
+            'success': True,
+            'data': students,
+            'count': len(students),
+            'table': table_info
         })
         
     except Exception as e:
@@ -82,22 +553,76 @@ def train_model():
             'error': str(e)
         }), 500
 
+@app.route('/models', methods=['GET'])
+def list_models():
+    """List the models that can be picked with ?model=<name>&version=<version>, and which are loaded"""
+    registry_info = model_registry.info()
+    return jsonify({
+        'success': True,
+        'default_model': DEFAULT_MODEL_NAME,
+        'data': registry_info['models'],
+        'registry': {key: value for key, value in registry_info.items() if key != 'models'}
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, stage, training and model metrics in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/feature-importance', methods=['GET'])
 def get_feature_importance():
     """Get feature importance from the trained model"""
     try:
-        if model.model is None:
+        serving_model = select_model()
+        if serving_model.model is None:
             return jsonify({
                 'error': 'Model not trained yet'
             }), 400
             
-        importance = model.get_feature_importance()
+        importance = serving_model.get_feature_importance()
         
         return jsonify({
             'success': True,
             'data': importance
         })
         
+    except UnknownModelError as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@app.route('/drift', methods=['GET'])
+def get_feature_drift():
+    """
+    Drift of the features seen by predictions against the model's training data
+    Merges the live counts of every worker sharing DROPOUT_DRIFT_DIR (see drift.py)
+    """
+    try:
+        serving_model = select_model()
+        if serving_model.model is None:
+            return jsonify({
+                'error': 'Model not trained yet'
+            }), 400
+        
+        report = serving_model.drift_report()
+        if report is None:
+            return jsonify({
+                'error': 'Model has no drift reference; retrain it to enable drift monitoring'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': report
+        })
+        
+    except UnknownModelError as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
     except Exception as e:
         return jsonify({
             'error': str(e)
@@ -0,0 +1,396 @@
+"""
+Reproducible micro-benchmarks for the dropout prediction library
+
+    python benchmark_suite.py --output bench.json
+    python benchmark_suite.py --quick --output new.json --compare bench.json
+
+Covers single-row predict_dropout_risk latency, predict_dropout_risk_batch throughput,
+preprocess_data cost, train_model time and peak resident memory against n_samples, and
+save_model/load_model time and artifact size for both artifact formats. All data comes
+from generate_sample_data (seeded) and training uses a fixed random_state, so two runs
+on the same machine measure the same work.
+
+Results are written as JSON together with the commit, library versions and machine, so
+files from different commits can be compared. --compare prints every metric against a
+baseline file and exits with status 1 if one got worse by more than --tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from feature_transform import RAW_FEATURES
+from model_artifact import current_artifact_dir
+
+BENCHMARK_FORMAT_VERSION = 1
+
+# Sizes for a full run and for --quick (CI, pre-commit)
+FULL_SIZES = {
+    'latency_runs': 2000,
+    'batch_sizes': [1, 10, 100, 1000, 10000],
+    'preprocess_sizes': [1000, 10000, 100000],
+    'train_sizes': [1000, 10000, 50000],
+    'persistence_train_size': 2000
+}
+QUICK_SIZES = {
+    'latency_runs': 300,
+    'batch_sizes': [1, 100, 1000],
+    'preprocess_sizes': [1000, 10000],
+    'train_sizes': [1000, 5000],
+    'persistence_train_size': 2000
+}
+
+# Metric name suffixes where a larger value is better; every other metric is a cost
+HIGHER_IS_BETTER = ('_per_second',)
+
+# Timings below this many seconds are too noisy to count as regressions
+NOISE_FLOOR_SECONDS = 0.001
+
+# Timing metric name suffixes and their unit in seconds
+TIME_UNITS = {'_seconds': 1.0, '_ms': 0.001}
+
+BENCH_DIR = 'benchmark_artifacts'
+
+def best_of(function, repeats):
+    """
+    Smallest wall-clock time of repeats calls to function(), in seconds
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def quietly(function, *args, **kwargs):
+    """
+    Call function with its progress prints (training reports, save/load messages) discarded
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+def train_benchmark_model(n_samples, engine='sklearn'):
+    """
+    A model trained on generate_sample_data(n_samples), without saving it
+    """
+    model = DropoutPredictionModel(os.path.join(BENCH_DIR, 'model.pkl'), engine=engine)
+    quietly(model.train_model, generate_sample_data(n_samples), save=False)
+    return model
+
+def bench_single_latency(model, n_runs):
+    """
+    Per-call latency percentiles of predict_dropout_risk for one student, in ms
+    """
+    records = generate_sample_data(n_runs)[RAW_FEATURES].to_dict('records')
+    results = {}
+    for label, explain in (('explained', True), ('scores_only', False)):
+        for record in records[:50]:
+            model.predict_dropout_risk(record, explain=explain)
+        timings = np.empty(n_runs)
+        for i, record in enumerate(records):
+            start = time.perf_counter()
+            model.predict_dropout_risk(record, explain=explain)
+            timings[i] = time.perf_counter() - start
+        timings *= 1000
+        results[label] = {
+            'p50_ms': float(np.percentile(timings, 50)),
+            'p95_ms': float(np.percentile(timings, 95)),
+            'p99_ms': float(np.percentile(timings, 99)),
+            'mean_ms': float(timings.mean())
+        }
+    return results
+
+def bench_batch_throughput(model, batch_sizes):
+    """
+    predict_dropout_risk_batch time and rows per second at each batch size
+    """
+    results = {}
+    for batch_size in batch_sizes:
+        records = generate_sample_data(batch_size)[RAW_FEATURES].to_dict('records')
+        repeats = max(3, min(50, 10000 // batch_size))
+        entry = {}
+        for label, explain in (('explained', True), ('scores_only', False)):
+            seconds = best_of(lambda: model.predict_dropout_risk_batch(records, explain=explain), repeats)
+            entry[f'{label}_seconds'] = seconds
+            entry[f'{label}_rows_per_second'] = batch_size / seconds
+        results[str(batch_size)] = entry
+    return results
+
+def bench_preprocess(sizes):
+    """
+    preprocess_data time when fitting and when reusing the fitted transform
+    """
+    results = {}
+    for n_samples in sizes:
+        data = generate_sample_data(n_samples)
+        model = DropoutPredictionModel()
+        fit_seconds = best_of(lambda: model.preprocess_data(data.copy(), fit=True), 3)
+        transform_seconds = best_of(lambda: model.preprocess_data(data.copy(), fit=False), 3)
+        results[str(n_samples)] = {
+            'fit_seconds': fit_seconds,
+            'transform_seconds': transform_seconds,
+            'fit_rows_per_second': n_samples / fit_seconds
+        }
+    return results
+
+def current_rss_mb():
+    """
+    Resident memory of this process right now, or None where /proc is not available
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        return None
+
+def measure_training(n_samples):
+    """
+    Train on generate_sample_data(n_samples) and return time and memory
+    Runs in a fresh process (see bench_training). peak_rss_mb is the process high-water
+    mark, imports included; on Linux the resident memory is also sampled every few ms
+    while training, giving how far training itself raised it.
+    """
+    import resource
+    import threading
+
+    data = generate_sample_data(n_samples)
+    model = DropoutPredictionModel()
+    # Import the training stack before taking the baseline
+    quietly(model.preprocess_data, data.head(10).copy())
+
+    baseline = current_rss_mb()
+    samples = []
+    done = threading.Event()
+    def sample():
+        while not done.wait(0.005):
+            samples.append(current_rss_mb())
+    sampler = threading.Thread(target=sample, daemon=True)
+    if baseline is not None:
+        sampler.start()
+
+    start = time.perf_counter()
+    quietly(model.train_model, data, save=False)
+    seconds = time.perf_counter() - start
+    done.set()
+    if baseline is not None:
+        sampler.join()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    peak_rss_mb = peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+    return {
+        'train_seconds': seconds,
+        'fit_seconds': model.training_metrics['fit_seconds'],
+        'peak_rss_mb': peak_rss_mb,
+        'training_rss_increase_mb': max(samples + [baseline]) - baseline if baseline is not None else None,
+        'accuracy': model.training_metrics['accuracy']
+    }
+
+def bench_training(sizes):
+    """
+    train_model wall time and peak memory per n_samples, each in its own process
+    sklearn builds trees in C, outside tracemalloc's view, so memory is read from the OS
+    """
+    import multiprocessing
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for n_samples in sizes:
+        with context.Pool(1) as pool:
+            results[str(n_samples)] = pool.apply(measure_training, (n_samples,))
+    return results
+
+def artifact_size(path):
+    """
+    Bytes on disk of a .pkl file or of the current version of a directory artifact
+    """
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(current_artifact_dir(path)) for name in names)
+    return os.path.getsize(path)
+
+def bench_persistence(model):
+    """
+    save_model and load_model time and artifact size for the .pkl and directory formats
+    """
+    results = {}
+    for label, filename in (('pkl', 'model.pkl'), ('directory', 'model_artifact')):
+        path = os.path.join(BENCH_DIR, filename)
+        model.model_path = path
+        save_seconds = best_of(lambda: quietly(model.save_model), 5)
+
+        loaded = DropoutPredictionModel(path, engine='flat' if label == 'directory' else 'sklearn')
+        load_seconds = best_of(lambda: quietly(loaded.load_model), 5)
+        results[label] = {
+            'save_seconds': save_seconds,
+            'load_seconds': load_seconds,
+            'artifact_bytes': artifact_size(path)
+        }
+    return results
+
+def git_commit():
+    """
+    Commit the benchmark ran on, or None outside a git checkout
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment_info(quick):
+    import pandas as pd
+    import sklearn
+
+    return {
+        'format_version': BENCHMARK_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'quick': quick,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+def run_suite(quick=False):
+    """
+    Run every benchmark and return {'environment': ..., 'results': ...}
+    """
+    sizes = QUICK_SIZES if quick else FULL_SIZES
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    results = {}
+    try:
+        print("Training the benchmark model...")
+        model = train_benchmark_model(sizes['persistence_train_size'])
+        flat_model = train_benchmark_model(sizes['persistence_train_size'], engine='flat')
+
+        print("Single-row latency...")
+        results['single_latency'] = {
+            'sklearn': bench_single_latency(model, sizes['latency_runs']),
+            'flat': bench_single_latency(flat_model, sizes['latency_runs'])
+        }
+        print("Batch throughput...")
+        results['batch'] = bench_batch_throughput(model, sizes['batch_sizes'])
+        print("Preprocessing...")
+        results['preprocess'] = bench_preprocess(sizes['preprocess_sizes'])
+        print("Training...")
+        results['training'] = bench_training(sizes['train_sizes'])
+        print("Save and load...")
+        results['persistence'] = bench_persistence(model)
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+    return {'environment': environment_info(quick), 'results': results}
+
+def flatten(results, prefix=''):
+    """
+    Nested result dicts as {'section.case.metric': value}
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def below_noise_floor(metric, value):
+    """
+    True if metric is a timing and value, converted to seconds, is under NOISE_FLOOR_SECONDS
+    """
+    for suffix, unit in TIME_UNITS.items():
+        if metric.endswith(suffix):
+            return value * unit < NOISE_FLOOR_SECONDS
+    return False
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Compare two benchmark result files metric by metric
+    Returns a list of (metric, baseline value, current value, change, regressed)
+    Accuracy is reported but never counts as a regression; it is not a performance metric.
+    Neither do timings (in any of TIME_UNITS) that stay under NOISE_FLOOR_SECONDS.
+    """
+    current_metrics = flatten(current['results'])
+    baseline_metrics = flatten(baseline['results'])
+    rows = []
+    for metric in sorted(set(current_metrics) & set(baseline_metrics)):
+        old, new = baseline_metrics[metric], current_metrics[metric]
+        if old is None or new is None or old == 0:
+            continue
+        change = (new - old) / old
+        if metric.endswith('accuracy'):
+            regressed = False
+        elif below_noise_floor(metric, max(old, new)):
+            regressed = False
+        elif metric.endswith(HIGHER_IS_BETTER):
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance
+        rows.append((metric, old, new, change, regressed))
+    return rows
+
+def print_summary(report):
+    results = report['results']
+    print(f"\nCommit {report['environment']['git_commit']}, {report['environment']['processor']}, "
+          f"{report['environment']['cpu_count']} CPUs")
+    print("\nSingle-row predict_dropout_risk (p50 / p99 ms)")
+    for engine, cases in results['single_latency'].items():
+        print(f"  {engine:8s} explained {cases['explained']['p50_ms']:.3f} / {cases['explained']['p99_ms']:.3f}"
+              f"   scores only {cases['scores_only']['p50_ms']:.3f} / {cases['scores_only']['p99_ms']:.3f}")
+    print("\nBatch throughput (rows/s, explained / scores only)")
+    for size, entry in results['batch'].items():
+        print(f"  {size:>6}  {entry['explained_rows_per_second']:>10.0f} / {entry['scores_only_rows_per_second']:.0f}")
+    print("\npreprocess_data (fit / transform seconds)")
+    for size, entry in results['preprocess'].items():
+        print(f"  {size:>6}  {entry['fit_seconds']:.4f} / {entry['transform_seconds']:.4f}")
+    print("\ntrain_model (seconds, peak MB)")
+    for size, entry in results['training'].items():
+        increase = entry['training_rss_increase_mb']
+        print(f"  {size:>6}  {entry['train_seconds']:.2f}s  {entry['peak_rss_mb']:.0f} MB"
+              + (f" (+{increase:.0f} MB while training)" if increase is not None else ''))
+    print("\nsave_model / load_model (seconds, size)")
+    for label, entry in results['persistence'].items():
+        print(f"  {label:9s} save {entry['save_seconds']:.3f}s  load {entry['load_seconds']:.3f}s"
+              f"  {entry['artifact_bytes'] / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the dropout prediction micro-benchmarks')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file to write results to')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes, for CI or a quick check')
+    parser.add_argument('--compare', help='baseline results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative change that counts as a regression (default 0.2)')
+    args = parser.parse_args()
+
+    report = run_suite(args.quick)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_summary(report)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        print(f"\nAgainst {args.compare} (commit {baseline['environment'].get('git_commit')}):")
+        for metric, old, new, change, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"  {metric:55s} {old:>12.4g} -> {new:<12.4g} {change:+7.1%}{flag}")
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
@@ -0,0 +1,110 @@
+"""
+Two-tier cascade scoring: a logistic regression first, the forest only near a boundary
+
+Most students are far from the risk-level boundaries (RISK_BOUNDARIES in dropout_prediction), where a linear model and
+the forest agree on the level. The cascade scores every row with the logistic regression
+(one dot product) and sends only rows whose linear score lies within margin of a boundary
+on to the forest, whose score is then returned instead. Rows decided by the linear model
+get its calibrated probability as their risk score.
+
+The logistic regression is fitted in train_model next to the forest (cascade=True) and
+stored with the model as its coefficients, so it adds a few bytes to either artifact.
+"""
+import threading
+import time
+import numpy as np
+
+# Rows whose linear score is within this distance of a boundary are scored by the forest
+CASCADE_MARGIN = 0.05
+
+class LinearScorer:
+    """
+    Logistic regression kept as plain coefficients, scored like predict_proba
+    """
+    def __init__(self, coef, intercept, classes):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def fit(cls, X, y):
+        from sklearn.linear_model import LogisticRegression
+        regression = LogisticRegression(max_iter=1000).fit(X, y)
+        return cls(regression.coef_[0], regression.intercept_[0], regression.classes_)
+
+    def positive_proba(self, X):
+        return 1.0 / (1.0 + np.exp(-(np.asarray(X) @ self.coef + self.intercept)))
+
+    def predict_proba(self, X):
+        positive = self.positive_proba(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def to_dict(self):
+        return {'coef': self.coef.tolist(), 'intercept': self.intercept, 'classes': self.classes_.tolist()}
+
+    @classmethod
+    def from_dict(cls, params):
+        return cls(params['coef'], params['intercept'], params['classes'])
+
+class CascadePredictor:
+    """
+    predict_proba through the linear model, falling back to forest for uncertain rows
+    Counts rows scored and rows forwarded to the forest since it was built.
+    """
+    def __init__(self, linear, forest, boundaries, margin=CASCADE_MARGIN):
+        self.linear = linear
+        self.forest = forest
+        self.margin = margin
+        self.boundaries = np.asarray(boundaries, dtype=np.float64)
+        self.classes_ = forest.classes_
+        self.rows_scored = 0
+        self.rows_forwarded = 0
+        self.lock = threading.Lock()
+
+    def uncertain(self, scores):
+        """
+        True for the scores within margin of a risk-level boundary
+        """
+        return (np.abs(scores[:, None] - self.boundaries[None, :]) < self.margin).any(axis=1)
+
+    def predict_proba(self, X):
+        scores = self.linear.positive_proba(X)
+        forward = self.uncertain(scores)
+        n_forwarded = int(np.count_nonzero(forward))
+        if n_forwarded:
+            scores[forward] = self.forest.predict_proba(X[forward])[:, 1]
+        with self.lock:
+            self.rows_scored += len(scores)
+            self.rows_forwarded += n_forwarded
+        return np.column_stack([1.0 - scores, scores])
+
+def evaluate_cascade(cascade, X, repeats=3):
+    """
+    Pass-through rate, risk-level agreement with the forest alone, and speedup on X
+    """
+    forest_scores = cascade.forest.predict_proba(X)[:, 1]
+    linear_scores = cascade.linear.positive_proba(X)
+    forward = cascade.uncertain(linear_scores)
+    cascade_scores = np.where(forward, forest_scores, linear_scores)
+
+    def best_of(predictor):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predictor.predict_proba(X)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    # Timed on a fresh cascade so the serving counters are not touched
+    timing_cascade = CascadePredictor(cascade.linear, cascade.forest, cascade.boundaries, cascade.margin)
+    forest_seconds = best_of(cascade.forest)
+    cascade_seconds = best_of(timing_cascade)
+    return {
+        'margin': cascade.margin,
+        'pass_through_rate': float(forward.mean()),
+        'level_agreement': float((np.searchsorted(cascade.boundaries, cascade_scores, side='right') ==
+                                  np.searchsorted(cascade.boundaries, forest_scores, side='right')).mean()),
+        'forest_seconds': forest_seconds,
+        'cascade_seconds': cascade_seconds,
+        'speedup': forest_seconds / cascade_seconds
+    }
@@ -0,0 +1,127 @@
+"""
+Out-of-core training from chunked sources larger than memory
+
+    python chunked_training.py --ndjson students.ndjson --output dropout_model
+    python chunked_training.py --csv students.csv --chunk-rows 100000 --trees-per-chunk 5
+    python chunked_training.py --parts synthetic_5m        # written by synthetic_data.py
+
+DropoutPredictionModel.train_model_chunked consumes any iterable of chunks, where a chunk
+is a DataFrame or a {column: array} dict with the training columns: training_ingest's
+iter_training_chunks for NDJSON/CSV files, feature_store's iter_feature_store for MongoDB
+(see fetch_and_train_from_mongodb.py --out-of-core) or synthetic_data's iter_dataset.
+
+Each chunk is split into training and validation rows as it arrives. The forest grows by
+trees_per_chunk trees fitted on the chunk's training rows (sklearn warm_start, as in
+update_model), and validation rows are kept in a fixed-size uniform reservoir sample, so
+memory is bounded by one chunk plus the reservoir plus the forest itself. Once the forest
+holds max_trees trees it is thinned the same way: it keeps a uniform sample of all trees
+fitted so far, so every chunk stays represented and the forest stops growing.
+"""
+import numpy as np
+from feature_transform import RAW_FEATURES
+
+# Trees added to the forest for every chunk
+TREES_PER_CHUNK = 10
+
+# Trees kept in the forest; beyond this it keeps a uniform sample of all trees fitted
+MAX_TREES = 300
+
+# Fraction of every chunk held out for validation
+VALIDATION_FRACTION = 0.2
+
+# Validation rows kept; beyond this the reservoir keeps a uniform sample of all held-out rows
+MAX_VALIDATION_ROWS = 100000
+
+def chunk_arrays(chunk):
+    """
+    Raw feature matrix and dropout labels of one chunk (DataFrame or {column: array})
+    """
+    raw = np.column_stack([np.asarray(chunk[column], dtype=np.float64) for column in RAW_FEATURES])
+    return raw, np.asarray(chunk['dropout']).astype(np.int64)
+
+def thin_forest(forest, n_fitted, max_trees, rng):
+    """
+    Keep a uniform sample of max_trees out of the n_fitted trees fitted so far
+    forest.estimators_ holds the kept trees followed by the ones just fitted. As in
+    ValidationReservoir, tree number i beyond max_trees replaces a random kept tree with
+    probability max_trees / (i + 1). Returns the number of trees dropped.
+    """
+    if len(forest.estimators_) <= max_trees:
+        return 0
+    kept, new = list(forest.estimators_[:max_trees]), forest.estimators_[max_trees:]
+    positions = np.arange(n_fitted - len(new), n_fitted)
+    slots = (rng.random(len(new)) * (positions + 1)).astype(np.int64)
+    for tree, slot in zip(new, slots):
+        if slot < max_trees:
+            kept[slot] = tree
+    forest.estimators_ = kept
+    forest.n_estimators = len(kept)
+    return len(new)
+
+class ValidationReservoir:
+    """
+    Uniform sample of at most capacity rows out of every row added (reservoir sampling)
+    """
+    def __init__(self, n_features, capacity=MAX_VALIDATION_ROWS, seed=42):
+        self.X = np.empty((capacity, n_features), dtype=np.float64)
+        self.y = np.empty(capacity, dtype=np.int64)
+        self.capacity = capacity
+        self.n_seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, X, y):
+        # Rows fill the free slots first; after that row number i replaces a random slot
+        # with probability capacity / (i + 1). When two rows of one chunk pick the same
+        # slot, the later one wins, as it would row by row.
+        n_free = max(0, min(len(X), self.capacity - self.n_seen))
+        start = self.n_seen
+        self.X[start:start + n_free] = X[:n_free]
+        self.y[start:start + n_free] = y[:n_free]
+
+        positions = np.arange(start + n_free, start + len(X))
+        slots = (self.rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+        keep = slots < self.capacity
+        self.X[slots[keep]] = X[n_free:][keep]
+        self.y[slots[keep]] = y[n_free:][keep]
+        self.n_seen += len(X)
+
+    def arrays(self):
+        n = min(self.n_seen, self.capacity)
+        return self.X[:n], self.y[:n]
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from dropout_prediction import DropoutPredictionModel, TRAINING_PROFILES
+    from training_ingest import iter_training_chunks, CHUNK_ROWS, NDJSON_TYPES, CSV_TYPES
+
+    parser = argparse.ArgumentParser(description='Train the dropout model from data larger than memory')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--ndjson', help='NDJSON file with one student per line')
+    source.add_argument('--csv', help='CSV file with a header row')
+    source.add_argument('--parts', help='directory of part files written by synthetic_data.py')
+    parser.add_argument('--output', default='dropout_model.pkl', help='model path (.pkl or directory artifact)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--trees-per-chunk', type=int, default=TREES_PER_CHUNK)
+    parser.add_argument('--max-trees', type=int, default=MAX_TREES)
+    parser.add_argument('--profile', choices=list(TRAINING_PROFILES), default='compact')
+    args = parser.parse_args()
+
+    if args.parts:
+        from synthetic_data import iter_dataset
+        chunks = iter_dataset(args.parts)
+        stream = None
+    else:
+        path = args.ndjson or args.csv
+        stream = open(path, 'rb')
+        content_type = NDJSON_TYPES[0] if args.ndjson else CSV_TYPES[0]
+        chunks = iter_training_chunks(stream, content_type, args.chunk_rows)
+
+    try:
+        model = DropoutPredictionModel(args.output)
+        model.train_model_chunked(chunks, profile=args.profile, trees_per_chunk=args.trees_per_chunk,
+                                  max_trees=args.max_trees)
+    finally:
+        if stream is not None:
+            stream.close()
+    print(f"Model saved to {os.path.abspath(args.output)}")
@@ -0,0 +1,140 @@
+"""
+Compare the compact training profile against the default forest
+
+    python compact_model_report.py --output compact_model_report.md
+
+Trains one model per profile in TRAINING_PROFILES on the same generate_sample_data rows,
+then measures for each: forest size, artifact size and load time for both formats,
+memory held by the loaded forest, single-row latency, batch throughput, and accuracy on
+held-out students from synthetic_data (a different seed, so none were seen in training).
+The report is written as a Markdown table.
+"""
+import argparse
+import os
+import shutil
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, TRAINING_PROFILES, generate_sample_data
+from feature_transform import RAW_FEATURES
+from model_registry import model_nbytes
+from synthetic_data import generate_dataset
+from benchmark_suite import best_of, quietly, artifact_size, bench_single_latency
+
+REPORT_DIR = 'compact_report_artifacts'
+
+def holdout_scores(model, holdout):
+    """
+    Accuracy and ROC AUC of the model on rows it was not trained on
+    """
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    X = model.transform.transform_array(holdout[RAW_FEATURES].values)
+    risk = model.predictor.predict_proba(X)[:, 1]
+    y = holdout['dropout'].values
+    return {
+        'accuracy': float(accuracy_score(y, risk >= 0.5)),
+        'roc_auc': float(roc_auc_score(y, risk))
+    }
+
+def measure_profile(profile, data, holdout, n_runs):
+    """
+    Size, memory, latency and accuracy figures of one training profile
+    """
+    model = DropoutPredictionModel(os.path.join(REPORT_DIR, f'{profile}.pkl'))
+    quietly(model.train_model, data, save=False, profile=profile)
+    trees = [estimator.tree_ for estimator in model.model.estimators_]
+    result = {
+        'fit_seconds': model.training_metrics['fit_seconds'],
+        'trees': len(trees),
+        'nodes': int(sum(tree.node_count for tree in trees)),
+        'max_depth': int(max(tree.max_depth for tree in trees)),
+        'holdout': holdout_scores(model, holdout)
+    }
+
+    for label, filename, engine in (('pkl', f'{profile}.pkl', 'sklearn'), ('directory', profile, 'flat')):
+        model.model_path = os.path.join(REPORT_DIR, filename)
+        quietly(model.save_model)
+        loaded = DropoutPredictionModel(model.model_path, engine=engine)
+        result[label] = {
+            'artifact_bytes': artifact_size(model.model_path),
+            'load_seconds': best_of(lambda: quietly(loaded.load_model), 5),
+            'model_bytes': model_nbytes(loaded)
+        }
+
+    records = generate_sample_data(10000)[RAW_FEATURES].to_dict('records')
+    for engine in ('sklearn', 'flat'):
+        serving = DropoutPredictionModel(os.path.join(REPORT_DIR, profile), engine=engine)
+        quietly(serving.load_model)
+        latency = bench_single_latency(serving, n_runs)
+        batch_seconds = best_of(lambda: serving.predict_dropout_risk_batch(records), 3)
+        result[engine] = {
+            'p50_ms': latency['explained']['p50_ms'],
+            'p99_ms': latency['explained']['p99_ms'],
+            'batch_rows_per_second': len(records) / batch_seconds
+        }
+
+    # The flat engine must score exactly like the estimator it was compiled from
+    X = model.transform.transform_array(holdout[RAW_FEATURES].values)
+    flat = DropoutPredictionModel(os.path.join(REPORT_DIR, profile), engine='flat')
+    quietly(flat.load_model)
+    result['max_flat_difference'] = float(np.abs(flat.predictor.predict_proba(X) -
+                                                 model.model.predict_proba(X)).max())
+    return result
+
+def run_report(n_samples=20000, n_holdout=20000, n_runs=1000):
+    shutil.rmtree(REPORT_DIR, ignore_errors=True)
+    os.makedirs(REPORT_DIR)
+    data = generate_sample_data(n_samples)
+    holdout = generate_dataset(n_holdout, seed=7)
+    try:
+        return {profile: measure_profile(profile, data, holdout, n_runs) for profile in TRAINING_PROFILES}
+    finally:
+        shutil.rmtree(REPORT_DIR, ignore_errors=True)
+
+def format_report(results, n_samples):
+    default, compact = results['default'], results['compact']
+    rows = [
+        ('Trees / nodes / max depth',
+         lambda r: f"{r['trees']} / {r['nodes']:,} / {r['max_depth']}"),
+        ('`train_model` fit', lambda r: f"{r['fit_seconds']:.2f} s"),
+        ('`.pkl` size', lambda r: f"{r['pkl']['artifact_bytes'] / 1e6:.2f} MB"),
+        ('`.pkl` load', lambda r: f"{r['pkl']['load_seconds'] * 1000:.1f} ms"),
+        ('memory, `.pkl` loaded (sklearn engine)', lambda r: f"{r['pkl']['model_bytes'] / 1e6:.2f} MB"),
+        ('directory artifact size (current version)', lambda r: f"{r['directory']['artifact_bytes'] / 1e6:.2f} MB"),
+        ('directory artifact load', lambda r: f"{r['directory']['load_seconds'] * 1000:.2f} ms"),
+        ('memory, directory loaded (flat engine)', lambda r: f"{r['directory']['model_bytes'] / 1e6:.2f} MB"),
+        ('`predict_dropout_risk` p50 / p99, sklearn',
+         lambda r: f"{r['sklearn']['p50_ms']:.2f} / {r['sklearn']['p99_ms']:.2f} ms"),
+        ('`predict_dropout_risk` p50 / p99, flat',
+         lambda r: f"{r['flat']['p50_ms']:.2f} / {r['flat']['p99_ms']:.2f} ms"),
+        ('batch of 10,000 explained, sklearn / flat',
+         lambda r: f"{r['sklearn']['batch_rows_per_second']:,.0f} / {r['flat']['batch_rows_per_second']:,.0f} rows/s"),
+        ('held-out accuracy', lambda r: f"{r['holdout']['accuracy']:.2%}"),
+        ('held-out ROC AUC', lambda r: f"{r['holdout']['roc_auc']:.3f}"),
+        ('max flat vs sklearn difference', lambda r: f"{r['max_flat_difference']:.1e}")
+    ]
+    lines = [
+        f"Default vs compact forest, trained on {n_samples:,} `generate_sample_data` rows",
+        '',
+        '| | default | compact |',
+        '|---|---|---|'
+    ]
+    for label, cell in rows:
+        lines.append(f'| {label} | {cell(default)} | {cell(compact)} |')
+
+    lines.append('')
+    lines.append(f"Compact is {default['pkl']['artifact_bytes'] / compact['pkl']['artifact_bytes']:.0f}x smaller "
+                 f"as `.pkl` and {default['directory']['model_bytes'] / compact['directory']['model_bytes']:.0f}x "
+                 f"smaller in memory as a directory artifact; held-out accuracy changes by "
+                 f"{(compact['holdout']['accuracy'] - default['holdout']['accuracy']) * 100:+.1f} points.")
+    return '\n'.join(lines) + '\n'
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the compact training profile against the default forest')
+    parser.add_argument('--samples', type=int, default=20000, help='training rows for both models')
+    parser.add_argument('--output', default='compact_model_report.md', help='Markdown file to write the report to')
+    args = parser.parse_args()
+
+    report = format_report(run_report(args.samples), args.samples)
+    with open(args.output, 'w') as f:
+        f.write(report)
+    print(report)
+    print(f"Report written to {args.output}")
@@ -0,0 +1,273 @@
+"""
+Constant-memory drift monitoring of the raw features on live prediction traffic
+
+Every feature gets a fixed-size histogram whose bin edges are quantiles of the training
+data. The training-time histogram (the reference) is built when the model is trained and
+saved with it. Each prediction adds its rows to a live histogram with the same edges:
+one vectorized comparison against the edges and one bincount, whatever the traffic.
+Histograms with the same edges merge by adding their counts, so several workers (or
+several training chunks) combine exactly.
+
+Drift per feature is the population stability index (PSI) of the live histogram against
+the reference:
+
+    PSI = sum over bins of (live% - reference%) * ln(live% / reference%)
+
+Below DRIFT_WARNING the feature is 'stable', from DRIFT_WARNING it is 'shifting' and from
+DRIFT_ALERT it is 'drifted'; a drifted feature is the signal to retrain.
+
+The live histogram covers the most recent traffic: a DriftMonitor counts into a current
+window and, once it holds DRIFT_WINDOW_ROWS rows, keeps it as the previous window and
+starts a new one, so reports cover between one and two windows of rows.
+
+Under gunicorn every worker counts its own traffic. Set DROPOUT_DRIFT_DIR to a directory
+shared by the workers: each one writes its live counts there every DRIFT_FLUSH_ROWS rows
+(or DRIFT_FLUSH_SECONDS), one file per process and reference, and /drift merges the counts
+of all workers serving the same reference.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from feature_transform import RAW_FEATURES
+
+# Histogram bins per feature; edges are the reference quantiles between them
+DRIFT_BINS = 20
+
+# PSI at which a feature counts as shifting, and as drifted
+DRIFT_WARNING = 0.1
+DRIFT_ALERT = 0.25
+
+# Live rows needed before a feature's drift is reported
+DRIFT_MIN_ROWS = int(os.environ.get('DROPOUT_DRIFT_MIN_ROWS', 500))
+
+# Rows per live window (reports cover the current and the previous window)
+DRIFT_WINDOW_ROWS = int(os.environ.get('DROPOUT_DRIFT_WINDOW', 50000))
+
+# Directory shared by the workers for their live counts (unset: per-process only), how
+# often a worker writes its counts there and how old a worker's file may be to count
+DRIFT_DIR = os.environ.get('DROPOUT_DRIFT_DIR')
+DRIFT_FLUSH_ROWS = 1000
+DRIFT_FLUSH_SECONDS = 60
+DRIFT_FILE_MAX_AGE = int(os.environ.get('DROPOUT_DRIFT_MAX_AGE', 24 * 3600))
+
+# Probability given to empty bins so the PSI stays finite
+PSI_EPSILON = 1e-4
+
+class FeatureSketch:
+    """
+    Fixed-size histograms of the raw features, one row of counts per feature
+    edges has shape (n_features, n_edges); a value v falls in bin
+    sum(v >= edges), so each feature has n_edges + 1 bins. Features with fewer distinct
+    quantiles than the others are padded with +inf edges, whose bins stay empty.
+    """
+    def __init__(self, edges, counts=None, features=RAW_FEATURES):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        n_features, n_edges = self.edges.shape
+        if counts is None:
+            counts = np.zeros((n_features, n_edges + 1), dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.features = list(features)
+        # Offsets turning (feature, bin) into an index of the flattened counts
+        self.offsets = np.arange(n_features) * (n_edges + 1)
+
+    @classmethod
+    def from_values(cls, raw, n_bins=DRIFT_BINS, features=RAW_FEATURES):
+        """
+        Reference histograms of an (n_rows, n_features) array of raw features without missing values
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+        quantiles = np.quantile(raw, np.arange(1, n_bins) / n_bins, axis=0).T
+        edges = np.full((raw.shape[1], n_bins - 1), np.inf)
+        for feature, values in enumerate(quantiles):
+            unique = np.unique(values)
+            edges[feature, :len(unique)] = unique
+        sketch = cls(edges, features=features)
+        sketch.update(raw)
+        return sketch
+
+    def empty(self):
+        """
+        A histogram with the same edges and no counts
+        """
+        return FeatureSketch(self.edges, features=self.features)
+
+    def bin_counts(self, values, edges):
+        bins = (values[:, :, None] >= edges[None, :, :]).sum(axis=2) + self.offsets
+        return np.bincount(bins.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+    def update(self, raw):
+        """
+        Count an (n_rows, n_features) array of raw features
+        """
+        self.counts += self.bin_counts(np.asarray(raw, dtype=np.float64), self.edges)
+
+    def merge(self, other):
+        """
+        Add the counts of a histogram with the same edges
+        """
+        if self.features != other.features or not np.array_equal(self.edges, other.edges):
+            raise ValueError('Only sketches with the same features and bin edges can be merged')
+        self.counts += other.counts
+
+    @property
+    def n_rows(self):
+        return int(self.counts[0].sum())
+
+    def fingerprint(self):
+        """
+        Short id of the edges and counts, identifying a reference across workers
+        """
+        digest = hashlib.sha1(self.edges.tobytes())
+        digest.update(self.counts.tobytes())
+        return digest.hexdigest()[:16]
+
+    def to_dict(self):
+        # +inf padding is stored as null so the dict is valid JSON
+        edges = [[None if np.isinf(edge) else edge for edge in row] for row in self.edges.tolist()]
+        return {'features': self.features, 'edges': edges, 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, params):
+        edges = [[np.inf if edge is None else edge for edge in row] for row in params['edges']]
+        return cls(edges, params['counts'], params['features'])
+
+def population_stability(reference, live):
+    """
+    PSI of every feature of live against reference (sketches with the same edges)
+    """
+    reference_p = reference.counts / np.maximum(reference.counts.sum(axis=1, keepdims=True), 1)
+    live_p = live.counts / np.maximum(live.counts.sum(axis=1, keepdims=True), 1)
+    reference_p = np.maximum(reference_p, PSI_EPSILON)
+    live_p = np.maximum(live_p, PSI_EPSILON)
+    return ((live_p - reference_p) * np.log(live_p / reference_p)).sum(axis=1)
+
+def drift_status(psi):
+    if psi >= DRIFT_ALERT:
+        return 'drifted'
+    if psi >= DRIFT_WARNING:
+        return 'shifting'
+    return 'stable'
+
+def drift_report(reference, live, min_rows=DRIFT_MIN_ROWS):
+    """
+    Drift of live traffic against the reference, per feature
+    """
+    psi = population_stability(reference, live)
+    enough = live.n_rows >= min_rows
+    features = {}
+    for feature, value in zip(reference.features, psi.tolist()):
+        features[feature] = {'psi': round(value, 4), 'status': drift_status(value) if enough else 'insufficient_data'}
+    return {
+        'features': features,
+        'drifted': [feature for feature, info in features.items() if info['status'] == 'drifted'],
+        'live_rows': live.n_rows,
+        'reference_rows': reference.n_rows,
+        'min_rows': min_rows
+    }
+
+class DriftMonitor:
+    """
+    Live histograms of the prediction traffic of one model, against its reference
+    observe() takes the scaled feature matrix the model predicts from: the reference
+    edges are scaled once with the model's transform, so live rows are binned without
+    undoing the scaling. Missing values have already taken the training median.
+    """
+    def __init__(self, reference, transform, window_rows=DRIFT_WINDOW_ROWS, drift_dir=DRIFT_DIR):
+        n_features = len(reference.features)
+        self.reference = reference
+        self.reference_id = reference.fingerprint()
+        self.scaled_edges = (reference.edges - transform.mean[:n_features, None]) / transform.scale[:n_features, None]
+        self.current = reference.empty()
+        self.previous = reference.empty()
+        self.window_rows = window_rows
+        self.drift_dir = drift_dir
+        self.rows_since_flush = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def observe(self, X):
+        n_features = len(self.reference.features)
+        counts = self.current.bin_counts(X[:, :n_features], self.scaled_edges)
+        with self.lock:
+            self.current.counts += counts
+            if self.current.n_rows >= self.window_rows:
+                self.previous, self.current = self.current, self.reference.empty()
+            self.rows_since_flush += len(X)
+            flush = self.drift_dir is not None and (self.rows_since_flush >= DRIFT_FLUSH_ROWS or
+                                                    time.monotonic() - self.last_flush >= DRIFT_FLUSH_SECONDS)
+            if flush:
+                self.rows_since_flush = 0
+                self.last_flush = time.monotonic()
+        if flush:
+            self.flush()
+
+    def reset(self):
+        """
+        Forget the live counts
+        """
+        with self.lock:
+            self.current = self.reference.empty()
+            self.previous = self.reference.empty()
+
+    def live(self):
+        """
+        Live counts of this process: the current and the previous window
+        """
+        with self.lock:
+            live = self.current.empty()
+            live.counts = self.current.counts + self.previous.counts
+        return live
+
+    def file_name(self):
+        """
+        Name of this process's counts file; a process serving several models writes one per reference
+        """
+        return f'drift-{os.getpid()}-{self.reference_id}.json'
+
+    def flush(self):
+        """
+        Write this process's live counts to the shared directory
+        """
+        os.makedirs(self.drift_dir, exist_ok=True)
+        path = os.path.join(self.drift_dir, self.file_name())
+        tmp_path = f'{path}.tmp-{threading.get_ident()}'
+        with open(tmp_path, 'w') as f:
+            json.dump({'reference_id': self.reference_id, 'live': self.live().to_dict()}, f)
+        os.replace(tmp_path, path)
+
+    def merged_live(self):
+        """
+        This process's live counts plus those other workers wrote for the same reference
+        Returns (sketch, number of processes merged)
+        """
+        live = self.live()
+        n_processes = 1
+        if self.drift_dir is None or not os.path.isdir(self.drift_dir):
+            return live, n_processes
+        own = self.file_name()
+        now = time.time()
+        for name in os.listdir(self.drift_dir):
+            path = os.path.join(self.drift_dir, name)
+            if name == own or not name.startswith('drift-') or not name.endswith('.json'):
+                continue
+            try:
+                if now - os.stat(path).st_mtime > DRIFT_FILE_MAX_AGE:
+                    continue
+                with open(path) as f:
+                    worker = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if worker.get('reference_id') == self.reference_id:
+                live.merge(FeatureSketch.from_dict(worker['live']))
+                n_processes += 1
+        return live, n_processes
+
+    def report(self):
+        live, n_processes = self.merged_live()
+        report = drift_report(self.reference, live)
+        report['processes'] = n_processes
+        report['window_rows'] = self.window_rows
+        return report
@@ -1,29 +1,197 @@
-import pandas as pd
+# Only NumPy and the inference modules are imported up front. pandas, joblib and the
+# sklearn training/reporting stack are imported where they are used, so a process
+# that only serves predictions from a directory artifact never loads them.
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report, confusion_matrix
-import joblib
+import copy
+import functools
+import itertools
 import os
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 import sys
 import warnings
+from feature_transform import FeatureTransform, RAW_FEATURES, MODEL_FEATURES
+from forest_engine import FlatForest
+from cascade import LinearScorer, CascadePredictor, CASCADE_MARGIN, evaluate_cascade
+from chunked_training import (chunk_arrays, thin_forest, ValidationReservoir, TREES_PER_CHUNK, MAX_TREES,
+                              VALIDATION_FRACTION, MAX_VALIDATION_ROWS)
+from model_artifact import is_artifact_path, save_artifact, load_artifact, load_artifact_estimator
+from drift import FeatureSketch, DriftMonitor
 warnings.filterwarnings('ignore')
 
+# Raw fields every student record must provide for a prediction
+REQUIRED_FIELDS = RAW_FEATURES
+
+# Inference engines: 'sklearn' calls RandomForestClassifier.predict_proba directly,
+# 'flat' scores with the array-backed FlatForest compiled from the same forest
+ENGINES = ('sklearn', 'flat')
+
+# RandomForestClassifier settings per training profile. 'compact' bounds depth and leaf
+# count and prunes (minimal cost-complexity), and its flat node arrays are stored as
+# float32 / int32: a fraction of the default forest's size and load time, at the same
+# held-out accuracy (see compact_model_report.py)
+TRAINING_PROFILES = {
+    'default': {'n_estimators': 100},
+    'compact': {'n_estimators': 100, 'max_depth': 10, 'max_leaf_nodes': 128,
+                'min_samples_leaf': 10, 'ccp_alpha': 0.0001}
+}
+
+# Risk levels, lowest first, and the risk scores at which Medium and High start
+RISK_LEVELS = ('Low', 'Medium', 'High')
+RISK_BOUNDARIES = (0.4, 0.7)
+
+# Reasons returned per prediction; a reason is only given for a feature that raised the risk
+MAX_REASONS = 3
+
+# Contribution to the dropout probability from which a reason counts as High / Medium impact
+HIGH_IMPACT_CONTRIBUTION = 0.1
+MEDIUM_IMPACT_CONTRIBUTION = 0.03
+
+# How each model feature is named and described when it raises a student's risk
+REASON_TEMPLATES = {
+    'attendance': ('Attendance', 'Attendance of {value:.1f}%'),
+    'cgpa': ('Academic Performance', 'CGPA of {value:.2f}'),
+    'backlogs': ('Backlogs', '{value:.0f} backlogs'),
+    'assignments_submitted': ('Assignment Submission', '{value:.0f} assignments submitted'),
+    'pending_fee_ratio': ('Pending Fees', '{value:.1%} of fees pending'),
+    'attendance_cgpa_ratio': ('Attendance Relative to CGPA', 'Attendance-to-CGPA ratio of {value:.1f}'),
+    'backlogs_assignments_ratio': ('Backlogs Relative to Assignments',
+                                   'Backlogs-per-assignment ratio of {value:.2f}')
+}
+
+# Versions handed out to snapshots, increasing across all models of the process
+SNAPSHOT_VERSIONS = itertools.count(1)
+
+def risk_level_codes(risk_scores):
+    """
+    Index into RISK_LEVELS of every score in an array
+    """
+    return np.searchsorted(RISK_BOUNDARIES, risk_scores, side='right')
+
+def freeze_arrays(*arrays):
+    for array in arrays:
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
+
+class ModelSnapshot:
+    """
+    Everything a prediction reads from a trained model, built once and never changed
+    Training and loading build a new snapshot and publish it with a single reference
+    assignment, so a prediction that reads model.snapshot once sees one consistent
+    version throughout, without taking a lock. The NumPy arrays of the transform and of
+    the flat forests are made read-only; the sklearn estimator is never modified after
+    it has been put in a snapshot (update_model grows a copy).
+    """
+    __slots__ = ('version', 'model', 'transform', 'predictor', 'explainer', 'feature_names',
+                 'feature_importance', 'profile', 'trained_at', 'drift')
+    
+    def __init__(self, model, transform, predictor, explainer, feature_names, feature_importance,
+                 profile, trained_at, drift=None):
+        values = {
+            'version': next(SNAPSHOT_VERSIONS),
+            'model': model,
+            'transform': transform,
+            'predictor': predictor,
+            'explainer': explainer,
+            'feature_names': tuple(feature_names),
+            'feature_importance': feature_importance,
+            'profile': profile,
+            'trained_at': trained_at,
+            'drift': drift
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+        # The drift monitor's live counts are the one part that changes with traffic
+        if drift is not None:
+            freeze_arrays(drift.reference.edges, drift.reference.counts, drift.scaled_edges)
+        freeze_arrays(transform.mean, transform.scale, transform.medians, *explainer.to_arrays().values())
+        for forest in (predictor, getattr(predictor, 'forest', None)):
+            if isinstance(forest, FlatForest):
+                freeze_arrays(*forest.to_arrays().values())
+    
+    def __setattr__(self, name, value):
+        raise AttributeError('ModelSnapshot is immutable; build a new one instead')
+    
+    def scorer(self, explain):
+        """
+        Predictor for a request; explained requests are scored by the forest alone
+        The top reasons come from the forest's decision paths, so the score they explain
+        must come from the forest too. The cascade only serves scores-only requests.
+        """
+        if explain and isinstance(self.predictor, CascadePredictor):
+            return self.predictor.forest
+        return self.predictor
+
+def exclusive(method):
+    """
+    Run a method that rebuilds the model under the model's write lock
+    Writers are serialized with each other; predictions never wait for them.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.write_lock:
+            return method(self, *args, **kwargs)
+    return locked
+
 class DropoutPredictionModel:
-    def __init__(self, model_path='dropout_model.pkl'):
+    """
+    Trains, saves and loads the dropout model and serves predictions from its current snapshot
+    The attributes below are the training-side state. Predictions only read self.snapshot
+    (a ModelSnapshot), which training and loading replace in one assignment when done.
+    """
+    def __init__(self, model_path='dropout_model.pkl', engine='sklearn'):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
         self.model_path = model_path
+        self.engine = engine
+        self.profile = 'default'
         self.model = None
-        self.scaler = StandardScaler()
+        self.snapshot = None
+        self.write_lock = threading.RLock()
+        self.linear_scorer = None
+        self.cascade_margin = CASCADE_MARGIN
+        self.drift_reference = None
+        self.scaler = None
         self.feature_names = None
+        self.medians = None
+        self.transform = None
+        self.training_metrics = None
+        self.trained_at = None
+        self.load_seconds = None
+        self.ready = False
+    
+    @property
+    def predictor(self):
+        """
+        The object computing predict_proba in the current snapshot (None before training)
+        """
+        snapshot = self.snapshot
+        return snapshot.predictor if snapshot is not None else None
+    
+    @property
+    def explainer(self):
+        """
+        The flat forest explaining predictions in the current snapshot
+        """
+        snapshot = self.snapshot
+        return snapshot.explainer if snapshot is not None else None
+    
+    @property
+    def feature_importance(self):
+        snapshot = self.snapshot
+        return dict(snapshot.feature_importance) if snapshot is not None else {}
         
-    def preprocess_data(self, data):
+    def preprocess_data(self, data, fit=True):
         """
         Preprocess the data for training or prediction
         Expected columns: attendance, cgpa, backlogs, assignments_submitted, pending_fee_ratio, dropout
+        Pass fit=False to reuse the preprocessing fitted during training
+        Predictions go through self.transform directly, which never refits anything
         """
         # Handle missing values
+        if fit:
+            self.medians = {name: float(value) for name, value in data[RAW_FEATURES].median().items()}
         data = data.fillna(data.median())
         
         # Feature engineering
@@ -32,195 +200,688 @@ class DropoutPredictionModel:
         data['backlogs_assignments_ratio'] = data['backlogs'] / (data['assignments_submitted'] + 1)
         
         # Define features and target
-        feature_columns = ['attendance', 'cgpa', 'backlogs', 'assignments_submitted', 
-                          'pending_fee_ratio', 'attendance_cgpa_ratio', 'backlogs_assignments_ratio']
+        feature_columns = list(MODEL_FEATURES)
         self.feature_names = feature_columns
         
         X = data[feature_columns]
         y = data['dropout'] if 'dropout' in data.columns else None
         
         # Normalize features
-        X_scaled = self.scaler.fit_transform(X)
+        if fit:
+            from sklearn.preprocessing import StandardScaler
+            self.scaler = StandardScaler()
+            X_scaled = self.scaler.fit_transform(X)
+            self.transform = FeatureTransform.from_scaler(self.scaler, self.medians)
+        else:
+            X_scaled = self.transform.transform_array(data[RAW_FEATURES].values)
         
         if y is not None:
             return X_scaled, y.values
         return X_scaled
     
-    def train_model(self, data):
+    @exclusive
+    def train_model(self, data, save=True, progress=None, profile='default', cascade=False,
+                    cascade_margin=CASCADE_MARGIN):
         """
         Train the dropout prediction model
+        Pass save=False to keep the result in memory only (e.g. until it has been validated)
+        progress, if given, is called as progress(fraction, stage) as training advances
+        profile selects the forest settings from TRAINING_PROFILES ('default' or 'compact')
+        Pass cascade=True to also fit a logistic regression that scores rows first and
+        leaves only those within cascade_margin of a risk-level boundary to the forest
         """
+        if profile not in TRAINING_PROFILES:
+            raise ValueError(f"Unknown training profile '{profile}', expected one of {tuple(TRAINING_PROFILES)}")
+        
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import classification_report, accuracy_score
+        
+        def report(fraction, stage):
+            if progress is not None:
+                progress(fraction, stage)
+        
         print("Starting model training...")
         
         # Preprocess data
+        report(0.05, 'preprocessing')
         X, y = self.preprocess_data(data)
+        # Histograms of the training features, the reference for drift monitoring
+        self.drift_reference = FeatureSketch.from_values(self.transform.fill_missing(data[RAW_FEATURES].values))
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
         # Train model
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        report(0.1, 'fitting')
+        fit_start = time.perf_counter()
+        self.model = RandomForestClassifier(random_state=42, **TRAINING_PROFILES[profile])
         self.model.fit(X_train, y_train)
+        self.linear_scorer = LinearScorer.fit(X_train, y_train) if cascade else None
+        self.cascade_margin = cascade_margin
+        fit_seconds = time.perf_counter() - fit_start
+        self.profile = profile
+        self.trained_at = datetime.now(timezone.utc)
         
         # Evaluate model
+        report(0.8, 'evaluating')
         y_pred = self.model.predict(X_test)
-        print("Model Training Completed")
+        self.training_metrics = {
+            'mode': 'full',
+            'profile': profile,
+            'accuracy': float(accuracy_score(y_test, y_pred)),
+            'n_train': int(len(y_train)),
+            'n_test': int(len(y_test)),
+            'n_estimators': len(self.model.estimators_),
+            'fit_seconds': fit_seconds
+        }
+        print(f"Model Training Completed in {fit_seconds:.2f}s")
         print("\nClassification Report:")
         print(classification_report(y_test, y_pred))
         
+        self.build_predictor()
+        self.report_cascade(X_test)
+        
         # Save model
-        self.save_model()
+        if save:
+            report(0.9, 'saving')
+            self.save_model()
         
+        report(1.0, 'trained')
         return self.model
     
-    def predict_dropout_risk(self, student_data):
+    @exclusive
+    def update_model(self, data, n_new_trees=20, max_trees=300, save=True, progress=None):
+        """
+        Incrementally retrain on new or changed records instead of refitting from scratch
+        Fits n_new_trees on data and appends them to the existing forest (sklearn warm_start).
+        Features are scaled with the frozen training-time transform so old and new trees
+        see the same feature space. Once the forest holds more than max_trees, the oldest
+        trees are retired first.
+        """
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import accuracy_score
+        
+        def report(fraction, stage):
+            if progress is not None:
+                progress(fraction, stage)
+        
+        if self.model is None and not self.load_model():
+            raise ValueError('No trained model to update; run a full training first')
+        
+        # Directory artifacts serve a FlatForest; appending trees needs the sklearn estimator
+        estimator = self.model
+        if isinstance(estimator, FlatForest):
+            estimator = load_artifact_estimator(self.model_path)
+            if estimator is None:
+                raise ValueError(f'{self.model_path} has no saved sklearn estimator to update')
+        
+        print(f"Starting incremental update with {len(data)} records...")
+        
+        # Preprocess with the frozen transform; missing columns take the training medians
+        report(0.05, 'preprocessing')
+        raw = data.reindex(columns=RAW_FEATURES).values
+        X = self.transform.transform_array(raw)
+        y = data['dropout'].values
+        
+        # The new trees are fitted on the training split, so that split needs both classes
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if set(np.unique(y_train)) != set(estimator.classes_):
+            raise ValueError('Incremental training data must contain both dropout and non-dropout students')
+        
+        # Append new trees fitted only on the new records. The forest is a shallow copy with
+        # its own list of trees, so snapshots serving the current forest never see it change,
+        # and the model is only replaced once the fit has succeeded
+        report(0.1, 'fitting')
+        fit_start = time.perf_counter()
+        forest = copy.copy(estimator)
+        forest.estimators_ = list(estimator.estimators_)
+        forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + n_new_trees)
+        forest.fit(X_train, y_train)
+        forest.set_params(warm_start=False)
+        self.model = forest
+        # The new records join the drift reference, binned with its existing edges
+        if self.drift_reference is not None:
+            reference = self.drift_reference.empty()
+            reference.counts = self.drift_reference.counts.copy()
+            reference.update(self.transform.fill_missing(raw))
+            self.drift_reference = reference
+        
+        # Retire the oldest trees beyond the cap
+        n_retired = max(0, len(forest.estimators_) - max_trees)
+        if n_retired:
+            forest.estimators_ = forest.estimators_[n_retired:]
+            forest.n_estimators = len(forest.estimators_)
+        # The cascade's regression is refitted on the same records, so it routes rows
+        # around the updated forest rather than the one it was first trained next to
+        if self.linear_scorer is not None:
+            self.linear_scorer = LinearScorer.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - fit_start
+        self.trained_at = datetime.now(timezone.utc)
+        
+        # Evaluate the whole updated forest on held-out new records
+        report(0.8, 'evaluating')
+        y_pred = forest.predict(X_test)
+        self.training_metrics = {
+            'mode': 'incremental',
+            'accuracy': float(accuracy_score(y_test, y_pred)),
+            'n_train': int(len(y_train)),
+            'n_test': int(len(y_test)),
+            'n_new_trees': n_new_trees,
+            'n_retired_trees': n_retired,
+            'n_estimators': len(forest.estimators_),
+            'fit_seconds': fit_seconds
+        }
+        print(f"Incremental update completed in {fit_seconds:.2f}s: "
+              f"+{n_new_trees} trees, -{n_retired} retired, {len(forest.estimators_)} total")
+        
+        self.build_predictor()
+        self.report_cascade(X_test)
+        
+        if save:
+            report(0.9, 'saving')
+            self.save_model()
+        
+        report(1.0, 'trained')
+        return self.model
+    
+    @exclusive
+    def train_model_chunked(self, chunks, save=True, progress=None, profile='compact',
+                            trees_per_chunk=TREES_PER_CHUNK, validation_fraction=VALIDATION_FRACTION,
+                            max_validation_rows=MAX_VALIDATION_ROWS, max_trees=MAX_TREES):
+        """
+        Train on an iterable of chunks without ever holding the whole dataset (see chunked_training.py)
+        A chunk is a DataFrame or {column: array} with the training columns. Missing-value
+        medians and scaling are fitted on the first chunk; the trees do not depend on the
+        scaling. Every chunk adds trees_per_chunk trees fitted on its training rows, and its
+        validation rows go into a reservoir of at most max_validation_rows rows that the
+        final forest is evaluated on. The default 'compact' profile bounds each tree, so the
+        forest grows with the number of chunks but not with the rows in each. Beyond
+        max_trees trees the forest keeps a uniform sample of every tree fitted.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import classification_report, accuracy_score
+        
+        if profile not in TRAINING_PROFILES:
+            raise ValueError(f"Unknown training profile '{profile}', expected one of {tuple(TRAINING_PROFILES)}")
+        
+        def report(fraction, stage):
+            if progress is not None:
+                progress(fraction, stage)
+        
+        print("Starting out-of-core model training...")
+        settings = dict(TRAINING_PROFILES[profile], n_estimators=0)
+        forest = RandomForestClassifier(random_state=42, warm_start=True, **settings)
+        rng = np.random.default_rng(42)
+        reservoir = None
+        reference = None
+        n_chunks = n_train = n_skipped = n_fitted = n_thinned = 0
+        fit_start = time.perf_counter()
+        
+        for chunk in chunks:
+            raw, y = chunk_arrays(chunk)
+            if not len(y):
+                continue
+            if reservoir is None:
+                # The first chunk fixes medians and scaling for the whole run
+                report(0.05, 'preprocessing')
+                import pandas as pd
+                self.preprocess_data(pd.DataFrame(raw, columns=RAW_FEATURES).assign(dropout=y))
+                reservoir = ValidationReservoir(self.transform.n_features, max_validation_rows)
+                # Drift reference bin edges come from the first chunk; later chunks add their counts
+                reference = FeatureSketch.from_values(self.transform.fill_missing(raw))
+                # The number of chunks is unknown, so fitting is reported once for all of them
+                report(0.1, 'fitting')
+            else:
+                reference.update(self.transform.fill_missing(raw))
+            n_chunks += 1
+            X = self.transform.transform_array(raw)
+            
+            held_out = rng.random(len(y)) < validation_fraction
+            reservoir.add(X[held_out], y[held_out])
+            X_train, y_train = X[~held_out], y[~held_out]
+            
+            # Every tree needs both classes, and warm_start requires the same classes throughout
+            if len(np.unique(y_train)) != 2:
+                n_skipped += 1
+                print(f"Skipping chunk {n_chunks}: its training rows do not contain both classes")
+                continue
+            forest.set_params(n_estimators=forest.n_estimators + trees_per_chunk)
+            forest.fit(X_train, y_train)
+            n_fitted += trees_per_chunk
+            n_thinned += thin_forest(forest, n_fitted, max_trees, rng)
+            n_train += len(y_train)
+            print(f"Chunk {n_chunks}: {len(y)} rows, {len(forest.estimators_)} trees")
+        
+        if n_train == 0:
+            raise ValueError('No chunk contained training rows with both dropout and non-dropout students')
+        forest.set_params(warm_start=False)
+        fit_seconds = time.perf_counter() - fit_start
+        self.model = forest
+        self.linear_scorer = None
+        self.drift_reference = reference
+        self.profile = profile
+        self.trained_at = datetime.now(timezone.utc)
+        
+        # Evaluate the final forest on the reservoir of held-out rows
+        report(0.8, 'evaluating')
+        X_test, y_test = reservoir.arrays()
+        y_pred = forest.predict(X_test)
+        self.training_metrics = {
+            'mode': 'out_of_core',
+            'profile': profile,
+            'accuracy': float(accuracy_score(y_test, y_pred)),
+            'n_train': int(n_train),
+            'n_test': int(len(y_test)),
+            'n_held_out': int(reservoir.n_seen),
+            'n_chunks': n_chunks,
+            'n_skipped_chunks': n_skipped,
+            'n_fitted_trees': n_fitted,
+            'n_thinned_trees': n_thinned,
+            'n_estimators': len(forest.estimators_),
+            'fit_seconds': fit_seconds
+        }
+        print(f"Out-of-core training completed in {fit_seconds:.2f}s: {n_train} training rows "
+              f"in {n_chunks} chunks, {len(forest.estimators_)} trees")
+        print("\nClassification Report:")
+        print(classification_report(y_test, y_pred))
+        
+        self.build_predictor()
+        
+        if save:
+            report(0.9, 'saving')
+            self.save_model()
+        
+        report(1.0, 'trained')
+        return self.model
+    
+    def predict_dropout_risk(self, student_data, explain=True, timings=None):
         """
         Predict dropout risk for a student
         student_data should be a dict with keys: attendance, cgpa, backlogs, assignments_submitted, pending_fee_ratio
+        Pass explain=False to skip top_reasons when only the score is needed
+        Pass a dict as timings to get the seconds spent in each stage added to it
         """
-        if self.model is None:
-            self.load_model()
-            
-        # Convert to DataFrame
-        df = pd.DataFrame([student_data])
+        snapshot = self.current_snapshot()
         
-        # Preprocess
-        X = self.preprocess_data(df)
+        start = time.perf_counter()
+        # Preprocess with the frozen training-time transform
+        X = snapshot.transform.transform_one(student_data)
+        preprocessed = time.perf_counter()
         
         # Predict
-        risk_score = self.model.predict_proba(X)[0][1]  # Probability of dropout (class 1)
+        risk_score = snapshot.scorer(explain).predict_proba(X)[0][1]  # Probability of dropout (class 1)
+        if snapshot.drift is not None:
+            snapshot.drift.observe(X)
+        predicted = time.perf_counter()
         
-        # Get feature importances
-        feature_importance = self.get_feature_importance()
+        top_reasons = self.explain_predictions(X, snapshot)[0] if explain else None
+        if timings is not None:
+            record_stages(timings, start, preprocessed, predicted, explain)
+        return self.build_prediction(risk_score, top_reasons)
+    
+    def predict_dropout_risk_batch(self, records, explain=True, timings=None):
+        """
+        Predict dropout risk for many students with a single predict_proba call
+        records should be a list of dicts with the same keys as predict_dropout_risk
+        Returns one entry per record, in the same order, holding either 'data' or 'error'
+        Pass explain=False to skip top_reasons when only the scores are needed
+        Pass a dict as timings to get the seconds spent in each stage added to it
+        """
+        return self.build_results(self.score_records(records, explain, timings), timings)
+    
+    def build_results(self, scores, timings=None):
+        """
+        Result dicts of predict_dropout_risk_batch from the arrays of score_records
+        Writing the reasons' descriptions counts towards the top_reasons stage
+        """
+        start = time.perf_counter()
+        results = [None if error is None else {'success': False, 'error': error}
+                   for error in scores['errors']]
+        if scores['reasons'] is not None:
+            top_reasons = [self.get_top_reasons(*row) for row in zip(*(
+                array.tolist() for array in scores['reasons']))]
+        else:
+            top_reasons = [None] * len(scores['rows'])
+        
+        for index, risk_score, reasons in zip(scores['rows'].tolist(), scores['risk_scores'], top_reasons):
+            results[index] = {
+                'success': True,
+                'data': self.build_prediction(risk_score, reasons)
+            }
+        
+        if timings is not None and scores['reasons'] is not None:
+            timings['top_reasons'] = timings.get('top_reasons', 0.0) + time.perf_counter() - start
+        return results
+    
+    def score_records(self, records, explain=True, timings=None, snapshot=None):
+        """
+        Score a batch of student records into arrays instead of result dicts
+        Returns {'errors': error message or None per record, 'rows': indices of the valid
+        records, 'risk_scores': their scores, 'reasons': (features, values, contributions)
+        arrays of the top reasons, as in explain_arrays, or None when explain is False,
+        'feature_names': the names the reason features index into}
+        Response formats that encode columns (see response_formats.py) use this directly.
+        """
+        if snapshot is None:
+            snapshot = self.current_snapshot()
+        
+        validate_start = time.perf_counter()
+        errors = [None] * len(records)
+        valid_indices = []
+        valid_records = []
+        
+        # Validate every record up front so one bad row doesn't fail the whole batch
+        for index, record in enumerate(records):
+            error = self.validate_student_data(record)
+            if error:
+                errors[index] = error
+            else:
+                valid_indices.append(index)
+                valid_records.append(record)
+        
+        scores = {
+            'errors': errors,
+            'rows': np.asarray(valid_indices, dtype=np.int64),
+            'risk_scores': np.empty(0),
+            'reasons': None,
+            'feature_names': snapshot.feature_names
+        }
+        if explain:
+            scores['reasons'] = (np.empty((0, MAX_REASONS), dtype=np.int64), np.empty((0, MAX_REASONS)),
+                                 np.empty((0, MAX_REASONS)))
+        start = time.perf_counter()
+        if timings is not None:
+            timings['validate'] = timings.get('validate', 0.0) + start - validate_start
+        if not valid_records:
+            return scores
+        
+        # Build one feature matrix for all valid rows and score them together
+        X = snapshot.transform.transform_records(valid_records)
+        preprocessed = time.perf_counter()
+        scores['risk_scores'] = snapshot.scorer(explain).predict_proba(X)[:, 1]  # Probability of dropout (class 1)
+        if snapshot.drift is not None:
+            snapshot.drift.observe(X)
+        predicted = time.perf_counter()
+        
+        # Explanations for the whole batch come from one pass over the decision paths
+        if explain:
+            scores['reasons'] = self.explain_arrays(X, snapshot)
+        if timings is not None:
+            record_stages(timings, start, preprocessed, predicted, explain)
+        return scores
+    
+    def validate_student_data(self, student_data):
+        """
+        Check that a student record can be scored
+        Returns an error message, or None if the record is valid
+        """
+        if not isinstance(student_data, dict):
+            return 'Student record must be an object'
+        
+        for field in REQUIRED_FIELDS:
+            if field not in student_data:
+                return f'Missing required field: {field}'
+            value = student_data[field]
+            if isinstance(value, bool) or not isinstance(value, (int, float, np.integer, np.floating)):
+                return f'Field {field} must be a number'
+            if value != value:  # NaN
+                return f'Field {field} must be a number'
         
-        return {
+        return None
+    
+    def build_prediction(self, risk_score, top_reasons=None):
+        """
+        Build the prediction payload returned for one student
+        top_reasons is left out when the prediction was not explained
+        """
+        prediction = {
             'risk_score': float(risk_score),
-            'risk_level': self.get_risk_level(risk_score),
-            'top_reasons': self.get_top_reasons(student_data, feature_importance)
+            'risk_level': self.get_risk_level(risk_score)
         }
+        if top_reasons is not None:
+            prediction['top_reasons'] = top_reasons
+        return prediction
+    
+    def build_predictor(self):
+        """
+        Set up the object used for predict_proba according to the selected engine,
+        and the flat forest used to explain predictions, and publish them as a new snapshot
+        """
+        compact = self.profile == 'compact'
+        if isinstance(self.model, FlatForest):
+            # Loaded from a directory artifact without the sklearn estimator
+            predictor = self.model
+        elif self.engine == 'flat':
+            predictor = FlatForest.from_sklearn(self.model, compact)
+        else:
+            predictor = self.model
+        
+        # Explanations walk the flat node arrays whichever engine computes the scores
+        if isinstance(predictor, FlatForest):
+            explainer = predictor
+        else:
+            explainer = FlatForest.from_sklearn(self.model, compact)
+        feature_importance = dict(zip(self.feature_names, self.model.feature_importances_))
+        
+        # Cascade scoring puts the linear model in front of whichever forest engine
+        if self.linear_scorer is not None:
+            predictor = CascadePredictor(self.linear_scorer, predictor, RISK_BOUNDARIES, self.cascade_margin)
+        
+        # One reference assignment: predictions see either the old snapshot or this one
+        # Live traffic is counted against the reference from training (models saved before
+        # drift monitoring have none)
+        drift = DriftMonitor(self.drift_reference, self.transform) if self.drift_reference is not None else None
+        self.snapshot = ModelSnapshot(self.model, self.transform, predictor, explainer, self.feature_names,
+                                      feature_importance, self.profile, self.trained_at, drift)
+    
+    def current_snapshot(self):
+        """
+        The snapshot to predict with, loading the saved model first if there is none yet
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            self.load_model()
+            snapshot = self.snapshot
+        if snapshot is None:
+            raise ValueError(f'No trained model available at {self.model_path}')
+        return snapshot
+    
+    def report_cascade(self, X_test):
+        """
+        Add the cascade's pass-through rate, risk-level agreement with the forest alone
+        and speedup on the held-out rows to training_metrics
+        """
+        if self.linear_scorer is None:
+            return
+        report = evaluate_cascade(self.predictor, X_test)
+        self.training_metrics['cascade'] = report
+        print(f"Cascade: {report['pass_through_rate']:.1%} of rows passed to the forest, "
+              f"{report['level_agreement']:.2%} risk-level agreement, {report['speedup']:.1f}x faster scoring")
+    
+    def warm_up(self):
+        """
+        Run throwaway predictions so the first real request doesn't pay for lazy
+        initialization, then mark the model ready to serve
+        Returns False if there is no trained model to warm up
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            self.ready = False
+            return False
+        
+        sample = dict(zip(REQUIRED_FIELDS, snapshot.transform.medians.tolist()))
+        self.predict_dropout_risk(sample)
+        self.predict_dropout_risk_batch([sample, sample])
+        # Throwaway rows are not traffic
+        if snapshot.drift is not None:
+            snapshot.drift.reset()
+        self.ready = True
+        return True
+    
+    def drift_report(self):
+        """
+        Drift of the features seen by predictions since the current model was loaded,
+        against its training data (see drift.py); None if the model has no drift reference
+        """
+        snapshot = self.current_snapshot()
+        if snapshot.drift is None:
+            return None
+        return snapshot.drift.report()
     
     def get_feature_importance(self):
         """
-        Get feature importance from the trained model
+        Get feature importance from the trained model (computed once per loaded model)
         """
-        if self.model is None:
-            return {}
-            
-        importances = self.model.feature_importances_
-        feature_importance = dict(zip(self.feature_names, importances))
-        return feature_importance
+        return self.feature_importance
     
     def get_risk_level(self, risk_score):
         """
         Convert risk score to risk level
         """
-        if risk_score >= 0.7:
-            return 'High'
-        elif risk_score >= 0.4:
-            return 'Medium'
-        else:
-            return 'Low'
+        return RISK_LEVELS[int(risk_level_codes(risk_score))]
     
-    def get_top_reasons(self, student_data, feature_importance):
+    def explain_predictions(self, X, snapshot=None):
         """
-        Get top reasons for the risk prediction based on student data and feature importance
+        Top reasons for every row of a scaled feature matrix
+        Each feature's contribution to the dropout probability is read off the
+        forest's decision paths for that row, so reasons are specific to the student
+        Pass the snapshot X was computed with so both come from the same model version
         """
-        reasons = []
-        
-        # Check attendance
-        if student_data.get('attendance', 100) < 75:
-            reasons.append({
-                'factor': 'Low Attendance',
-                'description': f"Attendance is below 75% ({student_data.get('attendance', 0)}%)",
-                'impact': 'High'
-            })
+        top, top_values, top_contributions = self.explain_arrays(X, snapshot)
+        return [self.get_top_reasons(*row) for row in
+                zip(top.tolist(), top_values.tolist(), top_contributions.tolist())]
+    
+    def explain_arrays(self, X, snapshot=None):
+        """
+        The MAX_REASONS largest contributions of every row of a scaled feature matrix
+        Returns (features, values, contributions), each of shape (n_rows, MAX_REASONS):
+        indices into feature_names, the unscaled feature values and their contributions
+        """
+        if snapshot is None:
+            snapshot = self.current_snapshot()
+        _, contributions = snapshot.explainer.explain(X)
+        # Unscaled model features (missing values already filled) for the descriptions
+        values = X * snapshot.transform.scale + snapshot.transform.mean
         
-        # Check CGPA
-        if student_data.get('cgpa', 4.0) < 2.5:
-            reasons.append({
-                'factor': 'Low Academic Performance',
-                'description': f"CGPA is below 2.5 ({student_data.get('cgpa', 0)})",
-                'impact': 'High'
-            })
+        # Largest contributions first, picked for the whole batch at once
+        top = np.argsort(-contributions, axis=1, kind='stable')[:, :MAX_REASONS]
+        top_values = np.take_along_axis(values, top, axis=1)
+        top_contributions = np.take_along_axis(contributions, top, axis=1)
+        return top, top_values, top_contributions
+    
+    def get_top_reasons(self, features, values, contributions):
+        """
+        Get top reasons for one prediction from its largest per-feature contributions
+        features are indices into self.feature_names, largest contribution first,
+        with the matching unscaled values and contributions
+        Only features that raised the risk are reported
+        """
+        reasons = []
+        for feature, value, contribution in zip(features, values, contributions):
+            if contribution <= 0:
+                break
             
-        # Check backlogs
-        if student_data.get('backlogs', 0) > 2:
-            reasons.append({
-                'factor': 'Multiple Backlogs',
-                'description': f"Student has {student_data.get('backlogs', 0)} backlogs",
-                'impact': 'Medium'
-            })
+            factor, template = REASON_TEMPLATES[self.feature_names[feature]]
+            if contribution >= HIGH_IMPACT_CONTRIBUTION:
+                impact = 'High'
+            elif contribution >= MEDIUM_IMPACT_CONTRIBUTION:
+                impact = 'Medium'
+            else:
+                impact = 'Low'
             
-        # Check assignments
-        if student_data.get('assignments_submitted', 10) < 5:
             reasons.append({
-                'factor': 'Low Assignment Submission',
-                'description': f"Only {student_data.get('assignments_submitted', 0)} assignments submitted",
-                'impact': 'Medium'
-            })
-            
-        # Check fee pending ratio
-        if student_data.get('pending_fee_ratio', 0) > 0.3:
-            reasons.append({
-                'factor': 'High Pending Fees',
-                'description': f"Student has {student_data.get('pending_fee_ratio', 0)*100:.1f}% of fees pending",
-                'impact': 'Medium'
+                'factor': factor,
+                'description': f"{template.format(value=value)} raises the dropout risk by {contribution * 100:.1f} points",
+                'impact': impact,
+                'contribution': round(contribution, 4)
             })
         
-        # Sort by feature importance if we have them
-        if feature_importance:
-            # Add feature importance-based reasons
-            sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)
-            for feature, importance in sorted_features[:3]:  # Top 3 features
-                if importance > 0.1:  # Only consider significant features
-                    reasons.append({
-                        'factor': feature.replace('_', ' ').title(),
-                        'description': f"Feature '{feature}' has high importance ({importance:.2f}) in prediction",
-                        'impact': 'Medium'
-                    })
-        
-        # Remove duplicates and limit to top 3
-        unique_reasons = []
-        seen_factors = set()
-        for reason in reasons:
-            if reason['factor'] not in seen_factors:
-                unique_reasons.append(reason)
-                seen_factors.add(reason['factor'])
-        
-        return unique_reasons[:3]
+        return reasons
     
     def save_model(self):
         """
         Save the trained model and scaler
+        Paths ending in .pkl get a single joblib pickle; paths without an extension
+        get a memory-mappable directory artifact (see model_artifact.py)
         """
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
             'feature_names': self.feature_names,
-            'trained_at': datetime.now()
+            'medians': self.medians,
+            'profile': self.profile,
+            'cascade': self.cascade_params(),
+            'drift_reference': self.drift_reference.to_dict() if self.drift_reference is not None else None,
+            'trained_at': self.trained_at or datetime.now(timezone.utc)
         }
-        joblib.dump(model_data, self.model_path)
+        if is_artifact_path(self.model_path):
+            save_artifact(self.model_path, model_data)
+        else:
+            import joblib
+            # Replaced in one step, so a process loading the model never reads half a file
+            tmp_path = f"{self.model_path}.tmp-{os.getpid()}"
+            joblib.dump(model_data, tmp_path)
+            os.replace(tmp_path, self.model_path)
         print(f"Model saved to {self.model_path}")
     
+    def cascade_params(self):
+        """
+        The cascade's linear model and margin as plain values for saving, or None
+        """
+        if self.linear_scorer is None:
+            return None
+        return {'linear': self.linear_scorer.to_dict(), 'margin': self.cascade_margin}
+    
+    @exclusive
     def load_model(self):
         """
         Load a trained model
+        Directory artifacts are memory-mapped and served by the flat engine unless
+        the sklearn engine was requested, in which case the saved estimator is read
         """
         if os.path.exists(self.model_path):
-            model_data = joblib.load(self.model_path)
+            start = time.perf_counter()
+            if os.path.isdir(self.model_path):
+                model_data = load_artifact(self.model_path, load_estimator=(self.engine == 'sklearn'))
+            else:
+                import joblib
+                model_data = joblib.load(self.model_path)
             self.model = model_data['model']
             self.scaler = model_data['scaler']
             self.feature_names = model_data['feature_names']
+            self.medians = model_data.get('medians')
+            self.profile = model_data.get('profile', 'default')
+            cascade = model_data.get('cascade')
+            self.linear_scorer = LinearScorer.from_dict(cascade['linear']) if cascade else None
+            self.cascade_margin = cascade['margin'] if cascade else CASCADE_MARGIN
+            reference = model_data.get('drift_reference')
+            self.drift_reference = FeatureSketch.from_dict(reference) if reference else None
+            self.trained_at = model_data.get('trained_at')
+            self.transform = FeatureTransform.from_scaler(self.scaler, self.medians)
+            self.build_predictor()
+            self.load_seconds = time.perf_counter() - start
             print(f"Model loaded from {self.model_path}")
             return True
         else:
             print(f"No saved model found at {self.model_path}")
             return False
 
+def record_stages(timings, start, preprocessed, predicted, explain):
+    """
+    Add the preprocess, predict_proba and (if explained) top_reasons times of one prediction to timings
+    """
+    for stage, seconds in (('preprocess', preprocessed - start), ('predict_proba', predicted - preprocessed)):
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    if explain:
+        timings['top_reasons'] = timings.get('top_reasons', 0.0) + time.perf_counter() - predicted
+
 def generate_sample_data(n_samples=1000):
     """
     Generate sample data for training the model
     """
+    import pandas as pd
+    
     np.random.seed(42)
     
     # Generate base features
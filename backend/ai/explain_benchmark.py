@@ -0,0 +1,53 @@
+"""
+Measure what per-prediction explanations cost on top of scoring
+
+    python explain_benchmark.py
+
+Uses dropout_model.pkl when it exists (otherwise trains one on 2000 sample rows) and
+times predict_dropout_risk_batch with and without explanations, plus the decision
+path walk (FlatForest.explain) on its own.
+"""
+import time
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from feature_transform import RAW_FEATURES
+
+BATCH_SIZES = [1, 1000, 10000]
+
+def time_call(function, repeats):
+    """
+    Best of repeats wall-clock seconds for function()
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def compare_explanations(model, n_students):
+    """
+    Return scoring timings with and without explanations for one batch size
+    """
+    students = generate_sample_data(n_students)[RAW_FEATURES]
+    records = students.to_dict('records')
+    X = model.transform.transform_array(students.values)
+    repeats = 20 if n_students == 1 else 3
+
+    return {
+        'n_students': n_students,
+        'scores_seconds': time_call(lambda: model.predict_dropout_risk_batch(records, explain=False), repeats),
+        'explained_seconds': time_call(lambda: model.predict_dropout_risk_batch(records), repeats),
+        'paths_seconds': time_call(lambda: model.explainer.explain(X), repeats)
+    }
+
+if __name__ == "__main__":
+    model = DropoutPredictionModel()
+    if not model.load_model():
+        model.train_model(generate_sample_data(2000), save=False)
+
+    results = [compare_explanations(model, n) for n in BATCH_SIZES]
+
+    print("\nStudents  Scores only   Explained   (path walk)")
+    for r in results:
+        print(f"{r['n_students']:<9} {r['scores_seconds'] * 1000:>9.2f}ms {r['explained_seconds'] * 1000:>9.2f}ms"
+              f" {r['paths_seconds'] * 1000:>11.2f}ms")
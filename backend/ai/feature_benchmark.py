@@ -0,0 +1,78 @@
+"""
+Compare per-student feature extraction with the vectorized feature builder
+
+    python feature_benchmark.py
+
+The per-student path groups record dicts by student and calls extract_features_from_student
+twice per student (once for the features, once inside calculate_dropout_label), as
+fetch_student_data_by_document does. The vectorized path runs build_features once over flat
+columns; its time is reported both from ready columns and including the conversion of the
+record dicts into a DataFrame.
+"""
+import time
+import numpy as np
+import pandas as pd
+from feature_builder import build_features
+from fetch_and_train_from_mongodb import extract_features_from_student, calculate_dropout_label
+from sample_records import generate_records
+
+STUDENT_COUNTS = [10000, 100000]
+
+def per_student_features(students, academic_records, attendance_records):
+    """
+    Reference path: group record dicts in Python and extract features student by student
+    """
+    academic_by_student = {}
+    for record in academic_records:
+        academic_by_student.setdefault(record['student_id'], []).append(record)
+    attendance_by_student = {}
+    for record in attendance_records:
+        attendance_by_student.setdefault(record['student_id'], []).append(record)
+
+    rows = []
+    for student in students:
+        student_academic = academic_by_student.get(student['_id'], [])
+        features = extract_features_from_student(student, student_academic,
+                                                 attendance_by_student.get(student['_id'], []))
+        features['dropout'] = calculate_dropout_label(student, student_academic)
+        rows.append(features)
+    return rows
+
+def compare_feature_builders(n_students):
+    """
+    Return per-student and vectorized timings for one cohort size
+    """
+    student_ids, academic, attendance, _ = generate_records(n_students)
+    students = [{'_id': student_id} for student_id in student_ids]
+    academic_records = academic.to_dict('records')
+    attendance_records = attendance.to_dict('records')
+
+    start = time.perf_counter()
+    per_student_features(students, academic_records, attendance_records)
+    per_student_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_features(student_ids, academic, attendance)
+    columns_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_features(student_ids, pd.DataFrame(academic_records), pd.DataFrame(attendance_records))
+    documents_seconds = time.perf_counter() - start
+
+    return {
+        'n_students': n_students,
+        'n_records': len(academic) + len(attendance),
+        'per_student_seconds': per_student_seconds,
+        'vectorized_seconds': columns_seconds,
+        'vectorized_from_documents_seconds': documents_seconds
+    }
+
+if __name__ == "__main__":
+    np.random.seed(42)
+    results = [compare_feature_builders(n) for n in STUDENT_COUNTS]
+
+    print("\nStudents  Records   Per-student   Vectorized   (from dicts)   Speedup")
+    for r in results:
+        print(f"{r['n_students']:<9} {r['n_records']:<9} {r['per_student_seconds']:>9.2f}s"
+              f" {r['vectorized_seconds']:>11.3f}s {r['vectorized_from_documents_seconds']:>12.3f}s"
+              f" {r['per_student_seconds'] / r['vectorized_seconds']:>8.0f}x")
@@ -0,0 +1,122 @@
+"""
+Vectorized feature extraction over whole record sets
+
+build_features takes the academic, attendance and (optionally) fee records of all students
+as flat columns - a DataFrame or a dict of arrays, one entry per record - and produces the
+whole feature matrix in one pass. Each record is mapped to its student's row with a single
+hash lookup, and every per-student sum is one grouped reduction (np.bincount) over the
+record columns, so there is no Python loop per student or per record.
+
+The features are the ones fetch_and_train_from_mongodb.extract_features_from_student
+computes for one student at a time, which is kept as the reference implementation.
+
+features_from_totals turns per-student totals into features. It is shared by
+build_features, by fetch_student_data (totals from MongoDB aggregation pipelines) and by
+the feature store reader (totals kept as running sums), so the formulas live in one place.
+They are the ones the backend serves predictions with (StudentFeatures.toModelFeatures):
+
+- cgpa is the credit-weighted grade point of passed records (result_status 'Pass'), as
+  AcademicDetails.calculateOverallCGPA computes it, rounded to CGPA_DECIMALS places
+- backlogs counts 'F' grades and assignments_submitted counts all academic records
+- attendance pools present and total classes over all attendance records
+- pending_fee_ratio is pending over billed fees, and 0 for a student with nothing billed
+  (no fee records included)
+"""
+import numpy as np
+from feature_transform import RAW_FEATURES
+
+# Decimal places the CGPA is rounded to, as the backend shows and serves it
+CGPA_DECIMALS = 2
+
+def group_rows(student_ids, record_student_ids):
+    """
+    Row of each record's student in student_ids, or -1 for records of unknown students
+    """
+    import pandas as pd
+
+    return pd.Index(student_ids).get_indexer(record_student_ids)
+
+def column(records, name, default=0.0):
+    """
+    One numeric column of a record set as float64, with missing values set to default
+    """
+    if records is None or name not in records:
+        n = 0 if records is None else len(records['student_id'])
+        return np.full(n, default, dtype=np.float64)
+    values = np.asarray(records[name], dtype=np.float64)
+    return np.where(np.isnan(values), default, values)
+
+def grouped_sum(rows, values, n):
+    """
+    Sum values per row index (records with row -1 are dropped)
+    """
+    known = rows >= 0
+    return np.bincount(rows[known], weights=values[known], minlength=n)
+
+def ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+def features_from_totals(totals):
+    """
+    Compute the raw features from per-student totals
+    totals maps grade_points, credits (passed records only), backlogs, academic_records,
+    present_classes, total_classes, fee_total and fee_pending to arrays with one entry per
+    student. Returns {feature: float64 array} in RAW_FEATURES order
+    """
+    totals = {name: np.asarray(values, dtype=np.float64) for name, values in totals.items()}
+    cgpa = np.round(ratio(totals['grade_points'], totals['credits']), CGPA_DECIMALS)
+    pending_fee_ratio = ratio(totals['fee_pending'], totals['fee_total'])
+
+    return {
+        'attendance': ratio(totals['present_classes'] * 100, totals['total_classes']),
+        'cgpa': cgpa,
+        'backlogs': totals['backlogs'],
+        'assignments_submitted': totals['academic_records'],
+        'pending_fee_ratio': pending_fee_ratio
+    }
+
+def build_features(student_ids, academic, attendance, fees=None):
+    """
+    Build the raw feature matrix for all students from flat record columns
+    academic needs student_id, grade_point, credits_earned, grade and result_status (records
+    without it do not count towards the CGPA); attendance needs student_id, total_classes and
+    present_classes; fees needs student_id, total_amount and pending_amount. Returns a
+    DataFrame with RAW_FEATURES, one row per student_ids entry.
+    """
+    import pandas as pd
+
+    n = len(student_ids)
+
+    # Academic records: CGPA, backlogs and the record count (assignments proxy)
+    rows = group_rows(student_ids, academic['student_id'])
+    failed = np.zeros(len(rows))
+    if 'grade' in academic:
+        failed = (np.asarray(academic['grade'], dtype=object) == 'F').astype(np.float64)
+    # Only passed records count towards the CGPA
+    passed = np.zeros(len(rows))
+    if 'result_status' in academic:
+        passed = (np.asarray(academic['result_status'], dtype=object) == 'Pass').astype(np.float64)
+    credits = column(academic, 'credits_earned') * passed
+    totals = {
+        'grade_points': grouped_sum(rows, column(academic, 'grade_point') * credits, n),
+        'credits': grouped_sum(rows, credits, n),
+        'backlogs': grouped_sum(rows, failed, n),
+        'academic_records': grouped_sum(rows, np.ones(len(rows)), n)
+    }
+
+    # Attendance records
+    rows = group_rows(student_ids, attendance['student_id'])
+    totals['total_classes'] = grouped_sum(rows, column(attendance, 'total_classes'), n)
+    totals['present_classes'] = grouped_sum(rows, column(attendance, 'present_classes'), n)
+
+    # Fee records
+    totals['fee_total'] = totals['fee_pending'] = np.zeros(n)
+    if fees is not None:
+        rows = group_rows(student_ids, fees['student_id'])
+        totals['fee_total'] = grouped_sum(rows, column(fees, 'total_amount'), n)
+        totals['fee_pending'] = grouped_sum(rows, column(fees, 'pending_amount'), n)
+
+    features = features_from_totals(totals)
+    features['backlogs'] = features['backlogs'].astype(np.int64)
+    features['assignments_submitted'] = features['assignments_submitted'].astype(np.int64)
+    return pd.DataFrame(features, columns=RAW_FEATURES)
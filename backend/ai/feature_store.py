@@ -0,0 +1,101 @@
+"""
+Read access to the per-student feature store
+
+The Node backend keeps one document per student in the studentfeatures collection
+(models/StudentFeatures.js) holding running sums of that student's records:
+
+    grade_points, credits           passed subjects only, for CGPA
+    backlogs, academic_records      'F' grades and number of academic records
+    present_classes, total_classes  attendance across all subjects
+    fee_total, fee_pending          billed and pending fees across all semesters
+
+Mongoose hooks on AcademicDetails, Attendance and FeeManagement apply each change to the
+sums as it happens, so reading a student's features is one indexed lookup and reading a
+whole cohort is one scan of a compact collection, with no re-aggregation of history.
+The features are derived from the sums exactly as StudentFeatures.toModelFeatures does.
+"""
+import numpy as np
+from feature_transform import RAW_FEATURES
+from feature_builder import features_from_totals
+
+FEATURE_STORE_COLLECTION = 'studentfeatures'
+SUM_FIELDS = ('grade_points', 'credits', 'backlogs', 'academic_records',
+              'present_classes', 'total_classes', 'fee_total', 'fee_pending')
+
+# Documents fetched per round trip when reading the whole store
+CURSOR_BATCH_SIZE = 5000
+
+def features_from_sums(sums):
+    """
+    Compute the model's raw features from {sum field: array} columns
+    Returns {feature: float64 array} in RAW_FEATURES order
+    """
+    return features_from_totals({field: sums[field] for field in SUM_FIELDS})
+
+def has_feature_store(db):
+    """
+    True if the feature store collection has any entries
+    """
+    return db[FEATURE_STORE_COLLECTION].find_one({}, {'_id': 1}) is not None
+
+def get_student_features(db, student_id):
+    """
+    Return one student's raw features as a dict, or None if the student has no entry
+    """
+    entry = db[FEATURE_STORE_COLLECTION].find_one({'student_id': student_id})
+    if entry is None:
+        return None
+    features = features_from_sums({field: [entry.get(field) or 0] for field in SUM_FIELDS})
+    return {feature: float(features[feature][0]) for feature in RAW_FEATURES}
+
+def read_feature_store(db, since=None):
+    """
+    Stream the feature store into NumPy columns
+    If since is given, only entries updated after it are read.
+    Returns (student_ids, {feature: float64 array}) with rows in student_ids order
+    """
+    query = {} if since is None else {'updatedAt': {'$gt': since}}
+    projection = {field: 1 for field in SUM_FIELDS}
+    projection['student_id'] = 1
+    projection['_id'] = 0
+
+    collection = db[FEATURE_STORE_COLLECTION]
+    n = collection.count_documents(query)
+    student_ids = []
+    sums = {field: np.zeros(n, dtype=np.float64) for field in SUM_FIELDS}
+
+    for row, entry in enumerate(collection.find(query, projection, batch_size=CURSOR_BATCH_SIZE)):
+        # Entries added after the count are picked up by the next read
+        if row >= n:
+            break
+        student_ids.append(entry['student_id'])
+        for field in SUM_FIELDS:
+            sums[field][row] = entry.get(field) or 0
+
+    # Entries removed after the count leave unused rows at the end
+    n = len(student_ids)
+    sums = {field: values[:n] for field, values in sums.items()}
+    return student_ids, features_from_sums(sums)
+
+def iter_feature_store(db, chunk_rows=50000, since=None):
+    """
+    Stream the feature store as chunks of up to chunk_rows students
+    Yields (student_ids, {feature: float64 array}) per chunk, so only one chunk of sums is
+    held in memory however large the store is (for out-of-core training).
+    """
+    query = {} if since is None else {'updatedAt': {'$gt': since}}
+    projection = {field: 1 for field in SUM_FIELDS}
+    projection['student_id'] = 1
+    projection['_id'] = 0
+
+    cursor = db[FEATURE_STORE_COLLECTION].find(query, projection, batch_size=min(chunk_rows, CURSOR_BATCH_SIZE))
+    student_ids, sums = [], {field: [] for field in SUM_FIELDS}
+    for entry in cursor:
+        student_ids.append(entry['student_id'])
+        for field in SUM_FIELDS:
+            sums[field].append(entry.get(field) or 0)
+        if len(student_ids) == chunk_rows:
+            yield student_ids, features_from_sums(sums)
+            student_ids, sums = [], {field: [] for field in SUM_FIELDS}
+    if student_ids:
+        yield student_ids, features_from_sums(sums)
@@ -0,0 +1,95 @@
+"""
+Frozen inference-time preprocessing for the dropout prediction model
+"""
+import numpy as np
+
+# Raw fields supplied for each student, in model order
+RAW_FEATURES = ['attendance', 'cgpa', 'backlogs', 'assignments_submitted', 'pending_fee_ratio']
+
+# Raw fields followed by the derived ratio features built in preprocess_data
+MODEL_FEATURES = RAW_FEATURES + ['attendance_cgpa_ratio', 'backlogs_assignments_ratio']
+
+class FeatureTransform:
+    """
+    Read-only copy of the training-time preprocessing
+    Holds the training medians (for missing values) and the fitted scaler statistics,
+    and applies them with plain NumPy arithmetic. Nothing here is ever refit, so one
+    instance can be shared by concurrent predictions.
+    """
+    def __init__(self, medians, mean, scale):
+        self.medians = np.array(medians, dtype=np.float64)
+        self.mean = np.array(mean, dtype=np.float64)
+        self.scale = np.array(scale, dtype=np.float64)
+        self.n_features = len(MODEL_FEATURES)
+
+    @classmethod
+    def from_scaler(cls, scaler, medians=None):
+        """
+        Build a transform from a fitted StandardScaler
+        medians maps raw feature name to its training median; models saved before
+        medians were recorded fall back to the scaler means of the raw features
+        """
+        if medians is None:
+            medians = dict(zip(RAW_FEATURES, scaler.mean_[:len(RAW_FEATURES)]))
+        return cls([medians[name] for name in RAW_FEATURES], scaler.mean_, scaler.scale_)
+
+    def transform_one(self, student_data):
+        """
+        Turn one student (dict of raw features or array in RAW_FEATURES order)
+        into a scaled feature vector
+        """
+        x = np.empty(self.n_features, dtype=np.float64)
+        if isinstance(student_data, dict):
+            for i, name in enumerate(RAW_FEATURES):
+                value = student_data.get(name)
+                x[i] = self.medians[i] if value is None else value
+        else:
+            x[:len(RAW_FEATURES)] = student_data
+
+        # Missing values take the training median
+        missing = np.isnan(x[:len(RAW_FEATURES)])
+        if missing.any():
+            x[:len(RAW_FEATURES)][missing] = self.medians[missing]
+
+        # Derived features, same definitions as preprocess_data
+        x[5] = x[0] / (x[1] + 1)
+        x[6] = x[2] / (x[3] + 1)
+
+        x -= self.mean
+        x /= self.scale
+        return x.reshape(1, -1)
+
+    def fill_missing(self, raw):
+        """
+        An (n_students, len(RAW_FEATURES)) array of raw features with missing values
+        replaced by the training medians
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+        missing = np.isnan(raw)
+        return np.where(missing, self.medians, raw) if missing.any() else raw
+
+    def transform_array(self, raw):
+        """
+        Turn an (n_students, len(RAW_FEATURES)) array of raw features
+        into an (n_students, len(MODEL_FEATURES)) scaled feature matrix
+        """
+        n_raw = len(RAW_FEATURES)
+        X = np.empty((len(raw), self.n_features), dtype=np.float64)
+        # Missing values take the training median
+        X[:, :n_raw] = self.fill_missing(raw)
+
+        # Derived features, same definitions as preprocess_data
+        X[:, 5] = X[:, 0] / (X[:, 1] + 1)
+        X[:, 6] = X[:, 2] / (X[:, 3] + 1)
+
+        X -= self.mean
+        X /= self.scale
+        return X
+
+    def transform_records(self, records):
+        """
+        Turn a list of student dicts into a scaled feature matrix
+        """
+        raw = np.array([[record.get(name, np.nan) for name in RAW_FEATURES] for record in records],
+                       dtype=np.float64)
+        return self.transform_array(raw)
@@ -4,14 +4,16 @@ Script to fetch real student data from MongoDB and train the dropout prediction
 import sys
 import os
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
 from pymongo import MongoClient
 import numpy as np
 
 # Add the parent directory to the path so we can import the dropout_prediction module
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
-from dropout_prediction import DropoutPredictionModel
+from dropout_prediction import DropoutPredictionModel, TRAINING_PROFILES
+from feature_store import has_feature_store, read_feature_store, iter_feature_store
+from feature_builder import features_from_totals, CGPA_DECIMALS
 
 def connect_to_mongodb():
     """
@@ -34,19 +36,21 @@ def extract_features_from_student(student, academic_details, attendance_records)
     student_id = str(student.get('_id', ''))
     name = student.get('name', '')
     
-    # Calculate CGPA from academic details
+    # Calculate CGPA from the passed subjects, as the ERP does (calculateOverallCGPA)
     if academic_details:
         total_grade_points = 0
         total_credits = 0
         
         for record in academic_details:
+            if record.get('result_status') != 'Pass':
+                continue
             grade_point = record.get('grade_point', 0)
             credits_earned = record.get('credits_earned', 0)
             
             total_grade_points += grade_point * credits_earned
             total_credits += credits_earned
         
-        cgpa = total_grade_points / total_credits if total_credits > 0 else 0
+        cgpa = round(total_grade_points / total_credits, CGPA_DECIMALS) if total_credits > 0 else 0
     else:
         cgpa = 0
     
@@ -105,23 +109,226 @@ def calculate_dropout_label(student, academic_details):
     # Convert to binary label with some randomness
     return 1 if np.random.random() < dropout_score else 0
 
-def fetch_student_data(db):
+def find_changed_student_ids(db, since):
     """
-    Fetch student data from MongoDB collections
+    Return ids of students with academic, attendance or fee records updated after since
+    """
+    changed_ids = set()
+    for collection in (db.academicdetails, db.attendances, db.feemanagements):
+        # distinct runs on the server and only returns the ids
+        changed_ids.update(collection.distinct('student_id', {'updatedAt': {'$gt': since}}))
+    return list(changed_ids)
+
+# Documents fetched per round trip when streaming students and aggregate results
+CURSOR_BATCH_SIZE = 5000
+
+def academic_pipeline(record_query):
+    """
+    CGPA (passed subjects only), backlog and assignment aggregates per student from academicdetails
+    """
+    passed = {'$eq': ['$result_status', 'Pass']}
+    return [
+        {'$match': record_query},
+        {'$project': {
+            'student_id': 1,
+            'grade_points': {'$cond': [passed, {'$multiply': [{'$ifNull': ['$grade_point', 0]},
+                                                              {'$ifNull': ['$credits_earned', 0]}]}, 0]},
+            'credits': {'$cond': [passed, {'$ifNull': ['$credits_earned', 0]}, 0]},
+            'failed': {'$cond': [{'$eq': ['$grade', 'F']}, 1, 0]}
+        }},
+        {'$group': {
+            '_id': '$student_id',
+            'grade_points': {'$sum': '$grade_points'},
+            'credits': {'$sum': '$credits'},
+            'backlogs': {'$sum': '$failed'},
+            'records': {'$sum': 1}
+        }}
+    ]
+
+def attendance_pipeline(record_query):
+    """
+    Total and attended classes per student from attendances (the Attendance model)
+    """
+    return [
+        {'$match': record_query},
+        {'$project': {'student_id': 1, 'total_classes': 1, 'present_classes': 1}},
+        {'$group': {
+            '_id': '$student_id',
+            'total_classes': {'$sum': {'$ifNull': ['$total_classes', 0]}},
+            'present_classes': {'$sum': {'$ifNull': ['$present_classes', 0]}}
+        }}
+    ]
+
+def fee_pipeline(record_query):
+    """
+    Billed and pending fee totals per student from feemanagements (the FeeManagement model)
+    """
+    return [
+        {'$match': record_query},
+        {'$project': {'student_id': 1, 'total_amount': 1, 'pending_amount': 1}},
+        {'$group': {
+            '_id': '$student_id',
+            'total_amount': {'$sum': {'$ifNull': ['$total_amount', 0]}},
+            'pending_amount': {'$sum': {'$ifNull': ['$pending_amount', 0]}}
+        }}
+    ]
+
+def stream_group_columns(collection, pipeline, row_index, fields):
+    """
+    Run an aggregation and stream its per-student results into NumPy columns
+    Returns ({field: float64 array aligned with row_index}, has_rows bool array).
+    Groups for students not in row_index are skipped.
+    """
+    n = len(row_index)
+    columns = {field: np.zeros(n, dtype=np.float64) for field in fields}
+    has_rows = np.zeros(n, dtype=bool)
+
+    cursor = collection.aggregate(pipeline, batchSize=CURSOR_BATCH_SIZE, allowDiskUse=True)
+    for group in cursor:
+        row = row_index.get(group['_id'])
+        if row is None:
+            continue
+        has_rows[row] = True
+        for field in fields:
+            columns[field][row] = group[field]
+    return columns, has_rows
+
+def dropout_labels(features):
+    """
+    Dropout label heuristic of calculate_dropout_label, one random draw per student
+    """
+    # As before, attendance is not passed to the heuristic, so its term is always 0.4
+    dropout_score = (
+        0.4 +
+        (10 - features['cgpa']) / 10 * 0.3 +
+        np.minimum(features['backlogs'] / 5, 1) * 0.3
+    )
+    return (np.random.random(len(dropout_score)) < dropout_score).astype(np.int64)
+
+def build_training_frame(features):
+    """
+    Build the training DataFrame from {feature: array} columns and add the dropout label
+    """
+    df = pd.DataFrame(dict(features, dropout=dropout_labels(features)), copy=False)
+    print(f"Created training dataset with {len(df)} records")
+    print(f"Dropout rate: {df['dropout'].mean():.2%}")
+    return df
+
+def fetch_student_data_from_store(db, since=None):
+    """
+    Fetch student training data from the per-student feature store
+    Reads one compact document per student; nothing is aggregated.
+    If since is given, only students whose sums changed after it are included
+    """
+    print("Fetching student data from the feature store...")
+    
+    student_ids, features = read_feature_store(db, since=since)
+    print(f"Found {len(student_ids)} students in the feature store")
+    if not student_ids:
+        print("No training data found")
+        return None
+    return build_training_frame(features)
+
+def iter_student_chunks(db, chunk_rows):
+    """
+    Yield training chunks of up to chunk_rows students from the feature store
+    Each chunk is {column: array} with the dropout label, for train_model_chunked
+    """
+    for _, features in iter_feature_store(db, chunk_rows):
+        yield dict(features, dropout=dropout_labels(features))
+
+def fetch_student_data(db, since=None):
+    """
+    Fetch student training data from MongoDB collections
+    The feature store is used when it has been populated by the backend. Otherwise the
+    academic, attendance and fee aggregates are computed by one aggregation pipeline per
+    collection on the server; only one small summary document per student is transferred.
+    If since is given, only students whose records changed after it are included
+    """
+    if has_feature_store(db):
+        return fetch_student_data_from_store(db, since=since)
+    
+    print("Fetching student data from MongoDB...")
+    
+    try:
+        student_query = {}
+        record_query = {}
+        if since is not None:
+            changed_ids = find_changed_student_ids(db, since)
+            print(f"Found {len(changed_ids)} students with records changed since {since}")
+            student_query = {'_id': {'$in': changed_ids}}
+            record_query = {'student_id': {'$in': changed_ids}}
+        
+        # Fetch student ids only; their position is the row of every feature column
+        cursor = db.students.find(student_query, {'_id': 1}, batch_size=CURSOR_BATCH_SIZE)
+        row_index = {student['_id']: row for row, student in enumerate(cursor)}
+        n = len(row_index)
+        print(f"Found {n} students")
+        if n == 0:
+            print("No training data found")
+            return None
+        
+        academic, has_academic = stream_group_columns(
+            db.academicdetails, academic_pipeline(record_query), row_index,
+            ('grade_points', 'credits', 'backlogs', 'records'))
+        attendance, _ = stream_group_columns(
+            db.attendances, attendance_pipeline(record_query), row_index,
+            ('total_classes', 'present_classes'))
+        fees, has_fees = stream_group_columns(
+            db.feemanagements, fee_pipeline(record_query), row_index,
+            ('total_amount', 'pending_amount'))
+        print(f"Aggregated academic records for {int(has_academic.sum())} students, "
+              f"fee records for {int(has_fees.sum())} students")
+        
+        # Same features as extract_features_from_student and the feature store, computed
+        # column-wise. Students without fee records have nothing pending (ratio 0)
+        features = features_from_totals({
+            'grade_points': academic['grade_points'],
+            'credits': academic['credits'],
+            'backlogs': academic['backlogs'],
+            'academic_records': academic['records'],
+            'present_classes': attendance['present_classes'],
+            'total_classes': attendance['total_classes'],
+            'fee_total': fees['total_amount'],
+            'fee_pending': fees['pending_amount']
+        })
+        features['backlogs'] = features['backlogs'].astype(np.int64)
+        features['assignments_submitted'] = features['assignments_submitted'].astype(np.int64)
+        return build_training_frame(features)
+            
+    except Exception as e:
+        print(f"Error fetching student data: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+def fetch_student_data_by_document(db, since=None):
+    """
+    Fetch student data by pulling every document and grouping it in Python
+    The original implementation, kept as the reference for parity tests and
+    mongo_benchmark.py; fetch_student_data is the one to use
     """
     print("Fetching student data from MongoDB...")
     
     try:
+        student_query = {}
+        record_query = {}
+        if since is not None:
+            changed_ids = find_changed_student_ids(db, since)
+            print(f"Found {len(changed_ids)} students with records changed since {since}")
+            student_query = {'_id': {'$in': changed_ids}}
+            record_query = {'student_id': {'$in': changed_ids}}
+        
         # Fetch students
-        students = list(db.students.find({}))
+        students = list(db.students.find(student_query))
         print(f"Found {len(students)} students")
         
         # Fetch academic details
-        academic_details = list(db.academicdetails.find({}))
+        academic_details = list(db.academicdetails.find(record_query))
         print(f"Found {len(academic_details)} academic records")
         
         # Fetch attendance records
-        attendance_records = list(db.attendance.find({}))
+        attendance_records = list(db.attendances.find(record_query))
         print(f"Found {len(attendance_records)} attendance records")
         
         # Group academic details by student
@@ -172,7 +379,7 @@ def fetch_student_data(db):
         traceback.print_exc()
         return None
 
-def train_model_with_real_data(data):
+def train_model_with_real_data(data, profile='default'):
     """
     Train the model with the provided real data
     """
@@ -182,7 +389,7 @@ def train_model_with_real_data(data):
     model = DropoutPredictionModel('dropout_model_mongodb.pkl')
     
     # Train the model
-    trained_model = model.train_model(data)
+    trained_model = model.train_model(data, profile=profile)
     
     # Test with a sample student
     sample_student = {
@@ -202,9 +409,44 @@ def train_model_with_real_data(data):
     
     return model
 
-def main():
+def update_model_with_changed_data(db):
+    """
+    Incrementally update the saved model with students whose records changed since it was trained
+    """
+    model = DropoutPredictionModel('dropout_model_mongodb.pkl')
+    if not model.load_model():
+        print("No existing model to update. Run a full training first.")
+        return None
+    
+    # updatedAt is stored in UTC; models saved before trained_at was UTC hold naive local time
+    since = model.trained_at.astimezone(timezone.utc)
+    data = fetch_student_data(db, since=since)
+    if data is None or len(data) == 0:
+        print("No changed records since the last training. Nothing to do.")
+        return model
+    
+    model.update_model(data)
+    return model
+
+def train_model_out_of_core(db, chunk_rows, profile='compact'):
+    """
+    Train on the feature store one chunk of students at a time
+    """
+    if not has_feature_store(db):
+        print("Out-of-core training reads the feature store, which has not been populated")
+        return None
+    
+    model = DropoutPredictionModel('dropout_model_mongodb.pkl')
+    model.train_model_chunked(iter_student_chunks(db, chunk_rows), profile=profile)
+    return model
+
+def main(incremental=False, profile='default', out_of_core=False, chunk_rows=50000):
     """
     Main function to connect to MongoDB, fetch data, and train the model
+    With incremental=True, new trees are added for changed students instead of refitting
+    profile picks the forest settings of a full training (see TRAINING_PROFILES)
+    With out_of_core=True, students are streamed from the feature store in chunks of
+    chunk_rows, so the training set never has to fit in memory
     """
     print("=" * 60)
     print("Student Dropout Prediction Model Training with MongoDB Data")
@@ -215,10 +457,26 @@ def main():
     try:
         # Connect to MongoDB
         db = connect_to_mongodb()
-        if not db:
+        if db is None:
             print("Failed to connect to MongoDB. Exiting.")
             return
         
+        if incremental:
+            model = update_model_with_changed_data(db)
+            if model is not None and model.training_metrics:
+                metrics = model.training_metrics
+                print(f"Incremental update took {metrics['fit_seconds']:.2f}s "
+                      f"({metrics['n_estimators']} trees in the forest)")
+            return
+        
+        if out_of_core:
+            model = train_model_out_of_core(db, chunk_rows, profile)
+            if model is not None:
+                metrics = model.training_metrics
+                print(f"Trained on {metrics['n_train']} students in {metrics['n_chunks']} chunks, "
+                      f"held-out accuracy {metrics['accuracy']:.2%}")
+            return
+        
         # Fetch student data
         data = fetch_student_data(db)
         if data is None or len(data) == 0:
@@ -226,7 +484,7 @@ def main():
             return
         
         # Train the model
-        model = train_model_with_real_data(data)
+        model = train_model_with_real_data(data, profile)
         
         print("\n" + "=" * 60)
         print("Training Completed Successfully!")
@@ -241,4 +499,19 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train the dropout model from MongoDB data')
+    parser.add_argument('--incremental', action='store_true',
+                        help='add trees for students changed since the last training instead of refitting')
+    parser.add_argument('--profile', choices=list(TRAINING_PROFILES),
+                        help='forest settings for a full training; compact bounds depth and leaves '
+                             '(default: default, or compact with --out-of-core)')
+    parser.add_argument('--out-of-core', action='store_true',
+                        help='stream students from the feature store in chunks instead of loading them all')
+    parser.add_argument('--chunk-rows', type=int, default=50000, help='students per chunk with --out-of-core')
+    args = parser.parse_args()
+    
+    profile = args.profile or ('compact' if args.out_of_core else 'default')
+    main(incremental=args.incremental, profile=profile, out_of_core=args.out_of_core,
+         chunk_rows=args.chunk_rows)
\ No newline at end of file
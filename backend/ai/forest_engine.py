@@ -0,0 +1,204 @@
+"""
+Array-backed inference engine for the trained RandomForestClassifier
+
+All trees of the forest are compiled into a handful of contiguous NumPy arrays
+and every tree is walked at once, level by level, for all rows. For a single
+student this skips sklearn's per-call input validation and per-estimator
+dispatch, which dominate the cost of RandomForestClassifier.predict_proba.
+"""
+import numpy as np
+
+class FlatForest:
+    """
+    A RandomForestClassifier flattened into contiguous node arrays
+    Nodes of all trees share one index space; leaves point to themselves so a
+    row that reaches a leaf early simply stays there until max_depth steps are done.
+    """
+    # Node arrays, in the order they are stored on disk by model_artifact
+    ARRAY_NAMES = ('feature', 'threshold', 'children', 'leaf_proba', 'roots')
+
+    def __init__(self, feature, threshold, children, leaf_proba, roots, max_depth, classes,
+                 feature_importances=None):
+        self.feature = feature          # split feature per node (0 for leaves)
+        self.threshold = threshold      # split threshold per node
+        self.children = children        # (n_nodes, 2): [right, left] child per node
+        self.leaf_proba = leaf_proba    # (n_nodes, n_classes) normalized class probabilities
+        self.roots = roots              # root node index of each tree
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.feature_importances_ = feature_importances
+
+    @classmethod
+    def from_sklearn(cls, forest, compact=False):
+        """
+        Compile a fitted sklearn RandomForestClassifier
+        Pass compact=True for the float32 / int32 node arrays of compact()
+        """
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+        n_nodes = int(node_counts.sum())
+        n_classes = trees[0].value.shape[2]
+
+        feature = np.zeros(n_nodes, dtype=np.intp)
+        threshold = np.zeros(n_nodes, dtype=np.float64)
+        children = np.zeros((n_nodes, 2), dtype=np.intp)
+        leaf_proba = np.zeros((n_nodes, n_classes), dtype=np.float64)
+
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count) + offset
+            block = slice(offset, offset + tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            feature[block] = np.where(is_leaf, 0, tree.feature)
+            threshold[block] = tree.threshold
+            children[block, 0] = np.where(is_leaf, nodes, tree.children_right + offset)
+            children[block, 1] = np.where(is_leaf, nodes, tree.children_left + offset)
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            leaf_proba[block] = value / normalizer
+
+        max_depth = max(tree.max_depth for tree in trees)
+        flat = cls(feature, threshold, children, leaf_proba, offsets.astype(np.intp),
+                   max_depth, np.asarray(forest.classes_), np.asarray(forest.feature_importances_))
+        return flat.compact() if compact else flat
+
+    def compact(self):
+        """
+        The same forest with float32 thresholds and leaf probabilities and int32 indices
+        Node arrays take a little over half the memory. Each threshold is rounded down to
+        the nearest float32, so a float32 feature goes left exactly when it did against
+        the float64 threshold and every row reaches the same leaves; probabilities change
+        only by float32 rounding of the leaf values (below 1e-7).
+        """
+        threshold = self.threshold.astype(np.float32)
+        rounded_up = threshold.astype(np.float64) > self.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+        return FlatForest(self.feature.astype(np.int32), threshold, self.children.astype(np.int32),
+                          self.leaf_proba.astype(np.float32), self.roots.astype(np.int32),
+                          self.max_depth, self.classes_, self.feature_importances_)
+
+    def to_arrays(self):
+        """
+        Return the node arrays as {name: array}
+        """
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    @classmethod
+    def from_arrays(cls, arrays, max_depth, classes, feature_importances=None):
+        """
+        Rebuild a forest from node arrays (which may be read-only memory maps)
+        """
+        return cls(*(arrays[name] for name in cls.ARRAY_NAMES), max_depth,
+                   np.asarray(classes), feature_importances)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """
+        Return the leaf index reached in every tree, shape (n_rows, n_trees)
+        """
+        # sklearn trees compare float32 features against float64 thresholds (float32 in a
+        # compact forest, rounded so the comparison comes out the same)
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[nodes, go_left.view(np.int8)]
+
+        return nodes
+
+    def predict_proba(self, X):
+        """
+        Class probabilities averaged over all trees, like RandomForestClassifier.predict_proba
+        """
+        leaves = self.apply(X)
+        return self.leaf_proba[leaves].sum(axis=1, dtype=np.float64) / self.n_estimators
+
+    def explain(self, X, class_index=1):
+        """
+        Per-feature contributions to the probability of one class, for every row
+        Every split on a row's path moves the probability from the node's class
+        distribution to its child's; that change is credited to the split feature
+        (decision path contributions). Averaged over trees, the bias plus a row's
+        contributions add up to predict_proba(X)[:, class_index].
+        Returns (bias, contributions of shape (n_rows, n_features))
+        """
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        value = self.leaf_proba[:, class_index]
+        is_leaf = self.children[:, 0] == np.arange(len(self.children))
+        contributions = np.zeros(n_rows * n_features, dtype=np.float64)
+
+        # One (row, tree) pair per path; pairs are dropped as soon as they reach a
+        # leaf, so deep trees only cost extra for the rows that actually go deep
+        # (a tree that is a single leaf never splits and contributes nothing)
+        split_roots = self.roots[~is_leaf[self.roots]]
+        rows = np.repeat(np.arange(n_rows), len(split_roots))
+        nodes = np.tile(split_roots, n_rows)
+
+        while len(nodes):
+            # Flat (row, feature) slot of every split, accumulated with one bincount per level
+            slots = rows * n_features + self.feature[nodes]
+            go_left = flat_X[slots] <= self.threshold[nodes]
+            next_nodes = self.children[nodes, go_left.view(np.int8)]
+            contributions += np.bincount(slots, weights=value[next_nodes] - value[nodes],
+                                         minlength=n_rows * n_features)
+            active = ~is_leaf[next_nodes]
+            rows = rows[active]
+            nodes = next_nodes[active]
+
+        bias = float(value[self.roots].mean(dtype=np.float64))
+        return bias, contributions.reshape(n_rows, n_features) / self.n_estimators
+
+def benchmark_engines(model, n_runs=2000):
+    """
+    Compare single-row predict_proba latency of the sklearn forest and the flat engine
+    Returns {engine: {'p50_ms': ..., 'p99_ms': ...}}
+    """
+    import time
+    from dropout_prediction import generate_sample_data
+    from feature_transform import RAW_FEATURES
+
+    rows = generate_sample_data(n_runs)[RAW_FEATURES].values
+    X = model.transform.transform_array(rows)
+    engines = {
+        'sklearn': model.model,
+        'flat': FlatForest.from_sklearn(model.model)
+    }
+
+    results = {}
+    for name, engine in engines.items():
+        # Warm up before timing
+        for i in range(50):
+            engine.predict_proba(X[i:i + 1])
+
+        timings = np.empty(n_runs)
+        for i in range(n_runs):
+            start = time.perf_counter()
+            engine.predict_proba(X[i:i + 1])
+            timings[i] = time.perf_counter() - start
+
+        results[name] = {
+            'p50_ms': float(np.percentile(timings, 50) * 1000),
+            'p99_ms': float(np.percentile(timings, 99) * 1000)
+        }
+    return results
+
+if __name__ == "__main__":
+    from dropout_prediction import DropoutPredictionModel
+
+    model = DropoutPredictionModel()
+    model.load_model()
+
+    print("\nSingle-row predict_proba latency:")
+    for name, stats in benchmark_engines(model).items():
+        print(f"  {name:8s} p50 {stats['p50_ms']:.3f} ms   p99 {stats['p99_ms']:.3f} ms")
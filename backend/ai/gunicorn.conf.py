@@ -0,0 +1,51 @@
+"""
+Gunicorn settings for serving the dropout prediction API in production (Linux/macOS)
+
+    cd backend/ai
+    gunicorn -c gunicorn.conf.py api:app
+
+The app, and with it the trained model, is loaded once in the master process and
+then forked into the workers, so the forest's memory is shared copy-on-write
+instead of being deserialized again by every worker.
+
+Send SIGHUP to the master to reload the model from disk: the master loads the
+new model, forks a fresh set of workers from it and gracefully stops the old
+workers once their in-flight requests finish.
+"""
+import gc
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get('DROPOUT_API_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('DROPOUT_API_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'sync'
+
+# Import api.py (and load the model) in the master before forking
+preload_app = True
+
+# Workers write their request metrics to one directory, so /metrics reports all of them
+os.environ.setdefault('DROPOUT_METRICS_DIR', tempfile.mkdtemp(prefix='dropout-metrics-'))
+
+# Training requests can run for a while; give them room before a worker is killed
+timeout = int(os.environ.get('DROPOUT_API_TIMEOUT', 300))
+graceful_timeout = 30
+
+def freeze_heap():
+    """
+    Move everything allocated so far out of the garbage collector's reach, so
+    collections in the workers don't write to (and therefore copy) the shared pages
+    """
+    gc.collect()
+    gc.freeze()
+
+def when_ready(server):
+    freeze_heap()
+    server.log.info("Model loaded in master, forking %s workers", server.cfg.workers)
+
+def on_reload(server):
+    # Runs in the master on SIGHUP, before the replacement workers are forked
+    import api
+    api.reload_model()
+    freeze_heap()
+    server.log.info("Model reloaded from %s", api.model.model_path)
@@ -0,0 +1,69 @@
+"""
+Simple load generator for the dropout prediction API
+
+    python load_test.py --url http://localhost:5001 --concurrency 8 --requests 2000
+
+Sends /predict requests from several threads and prints throughput and latency percentiles.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+SAMPLE_STUDENT = {
+    'attendance': 65,
+    'cgpa': 2.8,
+    'backlogs': 3,
+    'assignments_submitted': 5,
+    'pending_fee_ratio': 0.4
+}
+
+def run_worker(url, n_requests):
+    """
+    Send n_requests sequential predictions over one connection, returning latencies in seconds
+    """
+    session = requests.Session()
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        response = session.post(f"{url}/predict", json=SAMPLE_STUDENT)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_load_test(url, concurrency, total_requests):
+    """
+    Run the load test and return a summary dict
+    """
+    per_worker = total_requests // concurrency
+
+    # Warm up every worker process before timing
+    run_worker(url, concurrency * 2)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(run_worker, [url] * concurrency, [per_worker] * concurrency))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate(results)
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test the dropout prediction API')
+    parser.add_argument('--url', default='http://localhost:5001')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    summary = run_load_test(args.url, args.concurrency, args.requests)
+    print(f"Requests:    {summary['requests']} ({summary['concurrency']} concurrent)")
+    print(f"Throughput:  {summary['throughput_rps']:.1f} req/s")
+    print(f"Latency p50: {summary['p50_ms']:.2f} ms")
+    print(f"Latency p99: {summary['p99_ms']:.2f} ms")
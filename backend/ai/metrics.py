@@ -0,0 +1,255 @@
+"""
+Prometheus metrics for the prediction API, without extra dependencies
+
+Counters, gauges and histograms keep their values in plain Python numbers behind a lock;
+an observation is a bisect and two additions. MetricsRegistry.render() produces the
+Prometheus text exposition format served at /metrics.
+
+Values are kept per process. Under gunicorn, give the registry a directory shared by the
+workers (DROPOUT_METRICS_DIR, set by gunicorn.conf.py): every worker writes its counters
+and histograms there as metrics-<pid>.json at most every METRICS_FLUSH_SECONDS, and the
+worker answering /metrics sums the files of all workers, including workers that have
+exited, so counters keep growing across worker restarts. Gauges describe the process that
+answers the scrape.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TRAINING_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+# How often a worker writes its values to the shared metrics directory
+METRICS_FLUSH_SECONDS = 5
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labelnames, values, extra=()):
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """
+    A named metric with optional labels; values are kept per tuple of label values
+    """
+    type_name = None
+
+    # Values of other processes are added to this process's when the registry is shared
+    shared = False
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def header(self):
+        return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.type_name}']
+
+    def render(self, values=None):
+        """
+        Text exposition lines for the current values, or for values given by a collector
+        """
+        if values is None:
+            with self.lock:
+                values = dict(self.values)
+        lines = self.header()
+        for label_values, value in sorted(values.items()):
+            lines.append(f'{self.name}{format_labels(self.labelnames, label_values)} {format_value(value)}')
+        return lines
+
+    def current_values(self):
+        with self.lock:
+            return dict(self.values)
+
+    def merge_values(self, values, other):
+        """
+        Add values read back from another process to values
+        """
+        for label_values, value in other.items():
+            values[label_values] = values.get(label_values, 0) + value
+
+class Counter(Metric):
+    type_name = 'counter'
+    shared = True
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+class Gauge(Metric):
+    type_name = 'gauge'
+
+    def set(self, value, *label_values):
+        with self.lock:
+            self.values[label_values] = value
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+class Histogram(Metric):
+    type_name = 'histogram'
+    shared = True
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(label_values)
+            if series is None:
+                # Per-bucket (not yet cumulative) counts, the +Inf bucket last, then the sum
+                series = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def current_values(self):
+        with self.lock:
+            return {key: (list(counts), total) for key, (counts, total) in self.values.items()}
+
+    def merge_values(self, values, other):
+        for label_values, (counts, total) in other.items():
+            if len(counts) != len(self.buckets) + 1:
+                continue
+            own_counts, own_total = values.get(label_values, ([0] * len(counts), 0.0))
+            values[label_values] = ([a + b for a, b in zip(own_counts, counts)], own_total + total)
+
+    def render(self, values=None):
+        if values is None:
+            values = self.current_values()
+        lines = self.header()
+        for label_values, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = format_labels(self.labelnames, label_values, [('le', format_value(float(bound)))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labelnames, label_values)
+            lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+class MetricsRegistry:
+    """
+    The metrics of one process, plus collectors that report current state at scrape time
+    A collector is a callable returning a list of (gauge, {label values tuple: value}) pairs
+    for gauges whose values are read from live objects instead of being kept up to date;
+    such gauges are created directly and not added to the registry.
+    With metrics_dir, counters and histograms are summed over all processes writing there.
+    """
+    def __init__(self, metrics_dir=None):
+        self.metrics = []
+        self.collectors = []
+        self.metrics_dir = metrics_dir
+        self.last_flush = time.monotonic()
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self.add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.add(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def flush(self):
+        """
+        Write this process's counters and histograms to the shared directory
+        """
+        self.last_flush = time.monotonic()
+        values = {metric.name: [[list(label_values), value] for label_values, value in metric.current_values().items()]
+                  for metric in self.metrics if metric.shared}
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        path = os.path.join(self.metrics_dir, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp-{threading.get_ident()}'
+        with open(tmp_path, 'w') as f:
+            json.dump(values, f)
+        os.replace(tmp_path, path)
+
+    def maybe_flush(self):
+        """
+        Flush if the registry is shared and METRICS_FLUSH_SECONDS have passed; call per request
+        """
+        if self.metrics_dir is not None and time.monotonic() - self.last_flush >= METRICS_FLUSH_SECONDS:
+            self.flush()
+
+    def merged_values(self):
+        """
+        {metric name: values} of the shared metrics, summed over this and every other process
+        """
+        merged = {metric.name: metric.current_values() for metric in self.metrics if metric.shared}
+        by_name = {metric.name: metric for metric in self.metrics}
+        self.flush()
+        own = f'metrics-{os.getpid()}.json'
+        for name in os.listdir(self.metrics_dir):
+            if name == own or not name.startswith('metrics-') or not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.metrics_dir, name)) as f:
+                    worker = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for metric_name, values in worker.items():
+                if metric_name in merged:
+                    other = {tuple(label_values): value for label_values, value in values}
+                    by_name[metric_name].merge_values(merged[metric_name], other)
+        return merged
+
+    def render(self):
+        merged = self.merged_values() if self.metrics_dir is not None else {}
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render(merged.get(metric.name)))
+        for collector in self.collectors:
+            for metric, values in collector():
+                lines.extend(metric.render(values))
+        return '\n'.join(lines) + '\n'
+
+class StageTimer:
+    """
+    Times consecutive stages of one request
+    mark(stage) charges the time since the previous mark to stage; durations is a plain
+    dict, so DropoutPredictionModel can add its own stages to it (timings=...)
+    """
+    def __init__(self):
+        self.last = time.perf_counter()
+        self.durations = {}
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.durations[stage] = self.durations.get(stage, 0.0) + now - self.last
+        self.last = now
+
+    def skip(self):
+        """
+        Start the next stage now, without charging the time since the last mark
+        """
+        self.last = time.perf_counter()
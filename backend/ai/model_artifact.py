@@ -0,0 +1,221 @@
+"""
+Memory-mappable model artifact format
+
+A model saved to a path without a file extension is written as a directory of versions:
+
+    dropout_model/
+        CURRENT                     name of the version being served
+        20250114T020000_000000/
+            manifest.json           small metadata: features, medians, scaler statistics, forest shape
+            feature.npy             \\
+            threshold.npy            |  FlatForest node arrays for all trees, raw .npy buffers
+            children.npy             |  (float32 / int32 for a compact model)
+            leaf_proba.npy           |
+            roots.npy               /
+            estimator.joblib        the sklearn RandomForestClassifier, only read for the sklearn engine
+
+Each save writes a new version next to the current one and then switches CURRENT with an
+atomic replace, so a process loading the model always finds a complete artifact. The
+previous version is kept for processes still loading it and removed by the next save.
+Artifacts written before versioning (manifest.json directly in the directory) still load.
+
+The node arrays are opened with np.load(mmap_mode='r'), so loading is near-instant
+and every process serving the same artifact shares one page-cache copy of the forest.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+import numpy as np
+from forest_engine import FlatForest
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+ESTIMATOR_FILE = 'estimator.joblib'
+CURRENT_FILE = 'CURRENT'
+
+# Versions kept in an artifact directory (the current one included)
+KEEP_ARTIFACT_VERSIONS = 2
+
+def is_artifact_path(path):
+    """
+    True if path refers to a directory artifact rather than a single pickle file
+    """
+    return os.path.isdir(path) or not os.path.splitext(path)[1]
+
+def current_artifact_dir(path):
+    """
+    Directory holding the current version of the artifact at path
+    Artifacts saved before versioning have no CURRENT file and are read from path itself.
+    """
+    try:
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return path
+    return os.path.join(path, version) if version else path
+
+def artifact_manifest_path(path):
+    """
+    Manifest of the current version; it changes whenever the artifact is saved again
+    """
+    current_path = os.path.join(path, CURRENT_FILE)
+    if os.path.exists(current_path):
+        return current_path
+    return os.path.join(path, MANIFEST_FILE)
+
+def save_artifact(path, model_data):
+    """
+    Write model_data (same keys as the .pkl dict) as a directory artifact
+    The new version is built in a temporary directory, renamed into place and then made
+    current; returns the version name.
+    """
+    model = model_data['model']
+    scaler = model_data['scaler']
+    if isinstance(model, FlatForest):
+        forest, estimator = model, None
+    else:
+        forest = FlatForest.from_sklearn(model, compact=model_data.get('profile') == 'compact')
+        estimator = model
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'feature_names': list(model_data['feature_names']),
+        'medians': model_data.get('medians'),
+        'profile': model_data.get('profile', 'default'),
+        'cascade': model_data.get('cascade'),
+        'drift_reference': model_data.get('drift_reference'),
+        'trained_at': model_data['trained_at'].isoformat(),
+        'scaler': {
+            'mean': scaler.mean_.tolist(),
+            'scale': scaler.scale_.tolist(),
+            'var': scaler.var_.tolist(),
+            'n_samples_seen': int(np.max(scaler.n_samples_seen_))
+        },
+        'forest': {
+            'n_estimators': forest.n_estimators,
+            'max_depth': forest.max_depth,
+            'classes': forest.classes_.tolist(),
+            'feature_importances': np.asarray(forest.feature_importances_).tolist(),
+            'arrays': {}
+        }
+    }
+
+    version = datetime.now().strftime('%Y%m%dT%H%M%S_%f')
+    os.makedirs(path, exist_ok=True)
+    tmp_path = os.path.join(path, f".{version}.tmp-{os.getpid()}")
+    os.makedirs(tmp_path)
+
+    for name, array in forest.to_arrays().items():
+        filename = f"{name}.npy"
+        np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(array))
+        manifest['forest']['arrays'][name] = filename
+
+    if estimator is not None:
+        import joblib
+        joblib.dump(estimator, os.path.join(tmp_path, ESTIMATOR_FILE))
+
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(tmp_path, os.path.join(path, version))
+
+    # Switch CURRENT with an atomic replace. Processes that still map the old arrays keep
+    # reading them until they reload, since unlinked files stay valid while mapped.
+    current_tmp = os.path.join(path, f".{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(current_tmp, 'w') as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(path, CURRENT_FILE))
+
+    remove_old_versions(path)
+    return version
+
+def remove_old_versions(path, keep=KEEP_ARTIFACT_VERSIONS):
+    """
+    Delete all but the newest keep versions (version names sort by time)
+    Files of an artifact saved before versioning count as the oldest version.
+    """
+    versions = sorted(name for name in os.listdir(path)
+                      if not name.startswith('.') and os.path.isdir(os.path.join(path, name)))
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    if len(versions) >= keep:
+        for name in os.listdir(path):
+            if name != CURRENT_FILE and not name.startswith('.') and os.path.isfile(os.path.join(path, name)):
+                os.remove(os.path.join(path, name))
+
+def load_artifact(path, mmap=True, load_estimator=False):
+    """
+    Load a directory artifact into the same dict layout as the .pkl format
+    'model' is the sklearn estimator when load_estimator is set and one was saved,
+    otherwise the FlatForest built directly on the (memory-mapped) node arrays.
+    """
+    path = current_artifact_dir(path)
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    if manifest['format_version'] != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {manifest['format_version']} in {path}")
+
+    forest_meta = manifest['forest']
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        name: np.asarray(np.load(os.path.join(path, filename), mmap_mode=mmap_mode))
+        for name, filename in forest_meta['arrays'].items()
+    }
+    model = FlatForest.from_arrays(arrays, forest_meta['max_depth'], forest_meta['classes'],
+                                   np.asarray(forest_meta['feature_importances']))
+
+    if load_estimator:
+        estimator = load_artifact_estimator(path)
+        if estimator is not None:
+            model = estimator
+
+    stats = manifest['scaler']
+    return {
+        'model': model,
+        'scaler': ScalerStats(stats['mean'], stats['scale'], stats['var'], stats['n_samples_seen']),
+        'feature_names': manifest['feature_names'],
+        'medians': manifest['medians'],
+        'profile': manifest.get('profile', 'default'),
+        'cascade': manifest.get('cascade'),
+        'drift_reference': manifest.get('drift_reference'),
+        'trained_at': datetime.fromisoformat(manifest['trained_at'])
+    }
+
+def load_artifact_estimator(path):
+    """
+    Load only the saved sklearn estimator of a directory artifact, or None if it has none
+    """
+    estimator_path = os.path.join(current_artifact_dir(path), ESTIMATOR_FILE)
+    if not os.path.exists(estimator_path):
+        return None
+    import joblib
+    return joblib.load(estimator_path)
+
+class ScalerStats:
+    """
+    Statistics of the fitted StandardScaler as stored in the manifest
+    Exposes the same fitted attributes that FeatureTransform and save_artifact read,
+    so serving from an artifact never has to import sklearn
+    """
+    def __init__(self, mean, scale, var, n_samples_seen):
+        self.mean_ = np.array(mean, dtype=np.float64)
+        self.scale_ = np.array(scale, dtype=np.float64)
+        self.var_ = np.array(var, dtype=np.float64)
+        self.n_samples_seen_ = n_samples_seen
+
+if __name__ == "__main__":
+    import sys
+
+    # Convert an existing pickle: python model_artifact.py dropout_model.pkl dropout_model
+    if len(sys.argv) != 3:
+        print("Usage: python model_artifact.py <model.pkl> <artifact_dir>")
+        sys.exit(1)
+
+    import joblib
+
+    source, target = sys.argv[1], sys.argv[2]
+    model_data = joblib.load(source)
+    model_data.setdefault('medians', None)
+    save_artifact(target, model_data)
+    print(f"Converted {source} to {target}/")
@@ -0,0 +1,215 @@
+"""
+Registry of trained models served side by side from one process
+
+Every model artifact in the registry directory (DROPOUT_MODEL_DIR) can be served by name:
+
+    dropout_model.pkl                   model 'dropout_model'
+    dropout_model_mongodb.pkl           model 'dropout_model_mongodb'
+    cse@20250114.pkl                    model 'cse', version '20250114'
+    cse@20250201/                       model 'cse', version '20250201' (directory artifact)
+
+Versions are published as <name>@<version> next to each other; a request that names a
+model but no version gets its highest version, or the unversioned artifact if the model
+has no versions. Models are loaded on first use and kept in memory in LRU order, within
+a maximum count and a byte budget, so one process can serve per-department or
+per-program models without loading all of them.
+"""
+import os
+import threading
+from collections import OrderedDict
+from forest_engine import FlatForest
+from model_artifact import artifact_manifest_path
+
+VERSION_SEPARATOR = '@'
+MODEL_EXTENSION = '.pkl'
+
+class UnknownModelError(Exception):
+    """
+    Raised when a request names a model or version the registry does not have
+    """
+    pass
+
+def parse_artifact_name(filename, is_dir):
+    """
+    Split an artifact file or directory name into (model name, version)
+    Returns None for entries that are not model artifacts
+    """
+    if is_dir:
+        # Directory artifacts have no extension
+        stem = filename
+    else:
+        stem, extension = os.path.splitext(filename)
+        if extension != MODEL_EXTENSION:
+            return None
+    if stem.startswith('.'):
+        return None
+
+    name, separator, version = stem.partition(VERSION_SEPARATOR)
+    if not name or (separator and not version):
+        return None
+    return name, (version if separator else None)
+
+def discover_models(model_dir):
+    """
+    Find the model artifacts in model_dir
+    Returns {name: {version: path}}, with None as the version of an unversioned artifact
+    """
+    models = {}
+    try:
+        entries = list(os.scandir(model_dir))
+    except FileNotFoundError:
+        return models
+
+    for entry in entries:
+        is_dir = entry.is_dir()
+        if is_dir and not os.path.isfile(artifact_manifest_path(entry.path)):
+            continue
+        parsed = parse_artifact_name(entry.name, is_dir)
+        if parsed is None:
+            continue
+        name, version = parsed
+        models.setdefault(name, {})[version] = entry.path
+    return models
+
+def default_version(versions):
+    """
+    The version served when a request names only the model: the highest version,
+    or the unversioned artifact if there are no versions
+    """
+    named = [version for version in versions if version is not None]
+    return max(named) if named else None
+
+def artifact_mtime(path):
+    """
+    Modification time of an artifact; a directory artifact switches its CURRENT file on every save
+    """
+    if os.path.isdir(path):
+        path = artifact_manifest_path(path)
+    return os.stat(path).st_mtime_ns
+
+def model_nbytes(model):
+    """
+    Approximate memory held by a loaded model's forests
+    Counts the flat node arrays (also used for explanations) and, when the sklearn
+    estimator is loaded, its node records and class counts. Memory-mapped arrays of
+    a directory artifact are counted in full although their pages are shared.
+    """
+    snapshot = model.snapshot
+    nbytes = sum(array.nbytes for array in snapshot.explainer.to_arrays().values())
+    if not isinstance(snapshot.model, FlatForest):
+        from sklearn.tree._tree import NODE_DTYPE
+        for estimator in snapshot.model.estimators_:
+            tree = estimator.tree_
+            nbytes += tree.node_count * NODE_DTYPE.itemsize + tree.value.nbytes
+    return nbytes
+
+class ModelRegistry:
+    """
+    Loads models by name and version on first use and keeps the most recently used ones
+    At most max_models models and max_bytes bytes stay loaded; the least recently used
+    are evicted first. A model that alone exceeds max_bytes is still served, on its own.
+    Evicted models stay valid for requests that already hold them.
+    """
+    def __init__(self, model_dir, create_model, max_models=4, max_bytes=1024 * 1024 * 1024):
+        self.model_dir = model_dir
+        self.create_model = create_model    # path -> unloaded DropoutPredictionModel
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.loaded = OrderedDict()         # (name, version) -> {'model', 'nbytes', 'mtime'}
+        self.load_locks = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'loads': 0, 'evictions': 0}
+
+    def resolve(self, name, version=None):
+        """
+        Return (version, path) of the artifact a request asked for
+        """
+        versions = discover_models(self.model_dir).get(name)
+        if not versions:
+            raise UnknownModelError(f"Unknown model '{name}'")
+        if version is None:
+            version = default_version(versions)
+        if version not in versions:
+            raise UnknownModelError(f"Unknown version '{version}' of model '{name}'")
+        return version, versions[version]
+
+    def get(self, name, version=None):
+        """
+        The loaded model for name (and version, default: latest), loading it if needed
+        An artifact that changed on disk since it was loaded is loaded again
+        """
+        version, path = self.resolve(name, version)
+        key = (name, version)
+        mtime = artifact_mtime(path)
+
+        with self.lock:
+            entry = self.loaded.get(key)
+            if entry is not None and entry['mtime'] == mtime:
+                self.loaded.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry['model']
+            # One load per model at a time; other models keep being served meanwhile
+            load_lock = self.load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self.lock:
+                entry = self.loaded.get(key)
+                if entry is not None and entry['mtime'] == mtime:
+                    self.loaded.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry['model']
+
+            model = self.create_model(path)
+            if not model.load_model():
+                raise UnknownModelError(f"Model '{name}' could not be loaded from {path}")
+            model.warm_up()
+            nbytes = model_nbytes(model)
+
+            with self.lock:
+                self.loaded[key] = {'model': model, 'nbytes': nbytes, 'mtime': mtime}
+                self.loaded.move_to_end(key)
+                self.stats['loads'] += 1
+                self.evict()
+        return model
+
+    def evict(self):
+        """
+        Drop least recently used models until the count and byte limits hold
+        Called with self.lock held; the most recently used model is never dropped
+        """
+        while len(self.loaded) > 1 and (len(self.loaded) > self.max_models or
+                                        self.loaded_bytes() > self.max_bytes):
+            key, _ = self.loaded.popitem(last=False)
+            self.stats['evictions'] += 1
+            print(f"Evicted model {key[0]}{VERSION_SEPARATOR + key[1] if key[1] else ''} from the registry")
+
+    def loaded_bytes(self):
+        return sum(entry['nbytes'] for entry in self.loaded.values())
+
+    def info(self):
+        """
+        Available models and versions, and which of them are loaded
+        """
+        with self.lock:
+            loaded = {key: entry['nbytes'] for key, entry in self.loaded.items()}
+            stats = dict(self.stats)
+
+        models = []
+        for name, versions in sorted(discover_models(self.model_dir).items()):
+            models.append({
+                'name': name,
+                'default_version': default_version(versions),
+                'versions': [{
+                    'version': version,
+                    'loaded': (name, version) in loaded,
+                    'bytes': loaded.get((name, version))
+                } for version in sorted(versions, key=lambda v: (v is not None, v or ''))]
+            })
+        return {
+            'models': models,
+            'loaded_count': len(loaded),
+            'loaded_bytes': sum(loaded.values()),
+            'max_models': self.max_models,
+            'max_bytes': self.max_bytes,
+            'stats': stats
+        }
@@ -0,0 +1,71 @@
+"""
+Compare the aggregation-pipeline fetch with the original per-document fetch as the data grows
+
+    python mongo_benchmark.py                                   # in-memory mongomock
+    MONGODB_URI=mongodb://localhost:27017/ python mongo_benchmark.py
+
+Against a real mongod a scratch database (dropout_fetch_benchmark) is filled and dropped
+for every size. mongomock evaluates pipelines in Python, so its numbers understate what
+the server-side pipeline saves; use a local mongod for representative timings.
+"""
+import os
+import time
+import numpy as np
+import fetch_and_train_from_mongodb as mongo_training
+from sample_records import seed_database
+
+STUDENT_COUNTS = [1000, 5000, 20000]
+BENCHMARK_DB = 'dropout_fetch_benchmark'
+
+def open_database():
+    uri = os.environ.get('MONGODB_URI')
+    if uri:
+        from pymongo import MongoClient
+        return MongoClient(uri)
+    import mongomock
+    return mongomock.MongoClient()
+
+def time_fetch(fetch, db, repeat=3):
+    """
+    Best-of-repeat wall time of one fetch, with printing from the fetch silenced
+    """
+    import contextlib
+    import io
+
+    best = None
+    for _ in range(repeat):
+        np.random.seed(42)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fetch(db)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def compare_fetch(client, n_students):
+    """
+    Return per-document and pipeline fetch timings for one database size
+    """
+    client.drop_database(BENCHMARK_DB)
+    db = client[BENCHMARK_DB]
+    seed_database(db, n_students)
+    n_records = sum(db[name].count_documents({}) for name in ('academicdetails', 'attendances', 'feemanagements'))
+
+    result = {
+        'n_students': n_students,
+        'n_records': n_records,
+        'document_seconds': time_fetch(mongo_training.fetch_student_data_by_document, db),
+        'pipeline_seconds': time_fetch(mongo_training.fetch_student_data, db)
+    }
+    client.drop_database(BENCHMARK_DB)
+    return result
+
+if __name__ == "__main__":
+    client = open_database()
+    print(f"Backend: {'mongod at ' + os.environ['MONGODB_URI'] if os.environ.get('MONGODB_URI') else 'mongomock'}")
+    results = [compare_fetch(client, n) for n in STUDENT_COUNTS]
+
+    print("\nStudents  Records   Per-document   Pipeline   Speedup")
+    for r in results:
+        print(f"{r['n_students']:<9} {r['n_records']:<9} {r['document_seconds']:>10.2f}s"
+              f" {r['pipeline_seconds']:>9.2f}s {r['document_seconds'] / r['pipeline_seconds']:>8.1f}x")
@@ -0,0 +1,140 @@
+"""
+On-demand cProfile capture of single API requests
+
+Profiling is opt-in and only wired into the app when DROPOUT_PROFILE_DIR is set; without
+it no hooks are installed and requests run exactly as before. Once configured, a request
+is profiled when it carries an X-Profile header holding DROPOUT_PROFILE_TOKEN, or is picked
+by DROPOUT_PROFILE_SAMPLE_RATE. Without a token the header is ignored, so clients cannot
+make the server profile their requests. Each profile is written to the profile directory as
+
+    <request id>.prof       cProfile stats: python -m pstats, snakeviz, etc.
+    <request id>.txt        the request, its status and duration, and the top functions
+
+The request id starts with the X-Request-ID header when given, so a slow request can be
+matched with the client's logs, followed by a random suffix so a reused id never
+overwrites an earlier profile. It is returned in the X-Profile-Id response header.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+
+PROFILE_HEADER = 'X-Profile'
+REQUEST_ID_HEADER = 'X-Request-ID'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+# Profiles kept on disk; the oldest are removed beyond this
+MAX_PROFILES = 200
+
+# Functions listed in the .txt summary, by cumulative time
+SUMMARY_LINES = 40
+
+def safe_request_id(value):
+    """
+    A unique profile id usable as a file name: the client's id plus a random suffix if the
+    id is plain, otherwise a new one
+    """
+    if value and re.fullmatch(r'[A-Za-z0-9_.-]{1,64}', value) and not value.startswith('.'):
+        return f'{value}-{uuid.uuid4().hex[:8]}'
+    return uuid.uuid4().hex
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and writes their profiles
+    """
+    def __init__(self, profile_dir, sample_rate=0.0, token=None, max_profiles=MAX_PROFILES):
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.token = token
+        self.max_profiles = max_profiles
+        os.makedirs(profile_dir, exist_ok=True)
+
+    def wants_profile(self, headers):
+        """
+        True if the request asked for a profile with the token, or was sampled
+        """
+        requested = headers.get(PROFILE_HEADER)
+        if requested is not None and self.token and hmac.compare_digest(requested.encode(), self.token.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self):
+        """
+        Start profiling the current thread; returns None if another profiler is active
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process (sys.monitoring)
+            return None
+        return profile
+
+    def save(self, profile, request_id, description):
+        """
+        Write the .prof stats and the .txt summary for one request; returns the .prof path
+        """
+        base = os.path.join(self.profile_dir, request_id)
+        profile.dump_stats(f'{base}.prof')
+
+        summary = io.StringIO()
+        summary.write(description + '\n\n')
+        pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(SUMMARY_LINES)
+        with open(f'{base}.txt', 'w') as f:
+            f.write(summary.getvalue())
+
+        self.remove_old_profiles()
+        return f'{base}.prof'
+
+    def remove_old_profiles(self):
+        profiles = [entry for entry in os.scandir(self.profile_dir) if entry.name.endswith('.prof')]
+        if len(profiles) <= self.max_profiles:
+            return
+        profiles.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in profiles[:-self.max_profiles]:
+            for path in (entry.path, entry.path[:-len('.prof')] + '.txt'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+def install_profiler(app, profiler):
+    """
+    Register Flask hooks that profile the requests profiler.wants_profile picks
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_profile():
+        if not profiler.wants_profile(request.headers):
+            return
+        profile = profiler.start()
+        if profile is not None:
+            g.profile = profile
+            g.profile_id = safe_request_id(request.headers.get(REQUEST_ID_HEADER))
+            g.profile_start = time.perf_counter()
+
+    @app.after_request
+    def save_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        profile.disable()
+        seconds = time.perf_counter() - g.profile_start
+        description = (f"{request.method} {request.full_path.rstrip('?')} -> {response.status_code} "
+                       f"in {seconds * 1000:.1f} ms (request id {g.profile_id})")
+        profiler.save(profile, g.profile_id, description)
+        response.headers[PROFILE_ID_HEADER] = g.profile_id
+        return response
+
+    @app.teardown_request
+    def stop_profile(error=None):
+        # A request that failed before after_request still releases the profiler
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
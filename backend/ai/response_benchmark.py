@@ -0,0 +1,61 @@
+"""
+Measure what each /predict/batch response format costs after scoring
+
+    python response_benchmark.py
+
+Uses dropout_model.pkl when it exists (otherwise trains one on 2000 sample rows), scores
+a batch of sample students with explanations and times building the response body in
+every format: result dicts plus json.dumps (JSON and NDJSON), result dicts plus msgpack,
+and the columnar encoding straight from the score arrays.
+"""
+import json
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from feature_transform import RAW_FEATURES
+from explain_benchmark import time_call
+from response_formats import encode_score_columns, msgpack_available
+
+BATCH_SIZES = [1000, 10000, 50000]
+
+def compare_formats(model, n_students, repeats=3):
+    """
+    Seconds spent after score_records and body size per format, for one batch size
+    """
+    records = generate_sample_data(n_students)[RAW_FEATURES].to_dict('records')
+    scores = model.score_records(records)
+
+    def json_body():
+        results = model.build_results(scores)
+        return json.dumps({'success': True, 'data': results, 'count': len(results)}).encode('utf-8')
+
+    def ndjson_body():
+        return ''.join(json.dumps(result, separators=(',', ':')) + '\n'
+                       for result in model.build_results(scores)).encode('utf-8')
+
+    def msgpack_body():
+        from response_formats import encode_msgpack
+        results = model.build_results(scores)
+        return encode_msgpack({'success': True, 'data': results, 'count': len(results)})
+
+    formats = {'json': json_body, 'ndjson': ndjson_body, 'columnar': lambda: encode_score_columns(scores)}
+    if msgpack_available():
+        formats['msgpack'] = msgpack_body
+
+    result = {'n_students': n_students,
+              'scoring_seconds': time_call(lambda: model.score_records(records), repeats)}
+    for name, body in formats.items():
+        result[name] = {'seconds': time_call(body, repeats), 'bytes': len(body())}
+    return result
+
+if __name__ == "__main__":
+    model = DropoutPredictionModel()
+    if not model.load_model():
+        model.train_model(generate_sample_data(2000), save=False)
+
+    results = [compare_formats(model, n) for n in BATCH_SIZES]
+
+    print("\nStudents  Scoring     Format     Encode      Size")
+    for r in results:
+        for name in ('json', 'ndjson', 'msgpack', 'columnar'):
+            if name in r:
+                print(f"{r['n_students']:<9} {r['scoring_seconds'] * 1000:>8.1f}ms  {name:<10} "
+                      f"{r[name]['seconds'] * 1000:>8.1f}ms {r[name]['bytes'] / 1e6:>8.2f} MB")
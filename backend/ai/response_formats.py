@@ -0,0 +1,156 @@
+"""
+Response formats for bulk scoring results (/predict/batch), picked by the Accept header
+
+- JSON (application/json): {"success": true, "data": [...], "count": N}, the default
+- NDJSON (application/x-ndjson): one result per line, in request order, written while
+  the batch is scored in chunks of STREAM_CHUNK_ROWS, so the first rows leave before the
+  last ones are scored
+- MessagePack (application/msgpack): the JSON payload in MessagePack, for clients that
+  want the same structure with binary floats and no text parsing (needs `pip install msgpack`)
+- Columnar binary (application/x-dropout-scores): no per-student objects at all, laid out as
+      b'DPRES1\\n'                     magic
+      uint32 little-endian              length of the JSON header
+      JSON header                       {"n_rows": N, "columns": [{"name", "dtype", "shape"}, ...],
+                                         "risk_levels": [...], "factors": [...], "errors": {...}, ...}
+      column data                       each column's values, C order, in header order
+  Columns are risk_score (float32), risk_level (uint8 code into risk_levels) and, unless
+  ?explain=false, reason_factor (uint8 code into factors, shape N x MAX_REASONS),
+  reason_value and reason_contribution (float32). Rows that failed validation have
+  risk_level ERROR_CODE, a NaN score and their message under errors (keyed by row index);
+  unused reason slots have factor ERROR_CODE. read_score_columns decodes it.
+
+Requests without an Accept header, or accepting anything, get JSON.
+"""
+import json
+import struct
+import time
+import numpy as np
+from training_ingest import NDJSON_TYPES
+from dropout_prediction import (REASON_TEMPLATES, HIGH_IMPACT_CONTRIBUTION, MEDIUM_IMPACT_CONTRIBUTION, RISK_LEVELS,
+                                risk_level_codes)
+
+JSON_TYPE = 'application/json'
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+SCORES_COLUMNAR_TYPE = 'application/x-dropout-scores'
+
+# Response formats by name, with the media types that select them (JSON first, so it
+# wins when the client accepts everything)
+RESPONSE_FORMATS = {
+    'json': (JSON_TYPE,),
+    'ndjson': NDJSON_TYPES,
+    'msgpack': MSGPACK_TYPES,
+    'columnar': (SCORES_COLUMNAR_TYPE,)
+}
+
+SCORES_MAGIC = b'DPRES1\n'
+
+# Code of an invalid row's risk level and of an empty reason slot in the columnar format
+ERROR_CODE = 255
+
+# Students scored per chunk while streaming NDJSON
+STREAM_CHUNK_ROWS = 1000
+
+def msgpack_available():
+    try:
+        import msgpack  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def negotiate(accept, formats=tuple(RESPONSE_FORMATS)):
+    """
+    The name of the response format to use for a request's Accept header (werkzeug MIMEAccept)
+    JSON when the request sends no Accept header, None when none of formats is acceptable
+    """
+    if not accept:
+        return 'json'
+    offered = {}
+    for name in formats:
+        if name == 'msgpack' and not msgpack_available():
+            continue
+        for mimetype in RESPONSE_FORMATS[name]:
+            offered[mimetype] = name
+    return offered.get(accept.best_match(list(offered)))
+
+def encode_msgpack(payload):
+    import msgpack
+    return msgpack.packb(payload, use_bin_type=True)
+
+def iter_ndjson_results(model, records, explain=True, timings=None, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Score records chunk by chunk and yield each chunk's results as NDJSON lines
+    Every chunk is scored with the snapshot current when streaming started.
+    """
+    snapshot = model.current_snapshot()
+    for start in range(0, len(records), chunk_rows):
+        scores = model.score_records(records[start:start + chunk_rows], explain, timings, snapshot)
+        results = model.build_results(scores, timings)
+        serialize_start = time.perf_counter()
+        lines = ''.join(json.dumps(result, separators=(',', ':')) + '\n' for result in results)
+        if timings is not None:
+            timings['serialize'] = timings.get('serialize', 0.0) + time.perf_counter() - serialize_start
+        yield lines.encode('utf-8')
+
+def score_columns(scores):
+    """
+    The columnar response for the arrays of DropoutPredictionModel.score_records
+    Returns (header, {column: array})
+    """
+    n_rows = len(scores['errors'])
+    rows = scores['rows']
+    risk_score = np.full(n_rows, np.nan, dtype='<f4')
+    risk_score[rows] = scores['risk_scores']
+    risk_level = np.full(n_rows, ERROR_CODE, dtype='u1')
+    risk_level[rows] = risk_level_codes(scores['risk_scores'])
+    columns = {'risk_score': risk_score, 'risk_level': risk_level}
+
+    if scores['reasons'] is not None:
+        features, values, contributions = scores['reasons']
+        # Like get_top_reasons, only contributions that raised the risk are reasons
+        factor = np.where(contributions > 0, features, ERROR_CODE)
+        columns['reason_factor'] = np.full((n_rows, factor.shape[1]), ERROR_CODE, dtype='u1')
+        columns['reason_factor'][rows] = factor
+        for name, array in (('reason_value', values), ('reason_contribution', contributions)):
+            columns[name] = np.full((n_rows, array.shape[1]), np.nan, dtype='<f4')
+            columns[name][rows] = array
+
+    header = {
+        'n_rows': n_rows,
+        'columns': [{'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+                    for name, array in columns.items()],
+        'risk_levels': list(RISK_LEVELS),
+        'factors': [REASON_TEMPLATES[name][0] for name in scores['feature_names']],
+        'impact_thresholds': {'High': HIGH_IMPACT_CONTRIBUTION, 'Medium': MEDIUM_IMPACT_CONTRIBUTION},
+        'errors': {str(index): error for index, error in enumerate(scores['errors']) if error is not None}
+    }
+    return header, columns
+
+def encode_score_columns(scores):
+    """
+    Encode the arrays of DropoutPredictionModel.score_records in the columnar binary format
+    """
+    header, columns = score_columns(scores)
+    header = json.dumps(header).encode('utf-8')
+    return b''.join([SCORES_MAGIC, struct.pack('<I', len(header)), header] +
+                    [np.ascontiguousarray(array).tobytes() for array in columns.values()])
+
+def read_score_columns(body):
+    """
+    Decode a columnar scoring response (for clients and tests)
+    Returns (header, {column: array}); the arrays are read-only views of body
+    """
+    if body[:len(SCORES_MAGIC)] != SCORES_MAGIC:
+        raise ValueError('Not a columnar scoring response (bad magic bytes)')
+    offset = len(SCORES_MAGIC)
+    (header_length,) = struct.unpack_from('<I', body, offset)
+    offset += 4
+    header = json.loads(body[offset:offset + header_length])
+    offset += header_length
+
+    columns = {}
+    for column in header['columns']:
+        dtype = np.dtype(column['dtype'])
+        count = int(np.prod(column['shape']))
+        columns[column['name']] = np.frombuffer(body, dtype, count, offset).reshape(column['shape'])
+        offset += count * dtype.itemsize
+    return header, columns
@@ -0,0 +1,78 @@
+"""
+Random raw student records shared by the feature tests and benchmarks
+
+generate_records builds flat academic, attendance and fee record sets as DataFrames
+(feature_builder.build_features input); seed_database inserts the same kinds of records
+into the MongoDB collections the ERP writes (fetch_student_data input, e.g. on mongomock).
+"""
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+def generate_records(n_students, seed=0):
+    """
+    Random student ids plus flat academic, attendance and fee record sets for them
+    """
+    rng = np.random.default_rng(seed)
+    student_ids = [f"s{i:06d}" for i in range(n_students)]
+
+    n_academic = n_students * 5
+    academic = pd.DataFrame({
+        'student_id': rng.choice(student_ids, n_academic),
+        'grade_point': rng.integers(0, 11, n_academic).astype(float),
+        'credits_earned': rng.integers(0, 5, n_academic).astype(float),
+        'grade': rng.choice(['A', 'B', 'C', 'F'], n_academic)
+    })
+    # As AcademicDetails sets it from the grade, with some results not yet declared
+    academic['result_status'] = np.where(academic['grade'] == 'F', 'Fail', 'Pass')
+    academic.loc[rng.random(n_academic) < 0.1, 'result_status'] = 'Pending'
+    n_attendance = n_students * 4
+    total = rng.integers(0, 40, n_attendance)
+    attendance = pd.DataFrame({
+        'student_id': rng.choice(student_ids, n_attendance),
+        'total_classes': total.astype(float),
+        'present_classes': (total * rng.random(n_attendance)).round()
+    })
+    n_fees = n_students // 2
+    fee_total = rng.integers(0, 3, n_fees) * 50000.0
+    fees = pd.DataFrame({
+        'student_id': rng.choice(student_ids, n_fees),
+        'total_amount': fee_total,
+        'pending_amount': fee_total * rng.random(n_fees)
+    })
+    return student_ids, academic, attendance, fees
+
+def seed_database(db, n_students=60, seed=0):
+    """
+    Fill students, academicdetails, attendances and feemanagements with random records
+    """
+    from bson import ObjectId
+
+    rng = np.random.default_rng(seed)
+    old = datetime(2024, 1, 1)
+    student_ids = [ObjectId() for _ in range(n_students)]
+    db.students.insert_many([{'_id': sid, 'name': f'Student {i}'} for i, sid in enumerate(student_ids)])
+
+    academic, attendance, fees = [], [], []
+    for i, sid in enumerate(student_ids):
+        # Every fifth student has no academic records, every seventh no attendance, every third no fees
+        if i % 5:
+            for _ in range(rng.integers(1, 6)):
+                grade = str(rng.choice(['A', 'B', 'C', 'F']))
+                status = 'Pending' if rng.random() < 0.1 else 'Fail' if grade == 'F' else 'Pass'
+                academic.append({'student_id': sid, 'grade': grade, 'result_status': status,
+                                 'grade_point': int(rng.integers(0, 11)),
+                                 'credits_earned': int(rng.integers(0, 5)), 'updatedAt': old})
+        if i % 7:
+            for _ in range(rng.integers(1, 4)):
+                total = int(rng.integers(0, 40))
+                attendance.append({'student_id': sid, 'total_classes': total,
+                                   'present_classes': int(rng.integers(0, total + 1)), 'updatedAt': old})
+        if i % 3:
+            total = float(rng.integers(0, 3)) * 50000
+            fees.append({'student_id': sid, 'semester_no': 1, 'total_amount': total,
+                         'pending_amount': float(rng.uniform(0, total)) if total else 0.0})
+    db.academicdetails.insert_many(academic)
+    db.attendances.insert_many(attendance)
+    db.feemanagements.insert_many(fees)
+    return student_ids
@@ -0,0 +1,262 @@
+"""
+Precomputed dropout risk scores for the whole student population
+
+A bulk scoring job (python score_table.py, run on a schedule) scores every student in
+batches and writes a versioned score table:
+
+    dropout_scores/
+        CURRENT                         name of the newest complete version
+        20250114T020000_000000/
+            manifest.json               model version, feature snapshot time, scoring time, counts
+            student_ids.json            student ids, in row order
+            risk_score.npy              float64 dropout probability per student
+            risk_level.npy              int8 index into RISK_LEVELS per student
+            top_reasons.json            top reasons per student, as returned by /predict
+
+Each version is written to a temporary directory and renamed into place before CURRENT
+is switched to it, so readers never see a partial table. The API answers /at-risk from
+the current table, so a page load is a lookup instead of an inference sweep.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from feature_transform import RAW_FEATURES
+from dropout_prediction import DropoutPredictionModel, RISK_LEVELS, risk_level_codes
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+# Students scored per predict_proba call
+SCORE_BATCH_SIZE = 10000
+
+# Complete versions kept on disk (the current one included)
+KEEP_VERSIONS = 3
+
+def model_version(model):
+    """
+    Identify the trained model a table was scored with (its training time)
+    """
+    return model.trained_at.isoformat() if model.trained_at else None
+
+def score_population(model, features, batch_size=SCORE_BATCH_SIZE):
+    """
+    Score every row of features ({feature: array} or DataFrame with RAW_FEATURES) in batches
+    Returns (risk_score float64 array, risk_level int8 array, top_reasons list)
+    """
+    raw = np.column_stack([np.asarray(features[feature], dtype=np.float64) for feature in RAW_FEATURES])
+    n = len(raw)
+    risk_scores = np.empty(n, dtype=np.float64)
+    top_reasons = []
+
+    # Every batch is scored with the same snapshot even if the model is retrained meanwhile
+    snapshot = model.current_snapshot()
+    for start in range(0, n, batch_size):
+        X = snapshot.transform.transform_array(raw[start:start + batch_size])
+        risk_scores[start:start + len(X)] = snapshot.scorer(True).predict_proba(X)[:, 1]
+        top_reasons.extend(model.explain_predictions(X, snapshot))
+
+    risk_levels = risk_level_codes(risk_scores).astype(np.int8)
+    return risk_scores, risk_levels, top_reasons
+
+def write_score_table(table_dir, student_ids, risk_scores, risk_levels, top_reasons,
+                      model_version=None, feature_snapshot_at=None):
+    """
+    Write a new version of the score table and make it current
+    Returns the version name
+    """
+    scored_at = datetime.now()
+    version = scored_at.strftime('%Y%m%dT%H%M%S_%f')
+    os.makedirs(table_dir, exist_ok=True)
+
+    tmp_path = os.path.join(table_dir, f".{version}.tmp-{os.getpid()}")
+    os.makedirs(tmp_path)
+
+    manifest = {
+        'version': version,
+        'model_version': model_version,
+        'feature_snapshot_at': (feature_snapshot_at or scored_at).isoformat(),
+        'scored_at': scored_at.isoformat(),
+        'n_students': len(student_ids),
+        'level_counts': {level: int(np.sum(risk_levels == code)) for code, level in enumerate(RISK_LEVELS)}
+    }
+    np.save(os.path.join(tmp_path, 'risk_score.npy'), np.asarray(risk_scores, dtype=np.float64))
+    np.save(os.path.join(tmp_path, 'risk_level.npy'), np.asarray(risk_levels, dtype=np.int8))
+    with open(os.path.join(tmp_path, 'student_ids.json'), 'w') as f:
+        json.dump([str(student_id) for student_id in student_ids], f)
+    with open(os.path.join(tmp_path, 'top_reasons.json'), 'w') as f:
+        json.dump(top_reasons, f)
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(tmp_path, os.path.join(table_dir, version))
+
+    # Switch CURRENT with an atomic replace
+    current_tmp = os.path.join(table_dir, f".{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(current_tmp, 'w') as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(table_dir, CURRENT_FILE))
+
+    remove_old_versions(table_dir)
+    return version
+
+def remove_old_versions(table_dir, keep=KEEP_VERSIONS):
+    """
+    Delete all but the newest keep versions (version names sort by time)
+    """
+    versions = sorted(name for name in os.listdir(table_dir)
+                      if not name.startswith('.') and os.path.isdir(os.path.join(table_dir, name)))
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(table_dir, name), ignore_errors=True)
+
+def build_score_table(model, table_dir, student_ids, features, feature_snapshot_at=None,
+                      batch_size=SCORE_BATCH_SIZE):
+    """
+    Score the population with the given model and write it as the current table
+    Returns the version name
+    """
+    risk_scores, risk_levels, top_reasons = score_population(model, features, batch_size)
+    return write_score_table(table_dir, student_ids, risk_scores, risk_levels, top_reasons,
+                             model_version=model_version(model),
+                             feature_snapshot_at=feature_snapshot_at)
+
+def current_version(table_dir):
+    """
+    Name of the current version, or None if no table has been written yet
+    """
+    try:
+        with open(os.path.join(table_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+class ScoreTable:
+    """
+    One loaded version of the score table
+    Rows are kept sorted by risk score, highest first, so at-risk queries are a slice
+    """
+    def __init__(self, path):
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(path, 'student_ids.json')) as f:
+            student_ids = json.load(f)
+        with open(os.path.join(path, 'top_reasons.json')) as f:
+            top_reasons = json.load(f)
+        risk_scores = np.load(os.path.join(path, 'risk_score.npy'))
+        risk_levels = np.load(os.path.join(path, 'risk_level.npy'))
+
+        order = np.argsort(-risk_scores, kind='stable')
+        self.student_ids = [student_ids[i] for i in order]
+        self.top_reasons = [top_reasons[i] for i in order]
+        self.risk_scores = risk_scores[order]
+        self.risk_levels = risk_levels[order]
+        self.rows_by_student = {student_id: row for row, student_id in enumerate(self.student_ids)}
+        # Freshness is measured from when the features were read, not when they were scored
+        self.feature_snapshot_at = datetime.fromisoformat(self.manifest['feature_snapshot_at'])
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+    def age_seconds(self):
+        return (datetime.now() - self.feature_snapshot_at).total_seconds()
+
+    def is_fresh(self, ttl_seconds):
+        return self.age_seconds() <= ttl_seconds
+
+    def entry(self, row):
+        return {
+            'student_id': self.student_ids[row],
+            'risk_score': float(self.risk_scores[row]),
+            'risk_level': RISK_LEVELS[self.risk_levels[row]],
+            'top_reasons': self.top_reasons[row]
+        }
+
+    def lookup(self, student_id):
+        """
+        Stored prediction for one student, or None if the student was not scored
+        """
+        row = self.rows_by_student.get(str(student_id))
+        return None if row is None else self.entry(row)
+
+    def at_risk(self, levels=('High', 'Medium'), limit=None):
+        """
+        Students at the given risk levels, highest score first
+        """
+        codes = [RISK_LEVELS.index(level) for level in levels]
+        rows = np.flatnonzero(np.isin(self.risk_levels, codes))
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.entry(row) for row in rows.tolist()]
+
+    def info(self, ttl_seconds=None):
+        info = dict(self.manifest, age_seconds=round(self.age_seconds(), 1))
+        if ttl_seconds is not None:
+            info['fresh'] = self.is_fresh(ttl_seconds)
+        return info
+
+class ScoreTableCache:
+    """
+    Keeps the current version loaded, reloading only when CURRENT points somewhere new
+    """
+    def __init__(self, table_dir):
+        self.table_dir = table_dir
+        self.table = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        """
+        The current ScoreTable, or None if no table has been written
+        """
+        version = current_version(self.table_dir)
+        if version is None:
+            return None
+        table = self.table
+        if table is not None and table.version == version:
+            return table
+        with self.lock:
+            if self.table is None or self.table.version != version:
+                self.table = ScoreTable(os.path.join(self.table_dir, version))
+            return self.table
+
+def main(table_dir, model_path, engine='sklearn'):
+    """
+    Score every student in the MongoDB feature store and write a new table version
+    """
+    from fetch_and_train_from_mongodb import connect_to_mongodb
+    from feature_store import read_feature_store
+
+    model = DropoutPredictionModel(model_path, engine=engine)
+    if not model.load_model():
+        print("No trained model to score with. Train one first.")
+        return None
+
+    db = connect_to_mongodb()
+    if db is None:
+        print("Failed to connect to MongoDB. Exiting.")
+        return None
+
+    feature_snapshot_at = datetime.now()
+    student_ids, features = read_feature_store(db)
+    if not student_ids:
+        print("Feature store is empty. Run `npm run rebuild-features` in the backend first.")
+        return None
+
+    start = time.perf_counter()
+    version = build_score_table(model, table_dir, student_ids, features, feature_snapshot_at)
+    print(f"Scored {len(student_ids)} students in {time.perf_counter() - start:.2f}s; "
+          f"wrote {os.path.join(table_dir, version)}")
+    return version
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Score all students and write a new risk score table')
+    parser.add_argument('--table-dir', default=os.environ.get('DROPOUT_SCORE_TABLE', 'dropout_scores'))
+    parser.add_argument('--model', default=os.environ.get('DROPOUT_MODEL_PATH', 'dropout_model.pkl'))
+    parser.add_argument('--engine', default=os.environ.get('DROPOUT_ENGINE', 'sklearn'))
+    args = parser.parse_args()
+
+    main(args.table_dir, args.model, args.engine)
@@ -0,0 +1,57 @@
+"""
+Measure API startup cost: import time, model load and the first /predict requests
+
+    python startup_timing.py
+    DROPOUT_MODEL_PATH=dropout_model DROPOUT_ENGINE=flat python startup_timing.py
+
+Each run happens in a fresh interpreter so nothing is already imported or cached.
+"""
+import json
+import os
+import subprocess
+import sys
+
+RUN_CODE = r'''
+import json, sys, time
+start = time.perf_counter()
+import dropout_prediction
+imported = time.perf_counter()
+import api
+loaded = time.perf_counter()
+client = api.app.test_client()
+student = {'attendance': 65, 'cgpa': 2.8, 'backlogs': 3, 'assignments_submitted': 5, 'pending_fee_ratio': 0.4}
+first_start = time.perf_counter()
+client.post('/predict', json=student)
+first_end = time.perf_counter()
+client.post('/predict', json=student)
+second_end = time.perf_counter()
+print(json.dumps({
+    'import_dropout_prediction_ms': (imported - start) * 1000,
+    'import_api_and_load_model_ms': (loaded - imported) * 1000,
+    'first_predict_ms': (first_end - first_start) * 1000,
+    'second_predict_ms': (second_end - first_end) * 1000,
+    'pandas_imported': 'pandas' in sys.modules,
+    'sklearn_imported': 'sklearn' in sys.modules
+}))
+'''
+
+def measure_once():
+    """
+    Run one cold start in a child interpreter and return its timings
+    """
+    output = subprocess.run([sys.executable, '-W', 'ignore', '-c', RUN_CODE],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    runs = [measure_once() for _ in range(5)]
+
+    print(f"Model: {os.environ.get('DROPOUT_MODEL_PATH', 'dropout_model.pkl')}, "
+          f"engine: {os.environ.get('DROPOUT_ENGINE', 'sklearn')} (median of {len(runs)} cold starts)")
+    for key, value in runs[0].items():
+        if isinstance(value, bool):
+            print(f"  {key:30s} {value}")
+        else:
+            median = sorted(run[key] for run in runs)[len(runs) // 2]
+            print(f"  {key:30s} {median:8.1f} ms")
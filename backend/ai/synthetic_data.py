@@ -0,0 +1,217 @@
+"""
+Chunked, parallel synthetic student data for large-scale load and training tests
+
+    python synthetic_data.py --rows 5000000 --workers 4 --out synthetic_5m --format npz
+
+Rows are produced in fixed-size chunks. Chunk i draws from its own np.random.Generator,
+seeded with SeedSequence(seed, spawn_key=(i,)), so a chunk's rows depend only on the
+seed, the chunk size and i: the same dataset comes out whether it is generated by one
+process or by many, and any chunk can be regenerated on its own. Nothing touches the
+global np.random state.
+
+Distributions and label weights follow generate_sample_data ('sample' profile) or the
+demo data of train_model_with_real_data.py ('real_data' profile). The rows differ from
+generate_sample_data's, which keeps its single global-seed stream so existing results
+stay reproducible.
+
+A written dataset is the part files plus manifest.json, written last, which lists the
+parts and the settings they were generated with. iter_dataset reads the parts the
+manifest lists, and write_dataset clears any earlier dataset in the directory first, so
+parts of an older, larger dataset are never mixed in.
+"""
+import json
+import os
+from collections import deque
+import numpy as np
+
+COLUMNS = ['attendance', 'cgpa', 'backlogs', 'assignments_submitted', 'pending_fee_ratio', 'dropout']
+
+# Rows per chunk; part of the dataset's identity together with the seed
+CHUNK_SIZE = 100000
+
+# Dropout probability weights for (low attendance, low CGPA, backlogs, missing assignments,
+# pending fees), and the standard deviation of the noise added to the probability
+PROFILES = {
+    'sample': {'weights': (0.3, 0.2, 0.2, 0.1, 0.2), 'noise': 0.0},
+    'real_data': {'weights': (0.4, 0.3, 0.2, 0.1, 0.0), 'noise': 0.1}
+}
+
+FORMATS = ('npz', 'csv')
+MANIFEST_FILE = 'manifest.json'
+
+def chunk_sizes(n_samples, chunk_size=CHUNK_SIZE):
+    """
+    Rows in each chunk; every chunk is full except possibly the last
+    """
+    n_full, remainder = divmod(n_samples, chunk_size)
+    return [chunk_size] * n_full + ([remainder] if remainder else [])
+
+def generate_chunk(seed, chunk_index, n_rows, profile='sample'):
+    """
+    Generate one chunk as {column: array}
+    """
+    weights, noise = PROFILES[profile]['weights'], PROFILES[profile]['noise']
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+
+    attendance = np.clip(rng.normal(75, 15, n_rows), 0, 100)
+    cgpa = np.clip(rng.normal(7.0, 1.5, n_rows), 0, 10)
+    backlogs = np.clip(rng.poisson(1, n_rows), 0, 10)
+    assignments_submitted = np.clip(rng.poisson(8, n_rows), 0, 15)
+    pending_fee_ratio = np.clip(rng.beta(2, 5, n_rows), 0, 1)  # Most students have low pending fees
+
+    dropout_prob = (
+        (100 - attendance) / 100 * weights[0] +
+        (10 - cgpa) / 10 * weights[1] +
+        backlogs / 10 * weights[2] +
+        (15 - assignments_submitted) / 15 * weights[3] +
+        pending_fee_ratio * weights[4]
+    )
+    if noise:
+        dropout_prob = np.clip(dropout_prob + rng.normal(0, noise, n_rows), 0, 1)
+
+    return {
+        'attendance': attendance,
+        'cgpa': cgpa,
+        'backlogs': backlogs,
+        'assignments_submitted': assignments_submitted,
+        'pending_fee_ratio': pending_fee_ratio,
+        'dropout': rng.binomial(1, dropout_prob)
+    }
+
+def generate_chunk_frame(seed, chunk_index, n_rows, profile='sample'):
+    import pandas as pd
+    return pd.DataFrame(generate_chunk(seed, chunk_index, n_rows, profile), columns=COLUMNS)
+
+def run_ordered(function, tasks, workers):
+    """
+    Yield function(*task) for every task, in order, using up to workers processes
+    At most 2 * workers results are pending at a time, so a slow consumer holds memory
+    for a few chunks rather than for the whole dataset.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield function(*task)
+        return
+
+    import multiprocessing
+
+    with multiprocessing.get_context().Pool(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(function, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def iter_chunks(n_samples, seed=42, chunk_size=CHUNK_SIZE, workers=1, profile='sample'):
+    """
+    Yield the dataset as DataFrames of up to chunk_size rows, in order
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}', expected one of {tuple(PROFILES)}")
+    tasks = [(seed, index, n_rows, profile) for index, n_rows in enumerate(chunk_sizes(n_samples, chunk_size))]
+    yield from run_ordered(generate_chunk_frame, tasks, workers)
+
+def generate_dataset(n_samples, seed=42, chunk_size=CHUNK_SIZE, workers=1, profile='sample'):
+    """
+    The whole dataset as one DataFrame (same rows as concatenating iter_chunks)
+    """
+    import pandas as pd
+    chunks = list(iter_chunks(n_samples, seed, chunk_size, workers, profile))
+    if not chunks:
+        return pd.DataFrame({column: [] for column in COLUMNS})
+    return pd.concat(chunks, ignore_index=True)
+
+def part_path(out_dir, chunk_index, file_format):
+    return os.path.join(out_dir, f'part-{chunk_index:05d}.{file_format}')
+
+def write_part(out_dir, file_format, seed, chunk_index, n_rows, profile):
+    """
+    Generate one chunk and write it to its part file; returns (path, n_rows)
+    The part is written under a temporary name and renamed, so readers never see half a part
+    """
+    columns = generate_chunk(seed, chunk_index, n_rows, profile)
+    path = part_path(out_dir, chunk_index, file_format)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    if file_format == 'npz':
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns)
+    else:
+        import pandas as pd
+        pd.DataFrame(columns, columns=COLUMNS).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path, n_rows
+
+def write_dataset(out_dir, n_samples, seed=42, chunk_size=CHUNK_SIZE, workers=1, profile='sample',
+                  file_format='npz'):
+    """
+    Write the dataset to out_dir as one part file per chunk, generated by worker processes
+    Workers write their parts directly; only file names come back to this process.
+    Part files and the manifest of an earlier dataset in out_dir are removed first.
+    Returns the part paths in order.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}', expected one of {FORMATS}")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}', expected one of {tuple(PROFILES)}")
+    os.makedirs(out_dir, exist_ok=True)
+    # The manifest goes first, so an interrupted rewrite is never read as a complete dataset
+    for name in [MANIFEST_FILE] + sorted(os.listdir(out_dir)):
+        if name == MANIFEST_FILE or name.startswith('part-'):
+            try:
+                os.remove(os.path.join(out_dir, name))
+            except FileNotFoundError:
+                pass
+
+    tasks = [(out_dir, file_format, seed, index, n_rows, profile)
+             for index, n_rows in enumerate(chunk_sizes(n_samples, chunk_size))]
+    paths = [path for path, _ in run_ordered(write_part, tasks, workers)]
+
+    manifest = {'n_samples': n_samples, 'seed': seed, 'chunk_size': chunk_size, 'profile': profile,
+                'format': file_format, 'parts': [os.path.basename(path) for path in paths]}
+    tmp_path = os.path.join(out_dir, f'.{MANIFEST_FILE}.tmp-{os.getpid()}')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_FILE))
+    return paths
+
+def read_part(path):
+    """
+    Read one part file back as a DataFrame
+    """
+    import pandas as pd
+    if path.endswith('.npz'):
+        with np.load(path) as columns:
+            return pd.DataFrame({column: columns[column] for column in COLUMNS})
+    return pd.read_csv(path)
+
+def iter_dataset(out_dir):
+    """
+    Yield the part files listed in a written dataset's manifest as DataFrames, in chunk order
+    Raises FileNotFoundError if out_dir holds no complete dataset
+    """
+    with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+        names = json.load(f)['parts']
+    for name in names:
+        yield read_part(os.path.join(out_dir, name))
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Generate a large synthetic student dataset in parallel')
+    parser.add_argument('--rows', type=int, required=True, help='number of students to generate')
+    parser.add_argument('--out', required=True, help='directory to write the part files to')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--profile', choices=list(PROFILES), default='sample')
+    parser.add_argument('--format', choices=FORMATS, default='npz')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = write_dataset(args.out, args.rows, args.seed, args.chunk_size, args.workers,
+                          args.profile, args.format)
+    print(f"Wrote {args.rows} rows in {len(paths)} parts to {args.out} "
+          f"in {time.perf_counter() - start:.2f}s with {args.workers} workers")
@@ -0,0 +1,47 @@
+"""
+Test script for batch dropout prediction
+"""
+import os
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+
+def test_batch_prediction():
+    print("=== Batch Prediction Test ===")
+
+    # Train a small model to score against
+    model = DropoutPredictionModel('test_batch_model.pkl')
+    model.train_model(generate_sample_data(300))
+
+    students = generate_sample_data(50).drop(columns=['dropout']).to_dict('records')
+
+    # Batch scores must match the single-row path exactly
+    results = model.predict_dropout_risk_batch(students)
+    assert len(results) == len(students)
+    for student, result in zip(students, results):
+        assert result['success']
+        single = model.predict_dropout_risk(student)
+        assert result['data'] == single, (result['data'], single)
+    print(f"Batch matches single-row predictions for {len(students)} students")
+
+    # Invalid rows are reported individually without failing the batch
+    mixed = [
+        students[0],
+        {'attendance': 80, 'cgpa': 7.5},
+        {**students[1], 'cgpa': 'high'},
+        'not a student',
+        students[2]
+    ]
+    results = model.predict_dropout_risk_batch(mixed)
+    assert [r['success'] for r in results] == [True, False, False, False, True]
+    assert results[1]['error'] == 'Missing required field: backlogs'
+    assert results[4]['data'] == model.predict_dropout_risk(students[2])
+    for result in results:
+        if not result['success']:
+            print(f"  Rejected: {result['error']}")
+
+    assert model.predict_dropout_risk_batch([]) == []
+
+    os.remove('test_batch_model.pkl')
+    print("\n=== Test Complete ===")
+
+if __name__ == "__main__":
+    test_batch_prediction()
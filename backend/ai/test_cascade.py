@@ -0,0 +1,78 @@
+"""
+Test script for two-tier cascade scoring
+"""
+import os
+import shutil
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data, risk_level_codes
+from cascade import CascadePredictor
+from feature_transform import RAW_FEATURES
+
+def test_cascade():
+    print("=== Cascade Scoring Test ===")
+    data = generate_sample_data(3000)
+    model = DropoutPredictionModel('test_cascade_model.pkl', engine='flat')
+    model.train_model(data, profile='compact', cascade=True)
+
+    report = model.training_metrics['cascade']
+    print(f"  Pass-through {report['pass_through_rate']:.1%}, agreement {report['level_agreement']:.2%}, "
+          f"{report['speedup']:.1f}x")
+    assert 0 < report['pass_through_rate'] < 0.5
+    assert report['level_agreement'] > 0.95
+
+    cascade = model.predictor
+    assert isinstance(cascade, CascadePredictor)
+    X = model.transform.transform_array(generate_sample_data(2000)[RAW_FEATURES].values)
+    scores = cascade.predict_proba(X)[:, 1]
+    linear = cascade.linear.positive_proba(X)
+    forest = cascade.forest.predict_proba(X)[:, 1]
+
+    # Rows near a boundary carry the forest's score, all others the linear one
+    near = (np.abs(linear - 0.4) < cascade.margin) | (np.abs(linear - 0.7) < cascade.margin)
+    assert np.array_equal(scores[near], forest[near]) and np.array_equal(scores[~near], linear[~near])
+    assert cascade.rows_scored == 2000 and cascade.rows_forwarded == near.sum()
+    assert list(risk_level_codes(np.array([0.1, 0.4, 0.69, 0.7]))) == [0, 1, 1, 2]
+
+    # Scores-only requests go through the cascade; explained ones are scored by the forest
+    # their reasons come from
+    students = data.drop(columns=['dropout']).head(50).to_dict('records')
+    X_students = model.transform.transform_records(students)
+    batch = model.predict_dropout_risk_batch(students)
+    scores_only = model.predict_dropout_risk_batch(students, explain=False)
+    for row, (student, result) in enumerate(zip(students, batch)):
+        single = model.predict_dropout_risk(student)
+        assert abs(single['risk_score'] - result['data']['risk_score']) < 1e-12
+        assert single['top_reasons'] == result['data']['top_reasons']
+        assert abs(single['risk_score'] - cascade.forest.predict_proba(X_students[row:row + 1])[0, 1]) < 1e-12
+    cascade_scores = cascade.predict_proba(X_students)[:, 1]
+    assert np.allclose([result['data']['risk_score'] for result in scores_only], cascade_scores, rtol=0, atol=1e-12)
+
+    # The linear model and margin are saved with either artifact format
+    model.model_path = 'test_cascade_artifact'
+    model.save_model()
+    for path in ('test_cascade_model.pkl', 'test_cascade_artifact'):
+        for engine in ('sklearn', 'flat'):
+            loaded = DropoutPredictionModel(path, engine=engine)
+            loaded.load_model()
+            assert isinstance(loaded.predictor, CascadePredictor)
+            assert np.allclose(loaded.predictor.predict_proba(X), cascade.predict_proba(X), rtol=0, atol=1e-6)
+
+    # update_model refits the regression next to the grown forest
+    coef = cascade.linear.coef.copy()
+    updated = DropoutPredictionModel('test_cascade_artifact', engine='flat')
+    updated.load_model()
+    updated.update_model(generate_sample_data(1000), n_new_trees=5, save=False)
+    assert isinstance(updated.predictor, CascadePredictor) and updated.predictor.linear is updated.linear_scorer
+    assert not np.allclose(updated.linear_scorer.coef, coef) and 'cascade' in updated.training_metrics
+
+    # Without cascade=True the forest scores every row, as before
+    plain = DropoutPredictionModel('test_cascade_model.pkl')
+    plain.train_model(data, save=False)
+    assert not isinstance(plain.predictor, CascadePredictor) and 'cascade' not in plain.training_metrics
+
+    os.remove('test_cascade_model.pkl')
+    shutil.rmtree('test_cascade_artifact')
+    print("Cascade scoring test passed")
+
+if __name__ == "__main__":
+    test_cascade()
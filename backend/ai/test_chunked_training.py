@@ -0,0 +1,123 @@
+"""
+Test script for out-of-core training from chunked sources
+"""
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from chunked_training import ValidationReservoir, thin_forest
+from training_ingest import iter_training_chunks, read_training_stream, TRAINING_COLUMNS
+
+def test_validation_reservoir():
+    print("=== Validation Reservoir Test ===")
+    reservoir = ValidationReservoir(1, capacity=1000, seed=3)
+    for start in range(0, 20000, 700):
+        rows = np.arange(start, min(start + 700, 20000), dtype=np.float64)
+        reservoir.add(rows[:, None], rows.astype(np.int64))
+    X, y = reservoir.arrays()
+    assert reservoir.n_seen == 20000 and len(X) == 1000
+    assert np.array_equal(X[:, 0], y) and len(np.unique(y)) == 1000
+    # A uniform sample of 0..19999 has a mean near 10000 (standard error ~180)
+    print(f"  Sample mean {y.mean():.0f}")
+    assert abs(y.mean() - 10000) < 1000
+
+    small = ValidationReservoir(1, capacity=1000)
+    small.add(np.ones((10, 1)), np.ones(10, dtype=np.int64))
+    assert len(small.arrays()[0]) == 10
+    print("Validation reservoir test passed")
+
+def test_thin_forest():
+    print("=== Forest Thinning Test ===")
+    # Trees stand in as their fitting order; 2000 trees fitted 50 at a time, 100 kept
+    class Forest:
+        estimators_ = []
+        n_estimators = 0
+    forest, rng = Forest(), np.random.default_rng(3)
+    n_thinned = 0
+    for n_fitted in range(50, 2001, 50):
+        forest.estimators_ = list(forest.estimators_) + list(range(n_fitted - 50, n_fitted))
+        n_thinned += thin_forest(forest, n_fitted, 100, rng)
+    kept = np.array(forest.estimators_)
+    assert len(kept) == forest.n_estimators == 100 and n_thinned == 1900 and len(np.unique(kept)) == 100
+    # A uniform sample of 0..1999 has a mean near 1000 (standard error ~58)
+    print(f"  Kept tree mean {kept.mean():.0f}")
+    assert abs(kept.mean() - 1000) < 300
+    print("Forest thinning test passed")
+
+def test_iter_training_chunks():
+    print("=== Chunked Training Files Test ===")
+    data = generate_sample_data(2500)[TRAINING_COLUMNS]
+    uploads = {
+        'text/csv': data.to_csv(index=False).encode(),
+        'application/x-ndjson': data.to_json(orient='records', lines=True).encode()
+    }
+    for content_type, body in uploads.items():
+        chunks = list(iter_training_chunks(io.BytesIO(body), content_type, chunk_rows=1000))
+        assert [len(chunk['dropout']) for chunk in chunks] == [1000, 1000, 500]
+        joined = pd.concat([pd.DataFrame(chunk) for chunk in chunks], ignore_index=True)
+        pd.testing.assert_frame_equal(joined, read_training_stream(io.BytesIO(body), content_type))
+    print("Chunked training files test passed")
+
+def test_train_model_chunked():
+    print("=== Out-of-Core Training Test ===")
+    data = generate_sample_data(6000)
+    chunks = [data.iloc[start:start + 2000] for start in range(0, 6000, 2000)]
+    # A chunk with only one class cannot grow the forest and is skipped
+    chunks.append(data[data['dropout'] == 0].head(500))
+
+    model = DropoutPredictionModel('test_chunked_model.pkl', engine='flat')
+    model.train_model_chunked(iter(chunks), save=False, trees_per_chunk=5)
+    metrics = model.training_metrics
+    print(f"  {metrics['n_chunks']} chunks, {metrics['n_estimators']} trees, accuracy {metrics['accuracy']:.2%}")
+    assert metrics['mode'] == 'out_of_core' and metrics['profile'] == 'compact'
+    assert metrics['n_chunks'] == 4 and metrics['n_skipped_chunks'] == 1
+    assert metrics['n_estimators'] == 15 and metrics['n_thinned_trees'] == 0
+    # The skipped chunk still contributes its held-out rows to validation
+    assert 6000 < metrics['n_train'] + metrics['n_held_out'] < 6500
+    assert metrics['n_test'] == metrics['n_held_out']
+    assert metrics['accuracy'] > 0.6
+
+    # The chunk-trained model serves like any other
+    student = data.drop(columns=['dropout']).iloc[0].to_dict()
+    result = model.predict_dropout_risk(student)
+    assert 0 <= result['risk_score'] <= 1 and len(result['top_reasons']) > 0
+
+    # Past max_trees the forest keeps a sample of the trees of every chunk
+    capped = DropoutPredictionModel('test_chunked_model.pkl', engine='flat')
+    capped.train_model_chunked(iter(chunks), save=False, trees_per_chunk=5, max_trees=8)
+    metrics = capped.training_metrics
+    assert metrics['n_estimators'] == 8 and metrics['n_fitted_trees'] == 15 and metrics['n_thinned_trees'] == 7
+    assert capped.model.n_estimators == 8 and 0 <= capped.predict_dropout_risk(student)['risk_score'] <= 1
+
+    try:
+        model.train_model_chunked(iter([data[data['dropout'] == 1]]), save=False)
+        assert False, 'single-class data accepted'
+    except ValueError:
+        pass
+    print("Out-of-core training test passed")
+
+def test_feature_store_chunks():
+    print("=== Feature Store Chunks Test ===")
+    mongomock = pytest.importorskip('mongomock')
+    from feature_store import iter_feature_store, read_feature_store, SUM_FIELDS
+
+    db = mongomock.MongoClient()['erp_system']
+    rng = np.random.default_rng(1)
+    db.studentfeatures.insert_many([
+        dict({field: float(rng.integers(1, 50)) for field in SUM_FIELDS}, student_id=i) for i in range(250)
+    ])
+    chunks = list(iter_feature_store(db, chunk_rows=100))
+    assert [len(ids) for ids, _ in chunks] == [100, 100, 50]
+    ids, features = read_feature_store(db)
+    assert sum((chunk_ids for chunk_ids, _ in chunks), []) == ids
+    for feature, values in features.items():
+        assert np.array_equal(np.concatenate([chunk[feature] for _, chunk in chunks]), values)
+    print("Feature store chunks test passed")
+
+if __name__ == "__main__":
+    test_validation_reservoir()
+    test_thin_forest()
+    test_iter_training_chunks()
+    test_train_model_chunked()
+    test_feature_store_chunks()
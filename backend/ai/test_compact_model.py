@@ -0,0 +1,76 @@
+"""
+Test script for the compact training profile and float32 flat forests
+"""
+import os
+import shutil
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, TRAINING_PROFILES, generate_sample_data
+from forest_engine import FlatForest
+from feature_transform import RAW_FEATURES
+
+def test_compact_model():
+    print("=== Compact Model Test ===")
+    data = generate_sample_data(3000)
+    default = DropoutPredictionModel('test_compact_model.pkl')
+    default.train_model(data, save=False)
+    model = DropoutPredictionModel('test_compact_model.pkl')
+    model.train_model(data, profile='compact')
+
+    settings = TRAINING_PROFILES['compact']
+    trees = [estimator.tree_ for estimator in model.model.estimators_]
+    assert model.training_metrics['profile'] == 'compact'
+    assert max(tree.max_depth for tree in trees) <= settings['max_depth']
+    assert max(tree.n_leaves for tree in trees) <= settings['max_leaf_nodes']
+    n_nodes = sum(tree.node_count for tree in trees)
+    default_nodes = sum(estimator.tree_.node_count for estimator in default.model.estimators_)
+    print(f"  Nodes: default {default_nodes}, compact {n_nodes}")
+    assert n_nodes < default_nodes / 5
+
+    # float32 thresholds send every row to the same leaves as the float64 ones
+    full = FlatForest.from_sklearn(model.model)
+    compact = model.explainer
+    assert compact.threshold.dtype == np.float32 and compact.leaf_proba.dtype == np.float32
+    assert compact.children.dtype == np.int32
+    assert sum(a.nbytes for a in compact.to_arrays().values()) < 0.6 * sum(a.nbytes for a in full.to_arrays().values())
+    X = model.transform.transform_array(generate_sample_data(2000)[RAW_FEATURES].values)
+    assert np.array_equal(compact.apply(X), full.apply(X))
+    # Features sitting exactly on a threshold, and just either side of it, too
+    split = ~(compact.children[:, 0] == np.arange(len(compact.children)))
+    on_threshold = np.repeat(X[:1], 3 * split.sum(), axis=0).astype(np.float32)
+    thresholds = full.threshold[split].astype(np.float32)
+    values = np.concatenate([thresholds, np.nextafter(thresholds, np.float32(np.inf)),
+                             np.nextafter(thresholds, np.float32(-np.inf))])
+    on_threshold[np.arange(len(values)), np.tile(full.feature[split], 3)] = values
+    assert np.array_equal(compact.apply(on_threshold), full.apply(on_threshold))
+    assert np.abs(compact.predict_proba(X) - model.model.predict_proba(X)).max() < 1e-6
+
+    bias, contributions = compact.explain(X[:50])
+    assert np.allclose(bias + contributions.sum(axis=1), model.model.predict_proba(X[:50])[:, 1], atol=1e-6)
+
+    # The profile is saved with the model, and directory artifacts keep the float32 arrays
+    loaded = DropoutPredictionModel('test_compact_model.pkl', engine='flat')
+    loaded.load_model()
+    assert loaded.profile == 'compact' and loaded.predictor.threshold.dtype == np.float32
+
+    model.model_path = 'test_compact_artifact'
+    model.save_model()
+    for engine in ('flat', 'sklearn'):
+        served = DropoutPredictionModel('test_compact_artifact', engine=engine)
+        served.load_model()
+        assert served.profile == 'compact' and served.explainer.threshold.dtype == np.float32
+        student = data.drop(columns=['dropout']).iloc[0].to_dict()
+        assert abs(served.predict_dropout_risk(student)['risk_score'] -
+                   model.predict_dropout_risk(student)['risk_score']) < 1e-6
+
+    try:
+        model.train_model(data, save=False, profile='tiny')
+        assert False, 'unknown profile accepted'
+    except ValueError:
+        pass
+
+    os.remove('test_compact_model.pkl')
+    shutil.rmtree('test_compact_artifact')
+    print("Compact model test passed")
+
+if __name__ == "__main__":
+    test_compact_model()
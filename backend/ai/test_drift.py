@@ -0,0 +1,153 @@
+"""
+Test script for feature drift monitoring
+"""
+import json
+import os
+import shutil
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from drift import FeatureSketch, DriftMonitor, population_stability, DRIFT_BINS
+from feature_transform import RAW_FEATURES
+
+def test_feature_sketch():
+    print("=== Feature Sketch Test ===")
+    raw = generate_sample_data(4000)[RAW_FEATURES].values
+    sketch = FeatureSketch.from_values(raw[:2000])
+    assert sketch.counts.shape == (len(RAW_FEATURES), DRIFT_BINS) and sketch.n_rows == 2000
+    # Discrete features have fewer distinct quantiles; the padding bins stay empty
+    backlogs = RAW_FEATURES.index('backlogs')
+    assert np.isinf(sketch.edges[backlogs, -1]) and sketch.counts[backlogs, -1] == 0
+
+    # Merging two halves gives the same counts as counting everything in one sketch
+    first, second = sketch.empty(), sketch.empty()
+    first.update(raw[:1000])
+    second.update(raw[1000:])
+    whole = sketch.empty()
+    whole.update(raw)
+    first.merge(second)
+    assert np.array_equal(first.counts, whole.counts)
+
+    restored = FeatureSketch.from_dict(sketch.to_dict())
+    assert np.array_equal(restored.edges, sketch.edges) and np.array_equal(restored.counts, sketch.counts)
+    assert restored.fingerprint() == sketch.fingerprint()
+
+    try:
+        first.merge(FeatureSketch.from_values(raw[:500]))
+        assert False, 'sketches with different edges merged'
+    except ValueError:
+        pass
+
+    # Same distribution: PSI near 0; attendance shifted by 15 points: far above 0.25
+    same = sketch.empty()
+    same.update(raw[2000:])
+    shifted = sketch.empty()
+    shifted.update(raw[2000:] - np.array([15, 0, 0, 0, 0]))
+    psi_same = population_stability(sketch, same)
+    psi_shifted = population_stability(sketch, shifted)
+    print(f"  PSI same {psi_same.max():.3f}, shifted attendance {psi_shifted[0]:.3f}")
+    assert psi_same.max() < 0.1 and psi_shifted[0] > 0.25 and psi_shifted[1:].max() < 0.1
+    print("Feature sketch test passed")
+
+def test_model_drift():
+    print("=== Model Drift Test ===")
+    data = generate_sample_data(3000)
+    model = DropoutPredictionModel('test_drift_model.pkl', engine='flat')
+    model.train_model(data)
+    assert model.drift_reference.n_rows == 3000
+
+    # The reference is saved with either artifact format
+    model.model_path = 'test_drift_artifact'
+    model.save_model()
+    for path in ('test_drift_model.pkl', 'test_drift_artifact'):
+        loaded = DropoutPredictionModel(path, engine='flat')
+        loaded.load_model()
+        assert np.array_equal(loaded.drift_reference.counts, model.drift_reference.counts)
+
+    # Predictions are counted in the scaled space, into the same bins as the raw values
+    students = generate_sample_data(1200).drop(columns=['dropout'])
+    loaded.predict_dropout_risk_batch(students.to_dict('records'), explain=False)
+    for student in students.head(50).to_dict('records'):
+        loaded.predict_dropout_risk(student)
+    expected = loaded.drift_reference.empty()
+    expected.update(students.values)
+    expected.update(students.head(50).values)
+    assert np.array_equal(loaded.snapshot.drift.live().counts, expected.counts)
+    report = loaded.drift_report()
+    assert report['live_rows'] == 1250 and report['drifted'] == []
+
+    # Reloading starts new live counts, and warm-up rows are not counted; shifted traffic is flagged
+    loaded.load_model()
+    loaded.warm_up()
+    assert loaded.snapshot.drift.live().n_rows == 0
+    shifted = students.assign(pending_fee_ratio=np.minimum(students['pending_fee_ratio'] + 0.4, 1.0))
+    loaded.predict_dropout_risk_batch(shifted.to_dict('records'), explain=False)
+    report = loaded.drift_report()
+    print(f"  Shifted pending fees: PSI {report['features']['pending_fee_ratio']['psi']}")
+    assert report['drifted'] == ['pending_fee_ratio']
+
+    # update_model adds the new records to a copy of the reference
+    snapshot = model.snapshot
+    model.update_model(generate_sample_data(500), n_new_trees=5, save=False)
+    assert model.drift_reference.n_rows == 3500 and snapshot.drift.reference.n_rows == 3000
+
+    # Models saved before drift monitoring still serve, without a report
+    model.drift_reference = None
+    model.build_predictor()
+    assert model.snapshot.drift is None and model.drift_report() is None
+
+    os.remove('test_drift_model.pkl')
+    shutil.rmtree('test_drift_artifact')
+    print("Model drift test passed")
+
+def test_merge_across_workers():
+    print("=== Drift Across Workers Test ===")
+    model = DropoutPredictionModel('test_drift_model.pkl', engine='flat')
+    model.train_model(generate_sample_data(2000), save=False)
+    reference, transform = model.drift_reference, model.transform
+    X = transform.transform_array(generate_sample_data(1500)[RAW_FEATURES].values)
+    drift_dir = 'test_drift_dir'
+
+    # Another worker's counts, as it would have written them
+    other = DriftMonitor(reference, transform, drift_dir=drift_dir)
+    other.observe(X[:1000])
+    os.replace(os.path.join(drift_dir, other.file_name()),
+               os.path.join(drift_dir, f'drift-1-{other.reference_id}.json'))
+    # and a worker still serving a different model
+    stale = DriftMonitor(FeatureSketch.from_values(generate_sample_data(100)[RAW_FEATURES].values),
+                         transform, drift_dir=drift_dir)
+    stale.observe(X[:1000])
+    os.replace(os.path.join(drift_dir, stale.file_name()),
+               os.path.join(drift_dir, f'drift-2-{stale.reference_id}.json'))
+
+    monitor = DriftMonitor(reference, transform, drift_dir=drift_dir)
+    monitor.observe(X[1000:])
+    live, n_processes = monitor.merged_live()
+    assert n_processes == 2 and live.n_rows == 1500
+    assert monitor.report()['processes'] == 2
+
+    # Two models served by one process write separate files and do not overwrite each other
+    second_reference = FeatureSketch.from_values(generate_sample_data(300)[RAW_FEATURES].values)
+    second = DriftMonitor(second_reference, transform, drift_dir=drift_dir)
+    second.observe(X[:1000])
+    monitor.flush()
+    second.flush()
+    for written, n_rows in ((monitor, 500), (second, 1000)):
+        with open(os.path.join(drift_dir, written.file_name())) as f:
+            counts = json.load(f)
+        assert counts['reference_id'] == written.reference_id
+        assert FeatureSketch.from_dict(counts['live']).n_rows == n_rows
+    assert monitor.merged_live()[0].n_rows == 1500 and second.merged_live()[0].n_rows == 1000
+
+    # Windows rotate, so a long-running process reports its recent traffic
+    windowed = DriftMonitor(reference, transform, window_rows=600, drift_dir=None)
+    for start in range(0, 1500, 100):
+        windowed.observe(X[start:start + 100])
+    assert windowed.live().n_rows == 900
+
+    shutil.rmtree(drift_dir)
+    print("Drift across workers test passed")
+
+if __name__ == "__main__":
+    test_feature_sketch()
+    test_model_drift()
+    test_merge_across_workers()
@@ -0,0 +1,62 @@
+"""
+Test script for per-prediction explanations from the forest's decision paths
+"""
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data, MAX_REASONS
+from feature_transform import RAW_FEATURES
+
+def test_explanations():
+    print("=== Explanations Test ===")
+    model = DropoutPredictionModel('test_explain_model.pkl')
+    model.train_model(generate_sample_data(600), save=False)
+
+    students = generate_sample_data(400)[RAW_FEATURES]
+    X = model.transform.transform_array(students.values)
+
+    # Bias plus contributions add up to the forest's dropout probability
+    bias, contributions = model.explainer.explain(X)
+    assert contributions.shape == (len(students), len(model.feature_names))
+    expected = model.model.predict_proba(X)[:, 1]
+    assert np.allclose(bias + contributions.sum(axis=1), expected)
+    print(f"  Contributions add up to predict_proba for {len(students)} students (bias {bias:.3f})")
+
+    # A single row is explained the same way as inside a batch
+    single_bias, single = model.explainer.explain(X[7:8])
+    assert single_bias == bias and np.allclose(single[0], contributions[7])
+
+    # Reasons follow the largest positive contributions, and the two engines agree
+    flat_model = DropoutPredictionModel('test_explain_model.pkl', engine='flat')
+    flat_model.model, flat_model.scaler = model.model, model.scaler
+    flat_model.feature_names, flat_model.transform = model.feature_names, model.transform
+    flat_model.build_predictor()
+
+    records = students.to_dict('records')
+    batch = model.predict_dropout_risk_batch(records)
+    assert flat_model.predict_dropout_risk_batch(records) == batch
+    for i in (0, 7, 399):
+        reasons = batch[i]['data']['top_reasons']
+        assert model.predict_dropout_risk(records[i]) == batch[i]['data']
+        assert len(reasons) <= MAX_REASONS
+        assert all(reason['contribution'] > 0 for reason in reasons)
+        assert [reason['contribution'] for reason in reasons] == sorted(
+            (reason['contribution'] for reason in reasons), reverse=True)
+        top = int(np.argmax(contributions[i]))
+        if contributions[i, top] > 0:
+            assert np.isclose(reasons[0]['contribution'], contributions[i, top], atol=1e-4)
+
+    # A student with poor numbers everywhere gets reasons for the high score
+    at_risk = model.predict_dropout_risk({'attendance': 20, 'cgpa': 1.5, 'backlogs': 6,
+                                          'assignments_submitted': 1, 'pending_fee_ratio': 0.8})
+    print(f"  At-risk student: {[(r['factor'], r['impact']) for r in at_risk['top_reasons']]}")
+    assert at_risk['top_reasons']
+
+    # Scores alone can be requested without explanations
+    plain = model.predict_dropout_risk_batch(records, explain=False)
+    assert all('top_reasons' not in result['data'] for result in plain)
+    assert [r['data']['risk_score'] for r in plain] == [r['data']['risk_score'] for r in batch]
+    assert 'top_reasons' not in model.predict_dropout_risk(records[0], explain=False)
+
+    print("Explanations test passed")
+
+if __name__ == "__main__":
+    test_explanations()
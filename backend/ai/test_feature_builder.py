@@ -0,0 +1,55 @@
+"""
+Test script for the vectorized feature builder
+Checks build_features against the per-student extract_features_from_student
+"""
+import numpy as np
+import pytest
+from feature_builder import build_features
+from sample_records import generate_records
+
+def test_feature_builder():
+    print("=== Vectorized Feature Builder Test ===")
+    student_ids, academic, attendance, fees = generate_records(300)
+
+    # Records of a student we are not building features for are ignored
+    academic.loc[len(academic)] = ['unknown', 10.0, 4.0, 'A', 'Pass']
+    # Missing values count as 0, like record.get(field, 0) on a document without the field
+    academic.loc[0, 'grade_point'] = np.nan
+
+    features = build_features(student_ids, academic, attendance, fees)
+    assert len(features) == len(student_ids)
+
+    # Fee ratio: pending / billed, 0 with nothing billed
+    billed = fees.groupby('student_id')['total_amount'].sum()
+    pending = fees.groupby('student_id')['pending_amount'].sum()
+    for row, student_id in enumerate(student_ids):
+        value = features['pending_fee_ratio'].iloc[row]
+        if billed.get(student_id, 0) > 0:
+            assert np.isclose(value, pending[student_id] / billed[student_id])
+        else:
+            assert value == 0
+    print("  Fee ratios match grouped sums")
+
+    # Plain dicts of arrays work too, and students without records get zeros
+    empty = {'student_id': np.array([], dtype=object)}
+    zero = build_features(['nobody'], empty, empty)
+    assert zero.values.tolist() == [[0, 0, 0, 0, 0]]
+
+    # Same features as the per-student implementation (needs pymongo to import it)
+    pytest.importorskip('pymongo')
+    from fetch_and_train_from_mongodb import extract_features_from_student
+
+    academic_records = academic.fillna({'grade_point': 0}).to_dict('records')
+    attendance_records = attendance.to_dict('records')
+    for row, student_id in enumerate(student_ids):
+        reference = extract_features_from_student(
+            {'_id': student_id},
+            [r for r in academic_records if r['student_id'] == student_id],
+            [r for r in attendance_records if r['student_id'] == student_id])
+        for feature in ('attendance', 'cgpa', 'backlogs', 'assignments_submitted'):
+            assert np.isclose(features[feature].iloc[row], reference[feature]), (student_id, feature)
+    print(f"  {len(student_ids)} students match extract_features_from_student")
+    print("Vectorized feature builder test passed")
+
+if __name__ == "__main__":
+    test_feature_builder()
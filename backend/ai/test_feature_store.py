@@ -0,0 +1,129 @@
+"""
+Test script for reading the per-student feature store
+Runs against mongomock, an in-memory stand-in for MongoDB (pip install -r requirements-dev.txt)
+"""
+from datetime import datetime
+import numpy as np
+import pytest
+from feature_transform import RAW_FEATURES
+from feature_store import features_from_sums, SUM_FIELDS
+
+def test_features_from_sums():
+    print("=== Feature Store Sums Test ===")
+    sums = {
+        'grade_points': [72.0, 0.0, 35.0],
+        'credits': [9.0, 0.0, 4.0],
+        'backlogs': [0, 2, 1],
+        'academic_records': [3, 2, 5],
+        'present_classes': [45, 0, 10],
+        'total_classes': [50, 0, 40],
+        'fee_total': [100000, 0, 50000],
+        'fee_pending': [25000, 0, 50000]
+    }
+    features = features_from_sums(sums)
+
+    assert list(features) == RAW_FEATURES
+    assert np.allclose(features['attendance'], [90.0, 0.0, 25.0])
+    assert np.allclose(features['cgpa'], [8.0, 0.0, 8.75])
+    assert np.allclose(features['backlogs'], [0, 2, 1])
+    assert np.allclose(features['assignments_submitted'], [3, 2, 5])
+    assert np.allclose(features['pending_fee_ratio'], [0.25, 0.0, 1.0])
+    print("  Features derived from running sums as expected (zero denominators give 0)")
+
+def test_read_feature_store():
+    print("=== Feature Store Read Test ===")
+    mongomock = pytest.importorskip('mongomock')
+    pytest.importorskip('pymongo')
+    from bson import ObjectId
+    from feature_store import get_student_features, read_feature_store, has_feature_store
+    import fetch_and_train_from_mongodb as mongo_training
+
+    db = mongomock.MongoClient()['erp_system']
+    assert not has_feature_store(db)
+
+    rng = np.random.default_rng(1)
+    student_ids = [ObjectId() for _ in range(200)]
+    entries = []
+    for i, student_id in enumerate(student_ids):
+        entry = {field: float(rng.integers(0, 50)) for field in SUM_FIELDS}
+        entry['student_id'] = student_id
+        entry['updatedAt'] = datetime(2024, 1, 1) if i % 4 else datetime(2024, 9, 1)
+        entries.append(entry)
+    # An entry upserted by a single $inc only carries the sums it touched
+    del entries[7]['fee_total']
+    db.studentfeatures.insert_many(entries)
+    assert has_feature_store(db)
+
+    ids, features = read_feature_store(db)
+    assert ids == student_ids
+    expected = features_from_sums({field: [entry.get(field, 0) for entry in entries] for field in SUM_FIELDS})
+    for feature in RAW_FEATURES:
+        assert np.allclose(features[feature], expected[feature]), feature
+    print(f"  Read {len(ids)} students from the store")
+
+    # Single-student lookups match the bulk read
+    single = get_student_features(db, student_ids[7])
+    assert single == {feature: float(features[feature][7]) for feature in RAW_FEATURES}
+    assert get_student_features(db, ObjectId()) is None
+
+    # Only entries updated after `since`
+    ids, _ = read_feature_store(db, since=datetime(2024, 6, 1))
+    assert ids == student_ids[::4]
+
+    # Training data comes from the store once it is populated
+    data = mongo_training.fetch_student_data(db)
+    assert len(data) == len(student_ids)
+    assert list(data.columns) == RAW_FEATURES + ['dropout']
+    assert np.allclose(data['cgpa'].values, expected['cgpa'])
+    changed = mongo_training.fetch_student_data(db, since=datetime(2024, 6, 1))
+    assert len(changed) == len(student_ids[::4])
+    print(f"  Training frame built from the store ({len(changed)} changed students since 2024-06-01)")
+
+    print("Feature store read test passed")
+
+def rebuild_feature_store(db, student_ids):
+    """
+    Fill studentfeatures from the source collections as StudentFeatures.rebuildForStudents does
+    """
+    passed = {'$eq': ['$result_status', 'Pass']}
+    pipelines = {
+        'academicdetails': {
+            'grade_points': {'$sum': {'$cond': [passed, {'$multiply': ['$grade_point', '$credits_earned']}, 0]}},
+            'credits': {'$sum': {'$cond': [passed, '$credits_earned', 0]}},
+            'backlogs': {'$sum': {'$cond': [{'$eq': ['$grade', 'F']}, 1, 0]}},
+            'academic_records': {'$sum': 1}
+        },
+        'attendances': {'present_classes': {'$sum': '$present_classes'}, 'total_classes': {'$sum': '$total_classes'}},
+        'feemanagements': {'fee_total': {'$sum': '$total_amount'}, 'fee_pending': {'$sum': '$pending_amount'}}
+    }
+    entries = {student_id: dict({field: 0 for field in SUM_FIELDS}, student_id=student_id)
+               for student_id in student_ids}
+    for collection, sums in pipelines.items():
+        for group in db[collection].aggregate([{'$group': dict(sums, _id='$student_id')}]):
+            entries[group.pop('_id')].update(group)
+    db.studentfeatures.insert_many(list(entries.values()))
+
+def test_feature_store_parity():
+    print("=== Feature Store Parity Test ===")
+    mongomock = pytest.importorskip('mongomock')
+    pytest.importorskip('pymongo')
+    import fetch_and_train_from_mongodb as mongo_training
+    from sample_records import seed_database
+
+    # The same records give the same features through the aggregation pipelines and the store
+    db = mongomock.MongoClient()['erp_system']
+    student_ids = seed_database(db)
+    aggregated = mongo_training.fetch_student_data(db)
+    rebuild_feature_store(db, student_ids)
+    stored = mongo_training.fetch_student_data(db)
+    for feature in RAW_FEATURES:
+        assert np.allclose(aggregated[feature].values, stored[feature].values), feature
+    # Students without fee records and with pending results are both covered by the seed
+    assert (stored['pending_fee_ratio'].values[::3] == 0).all()
+    assert db.academicdetails.count_documents({'result_status': 'Pending'}) > 0
+    print(f"  {len(stored)} students have the same features from both paths")
+
+if __name__ == "__main__":
+    test_features_from_sums()
+    test_read_feature_store()
+    test_feature_store_parity()
@@ -0,0 +1,51 @@
+"""
+Test script for the frozen inference-time feature transform
+"""
+import os
+import copy
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from feature_transform import RAW_FEATURES
+
+def test_feature_transform():
+    print("=== Feature Transform Test ===")
+
+    model = DropoutPredictionModel('test_transform_model.pkl')
+    model.train_model(generate_sample_data(300))
+
+    students = generate_sample_data(40).drop(columns=['dropout'])
+
+    # Frozen transform must reproduce the scaler fitted at training time
+    expected = model.preprocess_data(students.copy(), fit=False)
+    actual = model.transform.transform_records(students.to_dict('records'))
+    assert np.array_equal(expected, actual)
+    for i, record in enumerate(students.to_dict('records')):
+        assert np.array_equal(model.transform.transform_one(record)[0], expected[i])
+        assert np.array_equal(model.transform.transform_one(students.values[i])[0], expected[i])
+    print("Transform matches the training scaler")
+
+    # Predictions must never refit the scaler
+    scaler_before = copy.deepcopy(model.scaler)
+    model.predict_dropout_risk(students.iloc[0].to_dict())
+    model.predict_dropout_risk_batch(students.to_dict('records'))
+    assert np.array_equal(scaler_before.mean_, model.scaler.mean_)
+    assert np.array_equal(scaler_before.scale_, model.scaler.scale_)
+    print("Scaler untouched by predictions")
+
+    # Missing fields take the training median
+    partial = students.iloc[0].to_dict()
+    del partial['pending_fee_ratio']
+    filled = dict(partial, pending_fee_ratio=model.medians['pending_fee_ratio'])
+    assert np.array_equal(model.transform.transform_one(partial), model.transform.transform_one(filled))
+
+    # Medians survive a save/load round trip
+    reloaded = DropoutPredictionModel('test_transform_model.pkl')
+    reloaded.load_model()
+    assert reloaded.medians == model.medians
+    assert np.array_equal(reloaded.transform.medians, [model.medians[name] for name in RAW_FEATURES])
+
+    os.remove('test_transform_model.pkl')
+    print("\n=== Test Complete ===")
+
+if __name__ == "__main__":
+    test_feature_transform()
@@ -0,0 +1,47 @@
+"""
+Parity test for the array-backed forest inference engine
+"""
+import os
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from forest_engine import FlatForest
+from feature_transform import RAW_FEATURES
+
+def test_forest_engine():
+    print("=== Forest Engine Parity Test ===")
+
+    model = DropoutPredictionModel('test_engine_model.pkl')
+    model.train_model(generate_sample_data(500))
+
+    flat = FlatForest.from_sklearn(model.model)
+    X = model.transform.transform_array(generate_sample_data(2000)[RAW_FEATURES].values)
+
+    # Leaves and probabilities must match sklearn for every row
+    expected_leaves = model.model.apply(X.astype(np.float32))
+    offsets = flat.roots[None, :]
+    assert np.array_equal(flat.apply(X) - offsets, expected_leaves)
+
+    expected = model.model.predict_proba(X)
+    actual = flat.predict_proba(X)
+    print(f"Max probability difference: {np.abs(expected - actual).max():.2e}")
+    assert np.allclose(expected, actual, rtol=0, atol=1e-12)
+
+    # Single rows go through the same path
+    for i in range(20):
+        assert np.allclose(flat.predict_proba(X[i:i + 1]), expected[i:i + 1], rtol=0, atol=1e-12)
+
+    # The model-level engine switch gives the same predictions
+    flat_model = DropoutPredictionModel('test_engine_model.pkl', engine='flat')
+    flat_model.load_model()
+    students = generate_sample_data(30).drop(columns=['dropout']).to_dict('records')
+    for student in students:
+        expected_result = model.predict_dropout_risk(student)
+        actual_result = flat_model.predict_dropout_risk(student)
+        assert abs(expected_result['risk_score'] - actual_result['risk_score']) < 1e-12
+        assert expected_result['risk_level'] == actual_result['risk_level']
+
+    os.remove('test_engine_model.pkl')
+    print("\n=== Test Complete ===")
+
+if __name__ == "__main__":
+    test_forest_engine()
@@ -0,0 +1,74 @@
+"""
+Test script for incremental (warm-start) retraining
+"""
+import os
+import shutil
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+
+def test_incremental_training():
+    print("=== Incremental Training Test ===")
+
+    model = DropoutPredictionModel('test_incremental_model.pkl')
+    model.train_model(generate_sample_data(400))
+    first_trees = list(model.model.estimators_)
+    mean_before = model.transform.mean.copy()
+
+    # New trees are appended; existing trees and scaling are kept
+    new_data = generate_sample_data(150)
+    model.update_model(new_data, n_new_trees=20, max_trees=300)
+    assert len(model.model.estimators_) == 120
+    assert model.model.estimators_[:100] == first_trees
+    assert np.array_equal(model.transform.mean, mean_before)
+    assert model.training_metrics['mode'] == 'incremental'
+    assert model.training_metrics['n_retired_trees'] == 0
+
+    # Past the cap the oldest trees are retired first
+    model.update_model(new_data, n_new_trees=30, max_trees=130)
+    assert len(model.model.estimators_) == 130
+    assert model.training_metrics['n_retired_trees'] == 20
+    assert model.model.estimators_[0] is first_trees[20]
+
+    # The update was saved and reloads with the same predictions
+    student = new_data.drop(columns=['dropout']).iloc[0].to_dict()
+    reloaded = DropoutPredictionModel('test_incremental_model.pkl')
+    reloaded.load_model()
+    assert reloaded.predict_dropout_risk(student) == model.predict_dropout_risk(student)
+
+    # Data with a single class would corrupt the forest's classes
+    single_class = new_data.copy()
+    single_class['dropout'] = 1
+    try:
+        model.update_model(single_class)
+        assert False, "single-class update should fail"
+    except ValueError as e:
+        print(f"Rejected: {e}")
+    assert len(model.model.estimators_) == 130
+
+    # Both classes in the batch, but the training split gets only one: the model is left as it was
+    trees, reference = model.model, model.drift_reference
+    few = new_data.head(5).assign(dropout=[0, 1, 0, 0, 0])
+    try:
+        model.update_model(few, save=False)
+        assert False, "update whose training split has one class should fail"
+    except ValueError as e:
+        print(f"Rejected: {e}")
+    assert model.model is trees and model.drift_reference is reference
+    assert list(model.model.classes_) == [0, 1] and len(model.model.estimators_) == 130
+    model.update_model(new_data, n_new_trees=5, max_trees=300, save=False)
+    assert len(model.model.estimators_) == 135
+
+    # Directory artifacts served by the flat engine can be updated too
+    model.model_path = 'test_incremental_model'
+    model.save_model()
+    flat_model = DropoutPredictionModel('test_incremental_model', engine='flat')
+    flat_model.load_model()
+    flat_model.update_model(new_data, n_new_trees=10, max_trees=300)
+    assert flat_model.predictor.n_estimators == 145
+
+    shutil.rmtree('test_incremental_model')
+    os.remove('test_incremental_model.pkl')
+    print("\n=== Test Complete ===")
+
+if __name__ == "__main__":
+    test_incremental_training()
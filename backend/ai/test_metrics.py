@@ -0,0 +1,100 @@
+"""
+Test script for the Prometheus metrics and per-stage prediction timings
+"""
+import os
+import shutil
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from metrics import MetricsRegistry, Gauge, StageTimer
+
+def test_metrics_format():
+    print("=== Metrics Format Test ===")
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests', ('endpoint', 'status'))
+    latency = registry.histogram('latency_seconds', 'Latency', ('stage',), buckets=(0.01, 0.1))
+    in_flight = registry.gauge('in_flight', 'In flight')
+    info = Gauge('model_info', 'Model', ('version',))
+    registry.add_collector(lambda: [(info, {('2025-01-14T02:00:00',): 1})])
+
+    requests.inc('/predict', '200')
+    requests.inc('/predict', '200')
+    requests.inc('/predict', '400')
+    for value in (0.005, 0.05, 0.05, 3.0):
+        latency.observe(value, 'parse')
+    in_flight.inc()
+    in_flight.dec()
+
+    text = registry.render()
+    print(text)
+    lines = text.splitlines()
+    assert '# TYPE requests_total counter' in lines
+    assert 'requests_total{endpoint="/predict",status="200"} 2' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="0.01"} 1' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 3' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{stage="parse"} 4' in lines
+    assert 'latency_seconds_sum{stage="parse"} 3.105' in lines
+    assert 'in_flight 0' in lines
+    assert 'model_info{version="2025-01-14T02:00:00"} 1' in lines
+    print("Metrics format test passed")
+
+def test_metrics_across_workers():
+    print("=== Metrics Across Workers Test ===")
+    metrics_dir = 'test_metrics_dir'
+
+    def worker_registry():
+        registry = MetricsRegistry(metrics_dir)
+        requests = registry.counter('requests_total', 'Requests', ('endpoint',))
+        latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.01, 0.1))
+        in_flight = registry.gauge('in_flight', 'In flight')
+        return registry, requests, latency, in_flight
+
+    # Another worker's values, as it would have written them
+    other, requests, latency, in_flight = worker_registry()
+    requests.inc('/predict', amount=5)
+    latency.observe(0.05)
+    in_flight.inc()
+    other.flush()
+    os.replace(os.path.join(metrics_dir, f'metrics-{os.getpid()}.json'), os.path.join(metrics_dir, 'metrics-1.json'))
+
+    registry, requests, latency, in_flight = worker_registry()
+    requests.inc('/predict')
+    requests.inc('/train')
+    latency.observe(0.005)
+    in_flight.inc()
+    in_flight.dec()
+    lines = registry.render().splitlines()
+    assert 'requests_total{endpoint="/predict"} 6' in lines
+    assert 'requests_total{endpoint="/train"} 1' in lines
+    assert 'latency_seconds_bucket{le="0.01"} 1' in lines and 'latency_seconds_count 2' in lines
+    # Gauges are the answering process's own
+    assert 'in_flight 0' in lines
+    assert sorted(os.listdir(metrics_dir)) == ['metrics-1.json', f'metrics-{os.getpid()}.json']
+
+    shutil.rmtree(metrics_dir)
+    print("Metrics across workers test passed")
+
+def test_prediction_stages():
+    print("=== Prediction Stage Timings Test ===")
+    model = DropoutPredictionModel('test_metrics_model.pkl')
+    model.train_model(generate_sample_data(300), save=False)
+    student = generate_sample_data(5).drop(columns=['dropout']).to_dict('records')
+
+    timer = StageTimer()
+    timer.mark('parse')
+    model.predict_dropout_risk(student[0], timings=timer.durations)
+    assert set(timer.durations) == {'parse', 'preprocess', 'predict_proba', 'top_reasons'}
+    assert all(seconds >= 0 for seconds in timer.durations.values())
+
+    timings = {}
+    model.predict_dropout_risk_batch(student + [{'cgpa': 3}], explain=False, timings=timings)
+    assert set(timings) == {'validate', 'preprocess', 'predict_proba'}
+    print(f"  Batch stages: {', '.join(f'{k} {v * 1000:.3f} ms' for k, v in timings.items())}")
+
+    # Without timings nothing is recorded and the result is unchanged
+    assert model.predict_dropout_risk(student[0]) == model.predict_dropout_risk(student[0], timings={})
+    print("Prediction stage timings test passed")
+
+if __name__ == "__main__":
+    test_metrics_format()
+    test_metrics_across_workers()
+    test_prediction_stages()
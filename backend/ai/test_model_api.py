@@ -75,6 +75,17 @@ def test_model_api():
     except Exception as e:
         print(f"   ❌ Prediction test failed: {str(e)}")
     
+    # Test 3b: Invalid values are rejected like /predict/batch rows
+    print("\n3b. Testing prediction with a non-numeric value...")
+    try:
+        response = requests.post(f"{base_url}/predict", json=dict(sample_data, cgpa="abc"))
+        if response.status_code == 400:
+            print(f"   ✅ Rejected: {response.json().get('error')}")
+        else:
+            print(f"   ❌ Expected 400, got {response.status_code}")
+    except Exception as e:
+        print(f"   ❌ Invalid value test failed: {str(e)}")
+    
     # Test 4: Training endpoint (with sample data)
     print("\n4. Testing training endpoint...")
     # Generate sample training data
@@ -109,7 +120,7 @@ def test_model_api():
         })
     
     try:
-        response = requests.post(f"{base_url}/train", json=training_data)
+        response = requests.post(f"{base_url}/train?wait=true", json=training_data)
         if response.status_code == 200:
             data = response.json()
             if data.get('success'):
@@ -0,0 +1,93 @@
+"""
+Test script for the memory-mappable model artifact format
+"""
+import os
+import shutil
+from datetime import timedelta
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from forest_engine import FlatForest
+from model_artifact import current_artifact_dir, CURRENT_FILE
+from benchmark_suite import artifact_size
+
+def test_model_artifact():
+    print("=== Model Artifact Test ===")
+
+    data = generate_sample_data(300)
+    students = generate_sample_data(40).drop(columns=['dropout']).to_dict('records')
+
+    # Reference predictions from the classic .pkl format
+    pkl_model = DropoutPredictionModel('test_artifact_model.pkl')
+    pkl_model.train_model(data)
+    expected = pkl_model.predict_dropout_risk_batch(students)
+
+    # Same model saved as a directory artifact
+    dir_model = DropoutPredictionModel('test_artifact_model')
+    dir_model.model = pkl_model.model
+    dir_model.scaler = pkl_model.scaler
+    dir_model.feature_names = pkl_model.feature_names
+    dir_model.medians = pkl_model.medians
+    dir_model.save_model()
+    first_version = current_artifact_dir('test_artifact_model')
+    assert os.path.exists(os.path.join(first_version, 'manifest.json'))
+
+    # Flat engine serves straight from memory-mapped node arrays
+    flat_model = DropoutPredictionModel('test_artifact_model', engine='flat')
+    assert flat_model.load_model()
+    assert isinstance(flat_model.model, FlatForest)
+    for array in flat_model.model.to_arrays().values():
+        assert isinstance(array.base, np.memmap)
+        assert not array.flags.writeable
+    assert flat_model.predict_dropout_risk_batch(students) == expected
+    assert flat_model.get_feature_importance() == pkl_model.get_feature_importance()
+    # Training time is kept in UTC through the manifest
+    assert pkl_model.trained_at.utcoffset() == timedelta(0)
+    assert flat_model.trained_at.utcoffset() == timedelta(0)
+    print("Memory-mapped artifact matches the .pkl model")
+
+    # Sklearn engine reads the saved estimator instead
+    sklearn_model = DropoutPredictionModel('test_artifact_model', engine='sklearn')
+    sklearn_model.load_model()
+    assert not isinstance(sklearn_model.model, FlatForest)
+    assert sklearn_model.predict_dropout_risk_batch(students) == expected
+    assert np.array_equal(sklearn_model.scaler.mean_, pkl_model.scaler.mean_)
+
+    # The artifact's size is that of its current version: node arrays, estimator and manifest
+    files = [name for name in os.listdir(first_version) if name.endswith('.npy')] + ['estimator.joblib']
+    model_bytes = sum(os.path.getsize(os.path.join(first_version, name)) for name in files)
+    manifest_bytes = os.path.getsize(os.path.join(first_version, 'manifest.json'))
+    assert len(files) == 6 and artifact_size('test_artifact_model') == model_bytes + manifest_bytes
+
+    # Saving again adds a version and switches CURRENT to it; the previous version stays
+    # for processes still loading it and goes with the save after
+    flat_model.save_model()
+    second_version = current_artifact_dir('test_artifact_model')
+    assert second_version != first_version and os.path.isdir(first_version)
+    reloaded = DropoutPredictionModel('test_artifact_model', engine='flat')
+    reloaded.load_model()
+    assert reloaded.predict_dropout_risk_batch(students) == expected
+    flat_model.save_model()
+    assert not os.path.exists(first_version) and os.path.isdir(second_version)
+    third_version = current_artifact_dir('test_artifact_model')
+    assert set(os.listdir('test_artifact_model')) == {CURRENT_FILE, os.path.basename(second_version),
+                                                    os.path.basename(third_version)}
+    assert not [name for name in os.listdir('.') if name.startswith('test_artifact_model.')
+                and not name.endswith('.pkl')]
+
+    # Artifacts written before versioning load from the directory itself, and the next
+    # saves move them to versions
+    shutil.move(current_artifact_dir('test_artifact_model'), 'test_artifact_legacy')
+    shutil.rmtree('test_artifact_model')
+    legacy = DropoutPredictionModel('test_artifact_legacy', engine='flat')
+    assert legacy.load_model() and legacy.predict_dropout_risk_batch(students) == expected
+    legacy.save_model()
+    legacy.save_model()
+    assert 'manifest.json' not in os.listdir('test_artifact_legacy')
+    assert legacy.load_model() and legacy.predict_dropout_risk_batch(students) == expected
+    shutil.rmtree('test_artifact_legacy')
+
+    os.remove('test_artifact_model.pkl')
+    print("\n=== Test Complete ===")
+
+if __name__ == "__main__":
+    test_model_artifact()
@@ -0,0 +1,87 @@
+"""
+Test script for the multi-model registry
+"""
+import os
+import shutil
+import time
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from model_registry import ModelRegistry, UnknownModelError, discover_models, model_nbytes
+
+REGISTRY_DIR = 'test_model_registry'
+
+def test_model_registry():
+    print("=== Model Registry Test ===")
+    shutil.rmtree(REGISTRY_DIR, ignore_errors=True)
+    os.makedirs(REGISTRY_DIR)
+
+    trained = DropoutPredictionModel()
+    trained.train_model(generate_sample_data(300), save=False)
+    for filename in ('dropout_model.pkl', 'cse@20250114.pkl', 'cse@20250201', 'ece.pkl', 'notes.txt'):
+        if filename.endswith('.txt'):
+            open(os.path.join(REGISTRY_DIR, filename), 'w').close()
+            continue
+        trained.model_path = os.path.join(REGISTRY_DIR, filename)
+        trained.save_model()
+    # Unfinished directory artifacts are ignored
+    os.makedirs(os.path.join(REGISTRY_DIR, 'cse@20250301.tmp-123'))
+
+    models = discover_models(REGISTRY_DIR)
+    assert set(models) == {'dropout_model', 'cse', 'ece'}
+    assert set(models['cse']) == {'20250114', '20250201'}
+    assert set(models['ece']) == {None}
+
+    loaded_paths = []
+    def create_model(path):
+        loaded_paths.append(path)
+        return DropoutPredictionModel(path)
+
+    # Nothing is loaded until a model is asked for
+    registry = ModelRegistry(REGISTRY_DIR, create_model, max_models=2)
+    assert registry.info()['loaded_count'] == 0 and not loaded_paths
+
+    # The latest version is served by default, and a hit returns the same object
+    cse = registry.get('cse')
+    assert loaded_paths[-1].endswith('cse@20250201')
+    assert registry.get('cse', '20250201') is cse
+    assert registry.get('cse', '20250114') is not cse
+    student = {'attendance': 60, 'cgpa': 2.1, 'backlogs': 3, 'assignments_submitted': 4, 'pending_fee_ratio': 0.5}
+    assert cse.predict_dropout_risk(student) == trained.predict_dropout_risk(student)
+
+    # At most two models stay loaded; the least recently used goes first
+    registry.get('cse')
+    registry.get('ece')
+    loaded = [version for model in registry.info()['models'] for version in model['versions'] if version['loaded']]
+    assert len(loaded) == 2
+    assert ('cse', '20250114') not in registry.loaded and ('cse', '20250201') in registry.loaded
+    assert registry.stats['evictions'] == 1
+    print(f"  Loaded {registry.stats['loads']} models, {registry.stats['hits']} hits, "
+          f"{registry.stats['evictions']} evicted; {registry.loaded_bytes() / 1e6:.1f} MB loaded")
+
+    # The byte budget evicts too, but never the model that was just asked for
+    nbytes = model_nbytes(cse)
+    budget = ModelRegistry(REGISTRY_DIR, create_model, max_models=10, max_bytes=int(nbytes * 1.5))
+    budget.get('cse')
+    budget.get('ece')
+    assert list(budget.loaded) == [('ece', None)]
+    tiny = ModelRegistry(REGISTRY_DIR, create_model, max_bytes=1)
+    assert tiny.get('dropout_model') is not None and len(tiny.loaded) == 1
+
+    # An artifact rewritten on disk is loaded again
+    ece = registry.get('ece')
+    time.sleep(0.01)
+    trained.model_path = os.path.join(REGISTRY_DIR, 'ece.pkl')
+    trained.save_model()
+    assert registry.get('ece') is not ece and loaded_paths[-1].endswith('ece.pkl')
+
+    for name, version in (('nobody', None), ('cse', '19990101'), ('ece', 'v2')):
+        try:
+            registry.get(name, version)
+            assert False, f"{name}@{version} should be unknown"
+        except UnknownModelError as e:
+            print(f"  {e}")
+
+    shutil.rmtree(REGISTRY_DIR)
+    print("Model registry test passed")
+
+if __name__ == "__main__":
+    test_model_registry()
@@ -0,0 +1,101 @@
+"""
+Test script for immutable model snapshots under concurrent retraining
+"""
+import os
+import threading
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from feature_transform import RAW_FEATURES
+
+def test_snapshot_is_immutable():
+    print("=== Immutable Snapshot Test ===")
+    data = generate_sample_data(1500)
+    model = DropoutPredictionModel('test_snapshot_model.pkl', engine='flat')
+    model.train_model(data, save=False, profile='compact')
+    snapshot = model.snapshot
+
+    try:
+        snapshot.predictor = None
+        assert False, 'snapshot attribute replaced'
+    except AttributeError:
+        pass
+    for array in [snapshot.transform.mean, snapshot.transform.scale, snapshot.transform.medians,
+                  *snapshot.explainer.to_arrays().values()]:
+        try:
+            array[0] = 0
+            assert False, 'snapshot array written'
+        except ValueError:
+            pass
+
+    # Growing the forest publishes a new snapshot and leaves the old one serving unchanged
+    X = snapshot.transform.transform_array(data[RAW_FEATURES].values[:200])
+    before = snapshot.predictor.predict_proba(X)
+    n_trees = len(snapshot.model.estimators_)
+    model.update_model(generate_sample_data(500), n_new_trees=10, save=False)
+    assert model.snapshot is not snapshot and model.snapshot.version > snapshot.version
+    assert len(snapshot.model.estimators_) == n_trees
+    assert len(model.snapshot.model.estimators_) == n_trees + 10
+    assert np.array_equal(snapshot.predictor.predict_proba(X), before)
+    print("Immutable snapshot test passed")
+
+def test_concurrent_swaps():
+    print("=== Concurrent Snapshot Swap Test ===")
+    # Two models with different forests and different feature scaling
+    data_a = generate_sample_data(2000)
+    data_b = generate_sample_data(2500)
+    data_b['attendance'] = data_b['attendance'] * 0.5 + 20
+    for path, data in (('test_snapshot_a.pkl', data_a), ('test_snapshot_b.pkl', data_b)):
+        DropoutPredictionModel(path).train_model(data, profile='compact')
+
+    students = data_a.drop(columns=['dropout']).head(40).to_dict('records')
+    expected = {}
+    for path in ('test_snapshot_a.pkl', 'test_snapshot_b.pkl'):
+        reference = DropoutPredictionModel(path, engine='flat')
+        reference.load_model()
+        expected[path] = reference.predict_dropout_risk_batch(students)
+    assert expected['test_snapshot_a.pkl'] != expected['test_snapshot_b.pkl']
+
+    # One writer reloads A and B back to back while readers predict without any lock
+    model = DropoutPredictionModel('test_snapshot_a.pkl', engine='flat')
+    model.load_model()
+    stop = threading.Event()
+    seen = {path: 0 for path in expected}
+    failures = []
+    versions = []
+
+    def writer():
+        while not stop.is_set():
+            for path in expected:
+                model.model_path = path
+                model.load_model()
+                versions.append(model.snapshot.version)
+
+    def reader():
+        while not stop.is_set():
+            results = model.predict_dropout_risk_batch(students)
+            matches = [path for path, result in expected.items() if result == results]
+            if len(matches) != 1:
+                failures.append(results)
+                return
+            seen[matches[0]] += 1
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    stop.wait(3)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"  {len(versions)} swaps, {sum(seen.values())} batches: {seen}")
+    assert not failures, 'a batch mixed two model versions'
+    assert versions == sorted(versions) and len(set(versions)) == len(versions)
+    assert all(count > 0 for count in seen.values())
+
+    os.remove('test_snapshot_a.pkl')
+    os.remove('test_snapshot_b.pkl')
+    print("Concurrent snapshot swap test passed")
+
+if __name__ == "__main__":
+    test_snapshot_is_immutable()
+    test_concurrent_swaps()
@@ -0,0 +1,55 @@
+"""
+Test script for the MongoDB aggregation pipelines behind fetch_student_data
+Runs against mongomock, an in-memory stand-in for MongoDB (pip install -r requirements-dev.txt)
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from sample_records import seed_database
+
+def test_mongo_aggregation():
+    print("=== MongoDB Aggregation Test ===")
+    mongomock = pytest.importorskip('mongomock')
+    pytest.importorskip('pymongo')
+    import fetch_and_train_from_mongodb as mongo_training
+
+    db = mongomock.MongoClient()['erp_system']
+    student_ids = seed_database(db)
+
+    # Same features and labels as the per-document implementation for the same random state
+    np.random.seed(42)
+    reference = mongo_training.fetch_student_data_by_document(db)
+    np.random.seed(42)
+    data = mongo_training.fetch_student_data(db)
+
+    assert len(data) == len(reference) == len(student_ids)
+    for column in reference.columns:
+        assert np.allclose(data[column].values, reference[column].values), column
+    print(f"  {len(data)} students match the per-document implementation")
+
+    # Fee ratio comes from the fee aggregate; students without fee records have nothing pending
+    ratio = data['pending_fee_ratio'].values
+    assert (ratio[::3] == 0).all()
+    assert np.isfinite(ratio[1::3]).all() and ((ratio[1::3] >= 0) & (ratio[1::3] <= 1)).all()
+
+    # Only students with records changed after `since` are fetched
+    since = datetime(2024, 6, 1)
+    changed = [student_ids[1], student_ids[2], student_ids[4]]
+    db.attendances.insert_one({'student_id': changed[0], 'total_classes': 10, 'present_classes': 9,
+                               'updatedAt': since + timedelta(days=1)})
+    db.academicdetails.update_many({'student_id': changed[1]},
+                                   {'$set': {'updatedAt': since + timedelta(days=1)}})
+    # A change to fees alone moves pending_fee_ratio too
+    db.feemanagements.update_many({'student_id': changed[2]},
+                                  {'$set': {'updatedAt': since + timedelta(days=1)}})
+    changed_data = mongo_training.fetch_student_data(db, since=since)
+    assert len(changed_data) == 3
+    print(f"  Incremental fetch returned {len(changed_data)} changed students")
+
+    # No students at all
+    assert mongo_training.fetch_student_data(mongomock.MongoClient()['empty']) is None
+
+    print("MongoDB aggregation test passed")
+
+if __name__ == "__main__":
+    test_mongo_aggregation()
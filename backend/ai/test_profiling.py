@@ -0,0 +1,82 @@
+"""
+Test script for on-demand request profiling
+"""
+import os
+import pstats
+import shutil
+from flask import Flask, jsonify, request
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from profiling import RequestProfiler, install_profiler, PROFILE_ID_HEADER
+
+PROFILE_DIR = 'test_profiles'
+
+def create_app(model, profiler=None):
+    app = Flask(__name__)
+
+    @app.route('/predict', methods=['POST'])
+    def predict():
+        return jsonify({'success': True, 'data': model.predict_dropout_risk(request.json)})
+
+    if profiler is not None:
+        install_profiler(app, profiler)
+    return app
+
+def profile_files():
+    return sorted(os.listdir(PROFILE_DIR)) if os.path.isdir(PROFILE_DIR) else []
+
+def test_profiling():
+    print("=== Request Profiling Test ===")
+    shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+    model = DropoutPredictionModel('test_profiling_model.pkl')
+    model.train_model(generate_sample_data(300), save=False)
+    student = generate_sample_data(1).drop(columns=['dropout']).to_dict('records')[0]
+
+    # Without a profiler nothing is hooked in
+    plain = create_app(model)
+    assert not plain.before_request_funcs and not plain.after_request_funcs
+    assert plain.test_client().post('/predict', json=student, headers={'X-Profile': '1'}).status_code == 200
+
+    # Without a token the header is ignored
+    client = create_app(model, RequestProfiler(PROFILE_DIR)).test_client()
+    response = client.post('/predict', json=student, headers={'X-Profile': '1'})
+    assert PROFILE_ID_HEADER not in response.headers and profile_files() == []
+
+    # A request carrying the token gets a profile, saved under its request id plus a suffix
+    client = create_app(model, RequestProfiler(PROFILE_DIR, token='s3cret')).test_client()
+    response = client.post('/predict', json=student)
+    assert PROFILE_ID_HEADER not in response.headers and profile_files() == []
+    assert PROFILE_ID_HEADER not in client.post('/predict', json=student, headers={'X-Profile': '1'}).headers
+
+    headers = {'X-Profile': 's3cret', 'X-Request-ID': 'slow-42'}
+    response = client.post('/predict', json=student, headers=headers)
+    profile_id = response.headers[PROFILE_ID_HEADER]
+    assert response.status_code == 200 and profile_id.startswith('slow-42-')
+    assert profile_files() == [f'{profile_id}.prof', f'{profile_id}.txt']
+    functions = {name for _, _, name in pstats.Stats(os.path.join(PROFILE_DIR, f'{profile_id}.prof')).stats}
+    assert {'predict_dropout_risk', 'explain_predictions'} <= functions
+    with open(os.path.join(PROFILE_DIR, f'{profile_id}.txt')) as f:
+        summary = f.read()
+    print('  ' + summary.splitlines()[0])
+    assert summary.startswith('POST /predict -> 200')
+
+    # A reused request id does not overwrite the earlier profile
+    assert client.post('/predict', json=student, headers=headers).headers[PROFILE_ID_HEADER] != profile_id
+    assert len(profile_files()) == 4
+
+    # Request ids that are not plain file names are replaced
+    response = client.post('/predict', json=student, headers={'X-Profile': 's3cret', 'X-Request-ID': '../../etc'})
+    assert '/' not in response.headers[PROFILE_ID_HEADER]
+
+    # Sampling profiles requests without the header, and old profiles are pruned
+    shutil.rmtree(PROFILE_DIR)
+    client = create_app(model, RequestProfiler(PROFILE_DIR, sample_rate=1.0, max_profiles=3)).test_client()
+    for _ in range(5):
+        assert PROFILE_ID_HEADER in client.post('/predict', json=student).headers
+    assert len([name for name in profile_files() if name.endswith('.prof')]) == 3
+    assert len(profile_files()) == 6
+
+    shutil.rmtree(PROFILE_DIR)
+    print("Request profiling test passed")
+
+if __name__ == "__main__":
+    test_profiling()
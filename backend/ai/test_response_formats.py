@@ -0,0 +1,84 @@
+"""
+Test script for the bulk scoring response formats
+"""
+import json
+import numpy as np
+import pytest
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from dropout_prediction import DropoutPredictionModel, REASON_TEMPLATES, generate_sample_data
+from response_formats import (negotiate, iter_ndjson_results, encode_score_columns, read_score_columns,
+                              ERROR_CODE)
+
+def accept(header):
+    return parse_accept_header(header, MIMEAccept)
+
+def test_negotiate():
+    print("=== Response Format Negotiation Test ===")
+    assert negotiate(MIMEAccept()) == 'json'
+    assert negotiate(accept('*/*')) == 'json'
+    assert negotiate(accept('application/x-ndjson')) == 'ndjson'
+    assert negotiate(accept('application/x-dropout-scores,application/json;q=0.5')) == 'columnar'
+    assert negotiate(accept('application/x-ndjson'), formats=('json', 'msgpack')) is None
+    assert negotiate(accept('text/html')) is None
+    print("Response format negotiation test passed")
+
+def score_batch():
+    model = DropoutPredictionModel('test_formats_model.pkl', engine='flat')
+    model.train_model(generate_sample_data(2000), save=False)
+    students = generate_sample_data(2500).drop(columns=['dropout']).to_dict('records')
+    # A few invalid rows are reported in place, whatever the format
+    students[3] = {'attendance': 80}
+    students[1700] = dict(students[1700], cgpa='high')
+    return model, students
+
+def test_ndjson_and_columnar():
+    print("=== NDJSON and Columnar Results Test ===")
+    model, students = score_batch()
+    expected = model.predict_dropout_risk_batch(students)
+
+    timings = {}
+    chunks = list(iter_ndjson_results(model, students, timings=timings, chunk_rows=1000))
+    assert len(chunks) == 3 and 'serialize' in timings and 'top_reasons' in timings
+    lines = b''.join(chunks).decode('utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == expected
+
+    header, columns = read_score_columns(encode_score_columns(model.score_records(students)))
+    assert header['n_rows'] == len(students) and set(header['errors']) == {'3', '1700'}
+    assert header['errors']['3'] == expected[3]['error']
+    assert columns['risk_score'].dtype == np.float32 and columns['reason_factor'].shape == (len(students), 3)
+    for index, result in enumerate(expected):
+        if not result['success']:
+            assert columns['risk_level'][index] == ERROR_CODE and np.isnan(columns['risk_score'][index])
+            continue
+        data = result['data']
+        assert header['risk_levels'][columns['risk_level'][index]] == data['risk_level']
+        assert abs(columns['risk_score'][index] - data['risk_score']) < 1e-6
+        codes = [code for code in columns['reason_factor'][index] if code != ERROR_CODE]
+        assert [header['factors'][code] for code in codes] == [reason['factor'] for reason in data['top_reasons']]
+        contributions = columns['reason_contribution'][index][:len(codes)]
+        assert np.allclose(contributions, [reason['contribution'] for reason in data['top_reasons']], atol=1e-4)
+    assert header['factors'] == [REASON_TEMPLATES[name][0] for name in model.feature_names]
+
+    # Without explanations the reason columns are left out
+    _, columns = read_score_columns(encode_score_columns(model.score_records(students, explain=False)))
+    assert set(columns) == {'risk_score', 'risk_level'}
+    print("NDJSON and columnar results test passed")
+
+def test_msgpack():
+    print("=== MessagePack Results Test ===")
+    msgpack = pytest.importorskip('msgpack')
+    from response_formats import encode_msgpack
+
+    model, students = score_batch()
+    results = model.predict_dropout_risk_batch(students[:200])
+    payload = {'success': True, 'data': results, 'count': len(results)}
+    body = encode_msgpack(payload)
+    assert msgpack.unpackb(body) == payload
+    assert len(body) < len(json.dumps(payload))
+    print("MessagePack results test passed")
+
+if __name__ == "__main__":
+    test_negotiate()
+    test_ndjson_and_columnar()
+    test_msgpack()
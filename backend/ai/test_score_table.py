@@ -0,0 +1,80 @@
+"""
+Test script for the precomputed risk score table
+"""
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from feature_transform import RAW_FEATURES
+from score_table import (build_score_table, current_version, ScoreTable, ScoreTableCache,
+                         KEEP_VERSIONS, RISK_LEVELS)
+
+MODEL_PATH = 'test_score_model.pkl'
+TABLE_DIR = 'test_dropout_scores'
+
+def test_score_table():
+    print("=== Score Table Test ===")
+    shutil.rmtree(TABLE_DIR, ignore_errors=True)
+
+    model = DropoutPredictionModel(MODEL_PATH)
+    model.train_model(generate_sample_data(500), save=False)
+
+    population = generate_sample_data(1200)[RAW_FEATURES]
+    student_ids = [f"student-{i}" for i in range(len(population))]
+    snapshot = datetime.now()
+
+    # Batches smaller than the population give the same scores as /predict/batch
+    version = build_score_table(model, TABLE_DIR, student_ids, population, snapshot, batch_size=500)
+    assert current_version(TABLE_DIR) == version
+
+    table = ScoreTable(os.path.join(TABLE_DIR, version))
+    expected = model.predict_dropout_risk_batch(population.to_dict('records'))
+    for i in (0, 1, 599, 1199):
+        entry = table.lookup(student_ids[i])
+        assert np.isclose(entry['risk_score'], expected[i]['data']['risk_score'])
+        assert entry['risk_level'] == expected[i]['data']['risk_level']
+        assert [r['factor'] for r in entry['top_reasons']] == [r['factor'] for r in expected[i]['data']['top_reasons']]
+    assert table.lookup('nobody') is None
+    assert table.manifest['model_version'] == model.trained_at.isoformat()
+    assert table.manifest['feature_snapshot_at'] == snapshot.isoformat()
+    print(f"  Scored {table.manifest['n_students']} students: {table.manifest['level_counts']}")
+
+    # At-risk queries are sorted by score and filtered by level
+    high_and_medium = table.at_risk()
+    scores = [entry['risk_score'] for entry in high_and_medium]
+    assert scores == sorted(scores, reverse=True)
+    assert {entry['risk_level'] for entry in high_and_medium} <= {'High', 'Medium'}
+    assert len(high_and_medium) == table.manifest['level_counts']['High'] + table.manifest['level_counts']['Medium']
+    assert len(table.at_risk(['High'], limit=5)) <= 5
+    assert all(entry['risk_level'] == 'Low' for entry in table.at_risk(['Low']))
+
+    # Freshness follows the feature snapshot time
+    assert table.is_fresh(60)
+    old = build_score_table(model, TABLE_DIR, student_ids[:10], population[:10],
+                            datetime.now() - timedelta(hours=2))
+    assert not ScoreTable(os.path.join(TABLE_DIR, old)).is_fresh(3600)
+
+    # The cache follows CURRENT and only reloads when it changes
+    cache = ScoreTableCache(TABLE_DIR)
+    loaded = cache.get()
+    assert loaded.version == old and cache.get() is loaded
+    time.sleep(0.01)
+    newest = build_score_table(model, TABLE_DIR, student_ids, population, datetime.now())
+    assert cache.get().version == newest
+    assert ScoreTableCache('missing_score_dir').get() is None
+
+    # Only the newest versions are kept
+    for _ in range(KEEP_VERSIONS):
+        build_score_table(model, TABLE_DIR, student_ids[:5], population[:5])
+    versions = [name for name in os.listdir(TABLE_DIR) if not name.startswith('.') and name != 'CURRENT']
+    assert len(versions) == KEEP_VERSIONS
+    assert current_version(TABLE_DIR) == max(versions)
+    assert set(RISK_LEVELS) == {'Low', 'Medium', 'High'}
+
+    shutil.rmtree(TABLE_DIR)
+    print("Score table test passed")
+
+if __name__ == "__main__":
+    test_score_table()
@@ -0,0 +1,55 @@
+"""
+Test script for the chunked, parallel synthetic data generator
+"""
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from synthetic_data import COLUMNS, generate_dataset, iter_chunks, write_dataset, iter_dataset
+
+OUT_DIR = 'test_synthetic_data'
+
+def test_deterministic_across_workers():
+    print("=== Synthetic Data Determinism Test ===")
+    state = np.random.get_state()
+    single = generate_dataset(2500, seed=7, chunk_size=1000)
+    parallel = generate_dataset(2500, seed=7, chunk_size=1000, workers=3)
+    pd.testing.assert_frame_equal(single, parallel)
+
+    # The global random state is left alone
+    assert np.array_equal(np.random.get_state()[1], state[1])
+
+    chunks = list(iter_chunks(2500, seed=7, chunk_size=1000))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), single)
+
+    assert list(single.columns) == COLUMNS
+    assert single['attendance'].between(0, 100).all() and single['cgpa'].between(0, 10).all()
+    assert set(single['dropout'].unique()) <= {0, 1}
+    assert not generate_dataset(2500, seed=8, chunk_size=1000).equals(single)
+    assert not generate_dataset(2500, seed=7, chunk_size=1000, profile='real_data').equals(single)
+    print(f"  Dropout rate: sample {single['dropout'].mean():.2%}, "
+          f"real_data {generate_dataset(2500, seed=7, profile='real_data')['dropout'].mean():.2%}")
+    print("Synthetic data determinism test passed")
+
+def test_write_dataset():
+    print("=== Synthetic Data Files Test ===")
+    expected = generate_dataset(2500, seed=7, chunk_size=1000)
+    for file_format in ('npz', 'csv'):
+        shutil.rmtree(OUT_DIR, ignore_errors=True)
+        paths = write_dataset(OUT_DIR, 2500, seed=7, chunk_size=1000, workers=2, file_format=file_format)
+        assert [path.rsplit('/', 1)[-1] for path in paths] == [f'part-0000{i}.{file_format}' for i in range(3)]
+        written = pd.concat(iter_dataset(OUT_DIR), ignore_index=True)
+        pd.testing.assert_frame_equal(written, expected, check_dtype=file_format == 'npz')
+
+    # Rewriting a smaller dataset into the same directory leaves no parts of the old one
+    write_dataset(OUT_DIR, 1500, seed=7, chunk_size=1000)
+    assert sorted(os.listdir(OUT_DIR)) == ['manifest.json', 'part-00000.npz', 'part-00001.npz']
+    written = pd.concat(iter_dataset(OUT_DIR), ignore_index=True)
+    pd.testing.assert_frame_equal(written, generate_dataset(1500, seed=7, chunk_size=1000))
+    shutil.rmtree(OUT_DIR)
+    print("Synthetic data files test passed")
+
+if __name__ == "__main__":
+    test_deterministic_across_workers()
+    test_write_dataset()
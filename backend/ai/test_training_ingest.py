@@ -0,0 +1,75 @@
+"""
+Test script for streaming training data ingestion
+"""
+import io
+import json
+import struct
+import numpy as np
+from dropout_prediction import generate_sample_data
+from training_ingest import (read_training_stream, write_columnar, TrainingDataError,
+                             TRAINING_COLUMNS, COLUMNAR_TYPE, COLUMNAR_MAGIC)
+
+def expect_error(body, content_type, message):
+    try:
+        read_training_stream(io.BytesIO(body), content_type, chunk_size=7)
+        assert False, f"expected an error containing {message!r}"
+    except TrainingDataError as e:
+        assert message in str(e), str(e)
+        print(f"  Rejected: {e}")
+
+def test_training_ingest():
+    print("=== Training Ingest Test ===")
+
+    data = generate_sample_data(250)[TRAINING_COLUMNS]
+    data.loc[3, 'cgpa'] = np.nan
+
+    ndjson = ''.join(json.dumps(row) + '\n' for row in data.to_dict('records')).replace('NaN', 'null')
+    uploads = {
+        'application/x-ndjson': ndjson.encode('utf-8'),
+        'text/csv': data.to_csv(index=False).encode('utf-8'),
+    }
+    columnar = io.BytesIO()
+    write_columnar({column: data[column].values for column in TRAINING_COLUMNS}, columnar)
+    uploads[COLUMNAR_TYPE] = columnar.getvalue()
+
+    # Tiny chunks force rows to straddle chunk boundaries
+    for content_type, body in uploads.items():
+        for chunk_size in (7, 64 * 1024):
+            frame = read_training_stream(io.BytesIO(body), content_type, chunk_size=chunk_size)
+            assert list(frame.columns) == TRAINING_COLUMNS
+            assert len(frame) == len(data)
+            np.testing.assert_allclose(frame.values, data.values.astype(float), rtol=1e-15)
+        print(f"{content_type}: {len(frame)} rows parsed")
+
+    # Extra columns and column order don't matter
+    shuffled = data[TRAINING_COLUMNS[::-1]].assign(student_id=range(len(data)))
+    frame = read_training_stream(io.BytesIO(shuffled.to_csv(index=False).encode()), 'text/csv')
+    np.testing.assert_allclose(frame.values, data.values.astype(float))
+
+    # Problems are reported early and precisely
+    expect_error(b'attendance,cgpa\n1,2\n', 'text/csv', 'Missing required column: backlogs (CSV header)')
+    expect_error(b'{"attendance": 1}\n', 'application/x-ndjson', 'Missing required column: cgpa (line 1)')
+    bad_value = ndjson.splitlines()[0].replace('"cgpa": ', '"cgpa": "x", "ignored": ') + '\n'
+    expect_error((ndjson.splitlines()[1] + '\n' + bad_value).encode(), 'application/x-ndjson', "Line 2: column 'cgpa'")
+    expect_error(uploads[COLUMNAR_TYPE][:-5], COLUMNAR_TYPE, 'truncated')
+    partial = io.BytesIO()
+    write_columnar({'attendance': [1.0]}, partial)
+    expect_error(partial.getvalue(), COLUMNAR_TYPE, 'columnar header')
+    expect_error(b'', 'text/csv', 'no rows')
+
+    # A malformed columnar header is a bad upload, not a server error
+    def columnar_header(header):
+        return COLUMNAR_MAGIC + struct.pack('<I', len(header)) + header
+    expect_error(columnar_header(b'{"columns": ["attendance"]'), COLUMNAR_TYPE, 'not valid JSON')
+    expect_error(columnar_header(b'[1, 2]'), COLUMNAR_TYPE, 'must be a JSON object')
+    columns = json.dumps(TRAINING_COLUMNS)
+    expect_error(columnar_header(f'{{"columns": {columns}}}'.encode()), COLUMNAR_TYPE, "'n_rows'")
+    expect_error(columnar_header(f'{{"columns": {columns}, "n_rows": -1}}'.encode()), COLUMNAR_TYPE, "'n_rows'")
+    expect_error(columnar_header(f'{{"columns": {columns}, "n_rows": "10"}}'.encode()), COLUMNAR_TYPE, "'n_rows'")
+    expect_error(columnar_header(b'{"columns": "attendance", "n_rows": 1}'), COLUMNAR_TYPE, "'columns'")
+    expect_error(columnar_header(b'{"columns": [1, 2], "n_rows": 1}'), COLUMNAR_TYPE, "'columns'")
+
+    print("\n=== Test Complete ===")
+
+if __name__ == "__main__":
+    test_training_ingest()
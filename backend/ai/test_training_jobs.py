@@ -0,0 +1,127 @@
+"""
+Test script for background training jobs and model hot-swap
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+from training_jobs import TrainingJobQueue, QueueFullError
+
+MODEL_PATH = 'test_jobs_model.pkl'
+
+def test_training_jobs():
+    print("=== Training Jobs Test ===")
+
+    serving = {'model': None}
+    release = threading.Event()
+
+    def create_model():
+        # Hold the worker until the test lets it go
+        release.wait(timeout=30)
+        return DropoutPredictionModel(MODEL_PATH)
+
+    def swap(new_model):
+        serving['model'] = new_model
+
+    jobs = TrainingJobQueue(create_model, swap, max_queued=1, min_accuracy=0.0)
+
+    # One job running, one waiting, the next is rejected
+    first = jobs.submit(generate_sample_data(300))
+    deadline = time.time() + 30
+    while first.status == 'queued':
+        assert time.time() < deadline, 'job was never started'
+        time.sleep(0.01)
+    second = jobs.submit(generate_sample_data(200))
+    try:
+        jobs.submit(generate_sample_data(100))
+        assert False, "queue should be full"
+    except QueueFullError as e:
+        print(f"Rejected while full: {e}")
+
+    # Nothing is swapped in until a job has trained and validated
+    assert serving['model'] is None
+    release.set()
+
+    first = jobs.wait(first.id, timeout=60)
+    assert first.status == 'succeeded', first.error
+    assert first.progress == 1.0
+    assert 0.0 <= first.metrics['accuracy'] <= 1.0
+    second = jobs.wait(second.id, timeout=60)
+    assert second.status == 'succeeded', second.error
+    assert serving['model'].ready
+    assert serving['model'].training_metrics['n_train'] == 160
+    print(f"Jobs finished: {[job.to_dict()['status'] for job in jobs.list()]}")
+
+    # A job that fails validation leaves the serving model in place
+    current = serving['model']
+    single_class = generate_sample_data(200)
+    single_class['dropout'] = 0
+    failed = jobs.wait(jobs.submit(single_class).id, timeout=60)
+    assert failed.status == 'failed'
+    assert serving['model'] is current
+    print(f"Failed job kept the old model: {failed.error}")
+
+    os.remove(MODEL_PATH)
+    print("\n=== Test Complete ===")
+
+def test_jobs_across_workers():
+    print("=== Training Jobs Across Workers Test ===")
+    jobs_dir = 'test_jobs_dir'
+    serving = {}
+
+    def swap(new_model):
+        serving['model'] = new_model
+
+    # Two workers' queues sharing one jobs directory
+    worker = TrainingJobQueue(lambda: DropoutPredictionModel(MODEL_PATH), swap, min_accuracy=0.0,
+                              history_size=2, jobs_dir=jobs_dir)
+    other = TrainingJobQueue(lambda: DropoutPredictionModel(MODEL_PATH), swap, history_size=2,
+                             jobs_dir=jobs_dir)
+
+    job = worker.wait(worker.submit(generate_sample_data(300)).id, timeout=60)
+    assert job.status == 'succeeded', job.error
+    seen = other.get(job.id)
+    assert seen is not None and seen.to_dict() == job.to_dict()
+    assert [listed.id for listed in other.list()] == [job.id]
+    assert other.get('0' * 32) is None and other.get('../test_jobs_dir') is None
+
+    # A worker waits for another worker's job by reading its state again
+    release = threading.Event()
+    def create_held_model():
+        release.wait(timeout=30)
+        return DropoutPredictionModel(MODEL_PATH)
+    held = TrainingJobQueue(create_held_model, swap, min_accuracy=0.0, history_size=2, jobs_dir=jobs_dir)
+    job = held.submit(generate_sample_data(300))
+    threading.Timer(0.3, release.set).start()
+    waited = other.wait(job.id, timeout=60)
+    assert waited.status == 'succeeded' and waited.progress == 1.0, waited.error
+
+    # A job left running by a worker that has exited is reported as failed, to every worker
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    orphan_id = 'f' * 32
+    with open(os.path.join(jobs_dir, f'job-{job.id}.json')) as f:
+        state = json.load(f)
+    state.update(job_id=orphan_id, status='running', finished_at=None, pid=exited.pid)
+    with open(os.path.join(jobs_dir, f'job-{orphan_id}.json'), 'w') as f:
+        json.dump(state, f)
+    orphan = other.wait(orphan_id)
+    assert orphan.status == 'failed' and orphan.error == f'Worker process {exited.pid} exited before the job finished'
+    assert held.get(orphan_id).status == 'failed'
+
+    # Finished jobs beyond the history are forgotten by every worker
+    ids = [worker.wait(worker.submit(generate_sample_data(300)).id, timeout=60).id for _ in range(2)]
+    assert [listed.id for listed in other.list()] == ids
+    assert len(os.listdir(jobs_dir)) == 2
+
+    shutil.rmtree(jobs_dir)
+    os.remove(MODEL_PATH)
+    print("Training jobs across workers test passed")
+
+if __name__ == "__main__":
+    test_training_jobs()
+    test_jobs_across_workers()
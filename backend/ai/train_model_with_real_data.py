@@ -3,13 +3,13 @@ Script to train the dropout prediction model with real data from MongoDB
 """
 import sys
 import os
-import pandas as pd
 from datetime import datetime
 
 # Add the parent directory to the path so we can import the dropout_prediction module
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from dropout_prediction import DropoutPredictionModel
+from synthetic_data import generate_dataset
 
 def fetch_real_data_from_mongodb():
     """
@@ -23,48 +23,9 @@ def fetch_real_data_from_mongodb():
     # In a real implementation, you would connect to your MongoDB database
     # and fetch actual student records
     
-    # Generate sample data that mimics real student data
-    import numpy as np
-    
-    np.random.seed(42)
-    n_samples = 1000
-    
-    # Generate base features
-    attendance = np.random.normal(75, 15, n_samples)
-    attendance = np.clip(attendance, 0, 100)
-    
-    cgpa = np.random.normal(7.0, 1.5, n_samples)
-    cgpa = np.clip(cgpa, 0, 10)
-    
-    backlogs = np.random.poisson(1, n_samples)
-    backlogs = np.clip(backlogs, 0, 10)
-    
-    assignments_submitted = np.random.poisson(8, n_samples)
-    assignments_submitted = np.clip(assignments_submitted, 0, 15)
-    
-    # Create more realistic dropout labels based on actual patterns
-    # Students with low attendance, low CGPA, or many backlogs are more likely to drop out
-    dropout_prob = (
-        (100 - attendance) / 100 * 0.4 +  # 40% weight to attendance
-        (10 - cgpa) / 10 * 0.3 +          # 30% weight to CGPA
-        backlogs / 10 * 0.2 +             # 20% weight to backlogs
-        (15 - assignments_submitted) / 15 * 0.1  # 10% weight to assignments
-    )
-    
-    # Add some randomness
-    dropout_prob = np.clip(dropout_prob + np.random.normal(0, 0.1, n_samples), 0, 1)
-    
-    # Convert probabilities to binary labels
-    dropout = np.random.binomial(1, dropout_prob, n_samples)
-    
-    # Create DataFrame
-    data = pd.DataFrame({
-        'attendance': attendance,
-        'cgpa': cgpa,
-        'backlogs': backlogs,
-        'assignments_submitted': assignments_submitted,
-        'dropout': dropout
-    })
+    # Generate sample data that mimics real student data: low attendance, low CGPA and many
+    # backlogs weigh most, plus some randomness (the 'real_data' profile)
+    data = generate_dataset(1000, seed=42, profile='real_data')
     
     print(f"Generated {len(data)} student records")
     print(f"Dropout rate: {data['dropout'].mean():.2%}")
@@ -88,7 +49,8 @@ def train_model_with_data(data):
         'attendance': 65,
         'cgpa': 2.8,
         'backlogs': 3,
-        'assignments_submitted': 5
+        'assignments_submitted': 5,
+        'pending_fee_ratio': 0.4
     }
     
     result = model.predict_dropout_risk(sample_student)
@@ -0,0 +1,55 @@
+"""
+Compare a full refit with an incremental (warm-start) update as the training history grows
+
+    python training_benchmark.py
+
+For each history size the model is first trained on the history, then a batch of new
+records (5% of the history) arrives and is absorbed either by refitting on everything
+or by update_model on just the new records.
+"""
+import os
+import time
+import pandas as pd
+from dropout_prediction import DropoutPredictionModel, generate_sample_data
+
+HISTORY_SIZES = [10000, 50000, 100000]
+NEW_FRACTION = 0.05
+
+def compare_training_modes(n_history, n_new_trees=20):
+    """
+    Return full-refit and incremental-update timings for one history size
+    """
+    history = generate_sample_data(n_history)
+    new_records = generate_sample_data(int(n_history * NEW_FRACTION))
+
+    model = DropoutPredictionModel('benchmark_model.pkl')
+    model.train_model(history, save=False)
+
+    start = time.perf_counter()
+    full = DropoutPredictionModel('benchmark_model.pkl')
+    full.train_model(pd.concat([history, new_records], ignore_index=True), save=False)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.update_model(new_records, n_new_trees=n_new_trees, save=False)
+    incremental_seconds = time.perf_counter() - start
+
+    return {
+        'n_history': n_history,
+        'n_new': len(new_records),
+        'full_seconds': full_seconds,
+        'incremental_seconds': incremental_seconds,
+        'full_accuracy': full.training_metrics['accuracy'],
+        'incremental_accuracy': model.training_metrics['accuracy']
+    }
+
+if __name__ == "__main__":
+    results = [compare_training_modes(n) for n in HISTORY_SIZES]
+
+    print("\nHistory   New     Full refit   Incremental   Speedup")
+    for r in results:
+        print(f"{r['n_history']:<9} {r['n_new']:<7} {r['full_seconds']:>8.2f}s   {r['incremental_seconds']:>9.2f}s"
+              f"   {r['full_seconds'] / r['incremental_seconds']:>6.1f}x")
+
+    if os.path.exists('benchmark_model.pkl'):
+        os.remove('benchmark_model.pkl')
@@ -0,0 +1,269 @@
+"""
+Streaming ingestion of training data for /train
+
+Request bodies are read in fixed-size chunks and parsed row by row straight into typed
+column buffers, so the raw body, a list of per-row dicts and the final DataFrame never
+have to sit in memory together. Three streamed formats are accepted:
+
+- NDJSON (application/x-ndjson): one JSON object per line
+- CSV (text/csv): a header row naming the columns, then one row per student
+- Columnar binary (application/x-dropout-columnar), laid out as
+      b'DPCOL1\\n'                     magic
+      uint32 little-endian              length of the JSON header
+      JSON header                       {"n_rows": N, "columns": [...], "dtype": "<f8"}
+      column data                       N little-endian float64 values per column, in header order
+  Each column is read directly into its final array with no parsing at all.
+
+Required columns are checked as soon as they are known: on the first NDJSON row, on the
+CSV header, or on the columnar header before any data is read.
+
+iter_training_chunks reads NDJSON or CSV as a sequence of fixed-size row chunks instead,
+for out-of-core training on files larger than memory (DropoutPredictionModel.train_model_chunked).
+"""
+import array
+import csv
+import json
+import struct
+import numpy as np
+from feature_transform import RAW_FEATURES
+
+# Columns every training row must provide
+TRAINING_COLUMNS = RAW_FEATURES + ['dropout']
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+CSV_TYPES = ('text/csv', 'application/csv')
+COLUMNAR_TYPE = 'application/x-dropout-columnar'
+STREAMING_TYPES = NDJSON_TYPES + CSV_TYPES + (COLUMNAR_TYPE,)
+
+COLUMNAR_MAGIC = b'DPCOL1\n'
+READ_CHUNK_SIZE = 64 * 1024
+
+# Rows per chunk yielded by iter_training_chunks
+CHUNK_ROWS = 50000
+
+class TrainingDataError(ValueError):
+    """Raised when a training upload is malformed or missing required columns"""
+    pass
+
+class ColumnBuffers:
+    """
+    Growable float64 buffers, one per training column
+    array.array grows geometrically in place, so appending is amortized O(1) with
+    no per-value Python object kept alive.
+    """
+    def __init__(self, columns=TRAINING_COLUMNS):
+        self.columns = list(columns)
+        self.buffers = [array.array('d') for _ in self.columns]
+        self.n_rows = 0
+
+    def append(self, values):
+        for buffer, value in zip(self.buffers, values):
+            buffer.append(value)
+        self.n_rows += 1
+
+    def to_arrays(self):
+        """
+        Return {column: ndarray} viewing the buffers without copying
+        """
+        return {column: np.frombuffer(buffer, dtype=np.float64)
+                for column, buffer in zip(self.columns, self.buffers)}
+
+def iter_lines(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield complete lines (with their trailing newline) from a binary stream read in chunks
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        lines = pending.split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+    if pending:
+        yield pending
+
+def to_float(value, column, line_number):
+    """
+    Convert one field to float; empty and null values become NaN (filled with medians later)
+    """
+    if value is None or value == '':
+        return np.nan
+    if isinstance(value, bool):
+        raise TrainingDataError(f"Line {line_number}: column '{column}' must be a number")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise TrainingDataError(f"Line {line_number}: column '{column}' must be a number, got {value!r}")
+
+def check_columns(available, where):
+    missing = [column for column in TRAINING_COLUMNS if column not in available]
+    if missing:
+        raise TrainingDataError(f"Missing required column: {missing[0]} ({where})")
+
+def read_ndjson(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Parse an NDJSON stream into column buffers
+    """
+    buffers = ColumnBuffers()
+    for values in iter_ndjson_rows(stream, chunk_size):
+        buffers.append(values)
+    return buffers
+
+def iter_ndjson_rows(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the training column values of every NDJSON row, in TRAINING_COLUMNS order
+    """
+    for line_number, line in enumerate(iter_lines(stream, chunk_size), 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise TrainingDataError(f"Line {line_number}: invalid JSON ({e})")
+        if not isinstance(row, dict):
+            raise TrainingDataError(f"Line {line_number}: each line must be a JSON object")
+        check_columns(row, f"line {line_number}")
+        yield [to_float(row[column], column, line_number) for column in TRAINING_COLUMNS]
+
+def read_csv(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Parse a CSV stream with a header row into column buffers
+    """
+    buffers = ColumnBuffers()
+    for values in iter_csv_rows(stream, chunk_size):
+        buffers.append(values)
+    return buffers
+
+def iter_csv_rows(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the training column values of every CSV row, in TRAINING_COLUMNS order
+    """
+    lines = (line.decode('utf-8-sig' if i == 0 else 'utf-8')
+             for i, line in enumerate(iter_lines(stream, chunk_size)))
+    reader = csv.reader(lines)
+
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() for name in header]
+    check_columns(header, 'CSV header')
+    indices = [header.index(column) for column in TRAINING_COLUMNS]
+
+    for row in reader:
+        if not row:
+            continue
+        line_number = reader.line_num
+        if len(row) != len(header):
+            raise TrainingDataError(f"Line {line_number}: expected {len(header)} fields, got {len(row)}")
+        yield [to_float(row[index], column, line_number) for index, column in zip(indices, TRAINING_COLUMNS)]
+
+def read_exact(stream, n_bytes):
+    data = b''
+    while len(data) < n_bytes:
+        chunk = stream.read(n_bytes - len(data))
+        if not chunk:
+            raise TrainingDataError(f"Columnar upload truncated: expected {n_bytes} more bytes")
+        data += chunk
+    return data
+
+def read_columnar(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Read a columnar binary upload straight into preallocated float64 arrays
+    Returns {column: ndarray} for the training columns
+    """
+    if read_exact(stream, len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise TrainingDataError("Not a columnar training upload (bad magic bytes)")
+    (header_length,) = struct.unpack('<I', read_exact(stream, 4))
+    try:
+        header = json.loads(read_exact(stream, header_length))
+    except ValueError as e:
+        raise TrainingDataError(f"Columnar header is not valid JSON ({e})")
+    if not isinstance(header, dict):
+        raise TrainingDataError("Columnar header must be a JSON object")
+
+    columns = header.get('columns')
+    n_rows = header.get('n_rows')
+    if not isinstance(columns, list) or not all(isinstance(column, str) for column in columns):
+        raise TrainingDataError("Columnar header 'columns' must be a list of column names")
+    if not isinstance(n_rows, int) or isinstance(n_rows, bool) or n_rows < 0:
+        raise TrainingDataError("Columnar header 'n_rows' must be a non-negative integer")
+    if header.get('dtype', '<f8') != '<f8':
+        raise TrainingDataError(f"Unsupported columnar dtype {header['dtype']}, expected '<f8'")
+    check_columns(columns, 'columnar header')
+
+    arrays = {}
+    for column in columns:
+        values = np.empty(n_rows, dtype='<f8')
+        view = memoryview(values).cast('B')
+        filled = 0
+        while filled < len(view):
+            chunk = stream.read(min(chunk_size, len(view) - filled))
+            if not chunk:
+                raise TrainingDataError(f"Columnar upload truncated in column '{column}'")
+            view[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        # Extra columns are read past but not kept
+        if column in TRAINING_COLUMNS:
+            arrays[column] = values
+    return arrays
+
+def write_columnar(columns, stream):
+    """
+    Write {column: array-like} in the columnar binary format (for clients and tests)
+    """
+    names = list(columns)
+    arrays = [np.ascontiguousarray(columns[name], dtype='<f8') for name in names]
+    n_rows = len(arrays[0]) if arrays else 0
+    header = json.dumps({'n_rows': n_rows, 'columns': names, 'dtype': '<f8'}).encode('utf-8')
+
+    stream.write(COLUMNAR_MAGIC)
+    stream.write(struct.pack('<I', len(header)))
+    stream.write(header)
+    for values in arrays:
+        stream.write(values.tobytes())
+
+def read_training_stream(stream, content_type, chunk_size=READ_CHUNK_SIZE):
+    """
+    Parse a streamed training upload into a DataFrame with the training columns
+    The frame is built on top of the parsed column arrays without copying them.
+    """
+    import pandas as pd
+
+    if content_type in NDJSON_TYPES:
+        arrays = read_ndjson(stream, chunk_size).to_arrays()
+    elif content_type in CSV_TYPES:
+        arrays = read_csv(stream, chunk_size).to_arrays()
+    elif content_type == COLUMNAR_TYPE:
+        arrays = read_columnar(stream, chunk_size)
+    else:
+        raise TrainingDataError(f"Unsupported training data content type: {content_type}")
+
+    if len(arrays[TRAINING_COLUMNS[0]]) == 0:
+        raise TrainingDataError("Training upload contains no rows")
+
+    return pd.DataFrame({column: arrays[column] for column in TRAINING_COLUMNS}, copy=False)
+
+def iter_training_chunks(stream, content_type, chunk_rows=CHUNK_ROWS, chunk_size=READ_CHUNK_SIZE):
+    """
+    Parse a streamed NDJSON or CSV training file as {column: ndarray} chunks of up to chunk_rows rows
+    Only the chunk being filled is held in memory. The columnar format is column-major,
+    so its rows cannot be read a chunk at a time; use read_training_stream for it.
+    """
+    if content_type in NDJSON_TYPES:
+        rows = iter_ndjson_rows(stream, chunk_size)
+    elif content_type in CSV_TYPES:
+        rows = iter_csv_rows(stream, chunk_size)
+    else:
+        raise TrainingDataError(f"Chunked training data must be NDJSON or CSV, not {content_type}")
+
+    buffers = ColumnBuffers()
+    for values in rows:
+        buffers.append(values)
+        if buffers.n_rows == chunk_rows:
+            yield buffers.to_arrays()
+            buffers = ColumnBuffers()
+    if buffers.n_rows:
+        yield buffers.to_arrays()
@@ -0,0 +1,330 @@
+"""
+Background training jobs for the prediction API
+
+Training runs on a single background thread fed by a bounded queue. Each job trains a
+brand-new DropoutPredictionModel off to the side; the serving model is only replaced,
+by one reference assignment, after the new model has passed validation and been saved
+and warmed up. Requests that are already running keep using the model they started with.
+
+Under gunicorn each worker has its own queue, so a job runs in the worker that received
+it. Given a jobs directory shared by the workers, every job's state is written there as
+job-<id>.json whenever it changes, and any worker answers for any job. The other workers
+pick the saved model up from disk themselves (see api.py). A queued or running job whose
+worker process has exited is marked failed by the first worker that reads it.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+from feature_transform import RAW_FEATURES
+
+# Job states, in the order a successful job moves through them
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# 'full' refits from scratch, 'incremental' appends trees to the saved model
+JOB_MODES = ('full', 'incremental')
+
+# Progress of a running job is written to the jobs directory at most this often
+JOB_SAVE_SECONDS = 1.0
+
+def process_alive(pid):
+    """
+    True if a process with this id is running on this machine (or pid is unknown)
+    """
+    if pid is None:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+    pass
+
+class TrainingJob:
+    """
+    State of one training request, as reported by the status endpoint
+    """
+    def __init__(self, data, mode='full', options=None):
+        self.id = uuid.uuid4().hex
+        self.data = data
+        self.mode = mode
+        self.options = options or {}
+        self.status = QUEUED
+        self.stage = 'queued'
+        self.progress = 0.0
+        self.error = None
+        self.metrics = None
+        self.n_samples = len(data)
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.saved_at = 0.0
+        # The worker process that queued the job and runs it
+        self.pid = os.getpid()
+
+    @classmethod
+    def from_dict(cls, params):
+        """
+        A job as another worker saved it; it carries no training data
+        """
+        job = cls([], params['mode'])
+        job.id = params['job_id']
+        for field in ('status', 'stage', 'progress', 'n_samples', 'metrics', 'error',
+                      'created_at', 'started_at', 'finished_at'):
+            setattr(job, field, params[field])
+        job.pid = params.get('pid')
+        return job
+
+    def update(self, progress, stage):
+        self.progress = float(progress)
+        self.stage = stage
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'mode': self.mode,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': round(self.progress, 3),
+            'n_samples': self.n_samples,
+            'metrics': self.metrics,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+class TrainingJobQueue:
+    """
+    Bounded queue of training jobs processed one at a time by a background thread
+    create_model() returns a fresh, untrained DropoutPredictionModel for each job;
+    on_success(model) is called with the validated model to swap it into service;
+    on_finished(job), if given, is called when a job has succeeded or failed;
+    jobs_dir, if given, is the directory shared with the other workers for job state.
+    """
+    def __init__(self, create_model, on_success, max_queued=4, min_accuracy=0.5, history_size=50,
+                 on_finished=None, jobs_dir=None):
+        self.create_model = create_model
+        self.on_success = on_success
+        self.on_finished = on_finished
+        self.jobs_dir = jobs_dir
+        self.min_accuracy = min_accuracy
+        self.history_size = history_size
+        self.pending = queue.Queue(maxsize=max_queued)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def submit(self, data, mode='full', options=None):
+        """
+        Queue a training job for the given DataFrame and return it
+        mode is 'full' (train_model) or 'incremental' (update_model on the current
+        saved model); options are passed through as keyword arguments.
+        Raises QueueFullError if max_queued jobs are already waiting
+        """
+        if mode not in JOB_MODES:
+            raise ValueError(f"Unknown training mode '{mode}', expected one of {JOB_MODES}")
+        job = TrainingJob(data, mode, options)
+        # Saved before the background thread can pick it up, so the file never goes back to 'queued'
+        self.save_job(job)
+        try:
+            self.pending.put_nowait(job)
+        except queue.Full:
+            self.remove_job(job.id)
+            raise QueueFullError(f'Training queue is full ({self.pending.maxsize} jobs waiting)')
+
+        with self.lock:
+            self.jobs[job.id] = job
+            # Forget the oldest finished jobs once the history is full
+            while len(self.jobs) > self.history_size:
+                oldest_id, oldest = next(iter(self.jobs.items()))
+                if oldest.status in (QUEUED, RUNNING):
+                    break
+                del self.jobs[oldest_id]
+
+            # Started lazily so no thread exists before gunicorn forks its workers
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, name='training-jobs', daemon=True)
+                self.worker.start()
+
+        return job
+
+    def get(self, job_id):
+        """
+        A job of this worker or, from the jobs directory, of another one; None if unknown
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None and self.jobs_dir is not None and job_id.isalnum():
+            job = self.load_job(os.path.join(self.jobs_dir, f'job-{job_id}.json'))
+        return job
+
+    def list(self):
+        """
+        Recent jobs of all workers sharing the jobs directory, oldest first
+        """
+        with self.lock:
+            jobs = dict(self.jobs)
+        for job in self.load_jobs():
+            jobs.setdefault(job.id, job)
+        return sorted(jobs.values(), key=lambda job: job.created_at)[-self.history_size:]
+
+    def save_job(self, job, force=True):
+        """
+        Write the job's state to the jobs directory; progress updates (force=False)
+        are written at most every JOB_SAVE_SECONDS
+        """
+        if self.jobs_dir is None or (not force and time.time() - job.saved_at < JOB_SAVE_SECONDS):
+            return
+        job.saved_at = time.time()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        path = os.path.join(self.jobs_dir, f'job-{job.id}.json')
+        tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(job.to_dict(), pid=job.pid), f)
+        os.replace(tmp_path, path)
+
+    def remove_job(self, job_id):
+        if self.jobs_dir is None:
+            return
+        try:
+            os.remove(os.path.join(self.jobs_dir, f'job-{job_id}.json'))
+        except FileNotFoundError:
+            pass
+
+    def load_job(self, path):
+        """
+        A job saved in the jobs directory, or None if it cannot be read
+        A job left queued or running by a worker that has exited is marked failed.
+        """
+        try:
+            with open(path) as f:
+                job = TrainingJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        if job.status in (QUEUED, RUNNING) and job.pid != os.getpid() and not process_alive(job.pid):
+            job.status = FAILED
+            job.error = f'Worker process {job.pid} exited before the job finished'
+            job.finished_at = time.time()
+            self.save_job(job)
+        return job
+
+    def load_jobs(self):
+        """
+        Jobs saved in the jobs directory, forgetting finished ones beyond history_size
+        """
+        if self.jobs_dir is None or not os.path.isdir(self.jobs_dir):
+            return []
+        jobs = []
+        for name in os.listdir(self.jobs_dir):
+            if name.startswith('job-') and name.endswith('.json'):
+                job = self.load_job(os.path.join(self.jobs_dir, name))
+                if job is not None:
+                    jobs.append(job)
+        jobs.sort(key=lambda job: job.created_at)
+        for job in jobs[:-self.history_size]:
+            if job.status not in (QUEUED, RUNNING):
+                self.remove_job(job.id)
+        return jobs[-self.history_size:]
+
+    def wait(self, job_id, timeout=None):
+        """
+        Block until the job finishes (or timeout seconds pass) and return it
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        job = self.get(job_id)
+        while job is not None and job.status in (QUEUED, RUNNING):
+            if deadline is not None and time.time() > deadline:
+                break
+            time.sleep(0.05)
+            # Jobs of other workers are read again from the jobs directory
+            job = self.get(job_id)
+        return job
+
+    def _run(self):
+        # Run training at a lower CPU priority than request handling where supported
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+
+        while True:
+            job = self.pending.get()
+            try:
+                self._run_job(job)
+            finally:
+                self.pending.task_done()
+
+    def _run_job(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        self.save_job(job)
+        try:
+            new_model = self.create_model()
+
+            # Fitting covers the first 80% of the job's progress
+            def fit_progress(fraction, stage):
+                job.update(0.8 * fraction, stage)
+                self.save_job(job, force=False)
+
+            if job.mode == 'incremental':
+                # Load a private copy of the saved model and grow it, leaving the serving one untouched
+                if not new_model.load_model():
+                    raise ValueError('No trained model to update; run a full training first')
+                new_model.update_model(job.data, save=False, progress=fit_progress, **job.options)
+            else:
+                new_model.train_model(job.data, save=False, progress=fit_progress, **job.options)
+            job.data = None  # release the training frame
+
+            job.update(0.85, 'validating')
+            self.save_job(job)
+            self.validate(new_model)
+            job.metrics = new_model.training_metrics
+
+            job.update(0.9, 'saving')
+            new_model.save_model()
+            new_model.warm_up()
+
+            # Atomic hot-swap: one reference assignment in the caller
+            job.update(0.95, 'swapping')
+            self.on_success(new_model)
+
+            job.update(1.0, 'done')
+            job.status = SUCCEEDED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            job.data = None
+        finally:
+            job.finished_at = time.time()
+            self.save_job(job)
+            if self.on_finished is not None:
+                self.on_finished(job)
+
+    def validate(self, new_model):
+        """
+        Refuse to serve a model that scores badly or produces unusable predictions
+        """
+        accuracy = new_model.training_metrics['accuracy']
+        if accuracy < self.min_accuracy:
+            raise ValueError(f'Validation accuracy {accuracy:.3f} is below the minimum {self.min_accuracy:.3f}')
+
+        if len(new_model.predictor.classes_) != 2:
+            raise ValueError('Training data must contain both dropout and non-dropout students')
+
+        sample = dict(zip(RAW_FEATURES, new_model.transform.medians.tolist()))
+        risk_score = new_model.predict_dropout_risk(sample)['risk_score']
+        if not np.isfinite(risk_score) or not 0.0 <= risk_score <= 1.0:
+            raise ValueError(f'Model produced an invalid risk score: {risk_score}')
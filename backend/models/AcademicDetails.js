@@ -1,4 +1,5 @@
 const mongoose = require('mongoose');
+const StudentFeatures = require('./StudentFeatures');
 
 const AcademicDetailsSchema = new mongoose.Schema({
   academic_id: {
@@ -272,4 +273,7 @@ AcademicDetailsSchema.methods.calculateGradeFromMarks = function() {
   }
 };
 
+// Keep the dropout prediction feature store in step with academic records
+StudentFeatures.trackChanges(AcademicDetailsSchema, 'academicdetails');
+
 module.exports = mongoose.model('AcademicDetails', AcademicDetailsSchema);
\ No newline at end of file
@@ -1,4 +1,5 @@
 const mongoose = require('mongoose');
+const StudentFeatures = require('./StudentFeatures');
 
 const AttendanceSchema = new mongoose.Schema({
   attendance_id: {
@@ -327,4 +328,7 @@ AttendanceSchema.methods.getAttendanceByDateRange = function(startDate, endDate)
   });
 };
 
+// Keep the dropout prediction feature store in step with attendance records
+StudentFeatures.trackChanges(AttendanceSchema, 'attendances');
+
 module.exports = mongoose.model('Attendance', AttendanceSchema);
\ No newline at end of file
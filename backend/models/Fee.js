@@ -1,4 +1,5 @@
 const mongoose = require('mongoose');
+const StudentFeatures = require('./StudentFeatures');
 
 const FeeManagementSchema = new mongoose.Schema({
   fee_id: {
@@ -215,4 +216,7 @@ FeeManagementSchema.methods.addPayment = function(paymentData) {
   return this.save();
 };
 
+// Keep the dropout prediction feature store in step with fee records
+StudentFeatures.trackChanges(FeeManagementSchema, 'feemanagements');
+
 module.exports = mongoose.model('FeeManagement', FeeManagementSchema);
\ No newline at end of file
@@ -0,0 +1,344 @@
+const mongoose = require('mongoose');
+
+// Per-student running sums behind the dropout prediction features.
+// Kept up to date by hooks on AcademicDetails, Attendance and FeeManagement, so reading
+// a student's features is a single indexed lookup instead of re-aggregating their history.
+const StudentFeaturesSchema = new mongoose.Schema({
+  student_id: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'Student',
+    required: [true, 'Student reference is required'],
+    unique: true
+  },
+  // Academic sums (CGPA counts passed subjects only, as calculateOverallCGPA does)
+  grade_points: {
+    type: Number,
+    default: 0
+  },
+  credits: {
+    type: Number,
+    default: 0
+  },
+  backlogs: {
+    type: Number,
+    default: 0
+  },
+  academic_records: {
+    type: Number,
+    default: 0
+  },
+  // Attendance sums across all subjects
+  present_classes: {
+    type: Number,
+    default: 0
+  },
+  total_classes: {
+    type: Number,
+    default: 0
+  },
+  // Fee sums across all semesters
+  fee_total: {
+    type: Number,
+    default: 0
+  },
+  fee_pending: {
+    type: Number,
+    default: 0
+  }
+}, {
+  timestamps: true
+});
+
+StudentFeaturesSchema.index({ updatedAt: 1 });
+
+const SUM_FIELDS = [
+  'grade_points', 'credits', 'backlogs', 'academic_records',
+  'present_classes', 'total_classes', 'fee_total', 'fee_pending'
+];
+
+// Contribution of a single source document to its student's sums
+const CONTRIBUTIONS = {
+  academicdetails: record => {
+    const passed = record.result_status === 'Pass';
+    return {
+      grade_points: passed ? (record.grade_point || 0) * (record.credits_earned || 0) : 0,
+      credits: passed ? (record.credits_earned || 0) : 0,
+      backlogs: record.grade === 'F' ? 1 : 0,
+      academic_records: 1
+    };
+  },
+  attendances: record => ({
+    present_classes: record.present_classes || 0,
+    total_classes: record.total_classes || 0
+  }),
+  feemanagements: record => ({
+    fee_total: record.total_amount || 0,
+    fee_pending: record.pending_amount || 0
+  })
+};
+
+// Server-side equivalents of CONTRIBUTIONS, used to rebuild sums from scratch
+const REBUILD_PIPELINES = {
+  academicdetails: [
+    {
+      $group: {
+        _id: '$student_id',
+        grade_points: { $sum: { $cond: [{ $eq: ['$result_status', 'Pass'] }, { $multiply: ['$grade_point', '$credits_earned'] }, 0] } },
+        credits: { $sum: { $cond: [{ $eq: ['$result_status', 'Pass'] }, '$credits_earned', 0] } },
+        backlogs: { $sum: { $cond: [{ $eq: ['$grade', 'F'] }, 1, 0] } },
+        academic_records: { $sum: 1 }
+      }
+    }
+  ],
+  attendances: [
+    {
+      $group: {
+        _id: '$student_id',
+        present_classes: { $sum: '$present_classes' },
+        total_classes: { $sum: '$total_classes' }
+      }
+    }
+  ],
+  feemanagements: [
+    {
+      $group: {
+        _id: '$student_id',
+        fee_total: { $sum: '$total_amount' },
+        fee_pending: { $sum: '$pending_amount' }
+      }
+    }
+  ]
+};
+
+// Static method to add a (possibly negative) delta to a student's sums
+StudentFeaturesSchema.statics.applyDelta = async function(studentId, delta) {
+  const inc = {};
+  Object.keys(delta).forEach(field => {
+    if (delta[field] !== 0) {
+      inc[field] = delta[field];
+    }
+  });
+  if (Object.keys(inc).length === 0) {
+    return;
+  }
+  // A new entry starts every other sum at 0
+  const setOnInsert = {};
+  SUM_FIELDS.filter(field => !(field in inc)).forEach(field => { setOnInsert[field] = 0; });
+
+  await this.updateOne(
+    { student_id: studentId },
+    { $inc: inc, $setOnInsert: setOnInsert },
+    { upsert: true }
+  );
+};
+
+// Static method to recompute one student's sums from their source records
+StudentFeaturesSchema.statics.rebuildForStudent = async function(studentId) {
+  const id = new mongoose.Types.ObjectId(studentId);
+  const sums = {};
+  SUM_FIELDS.forEach(field => { sums[field] = 0; });
+
+  for (const [collection, pipeline] of Object.entries(REBUILD_PIPELINES)) {
+    const [result] = await mongoose.connection.collection(collection)
+      .aggregate([{ $match: { student_id: id } }, ...pipeline])
+      .toArray();
+    if (result) {
+      const { _id, ...values } = result;
+      Object.assign(sums, values);
+    }
+  }
+
+  return await this.findOneAndUpdate(
+    { student_id: id },
+    { $set: sums },
+    { upsert: true, new: true, lean: true }
+  );
+};
+
+// Static method to recompute the sums of many students at once, with one aggregation
+// per source collection instead of one per student; returns their entries
+StudentFeaturesSchema.statics.rebuildForStudents = async function(studentIds) {
+  const ids = studentIds.map(studentId => new mongoose.Types.ObjectId(studentId));
+  const now = new Date();
+
+  // Start every student at zero sums, so collections without records for them count as 0
+  const zeroSums = Object.fromEntries(SUM_FIELDS.map(field => [field, 0]));
+  await this.bulkWrite(ids.map(id => ({
+    updateOne: { filter: { student_id: id }, update: { $set: zeroSums }, upsert: true }
+  })));
+
+  for (const [collection, pipeline] of Object.entries(REBUILD_PIPELINES)) {
+    await mongoose.connection.collection(collection).aggregate([
+      { $match: { student_id: { $in: ids } } },
+      ...pipeline,
+      { $addFields: { student_id: '$_id', updatedAt: now } },
+      { $project: { _id: 0 } },
+      {
+        $merge: {
+          into: this.collection.name,
+          on: 'student_id',
+          whenMatched: 'merge',
+          whenNotMatched: 'insert'
+        }
+      }
+    ]).toArray();
+  }
+
+  return await this.find({ student_id: { $in: ids } }).lean();
+};
+
+// Static method to rebuild the whole store on the server (backfill or repair)
+StudentFeaturesSchema.statics.rebuildAll = async function() {
+  await this.deleteMany({});
+  const now = new Date();
+
+  for (const [collection, pipeline] of Object.entries(REBUILD_PIPELINES)) {
+    await mongoose.connection.collection(collection).aggregate([
+      ...pipeline,
+      { $addFields: { student_id: '$_id', createdAt: now, updatedAt: now } },
+      { $project: { _id: 0 } },
+      {
+        $merge: {
+          into: this.collection.name,
+          on: 'student_id',
+          whenMatched: 'merge',
+          whenNotMatched: 'insert'
+        }
+      }
+    ]).toArray();
+  }
+
+  // Students merged in from only some collections still need every sum present
+  await this.updateMany({}, [{
+    $set: Object.fromEntries(SUM_FIELDS.map(field => [field, { $ifNull: [`$${field}`, 0] }]))
+  }]);
+
+  return await this.countDocuments();
+};
+
+// Static method to turn stored sums into the features the AI service expects
+// (an empty object gives the features of a student with no records)
+StudentFeaturesSchema.statics.toModelFeatures = function(sums) {
+  return {
+    attendance: sums.total_classes > 0 ? sums.present_classes / sums.total_classes * 100 : 0,
+    cgpa: sums.credits > 0 ? Math.round(sums.grade_points / sums.credits * 100) / 100 : 0,
+    backlogs: sums.backlogs || 0,
+    assignments_submitted: sums.academic_records || 0,
+    pending_fee_ratio: sums.fee_total > 0 ? sums.fee_pending / sums.fee_total : 0
+  };
+};
+
+// Static method to read one student's features, building the entry if it is missing
+StudentFeaturesSchema.statics.getStudentFeatures = async function(studentId) {
+  let sums = await this.findOne({ student_id: studentId }).lean();
+  if (!sums) {
+    sums = await this.rebuildForStudent(studentId);
+  }
+  return this.toModelFeatures(sums);
+};
+
+// Register hooks on a source schema so every change updates the student's sums.
+// `collection` names the source (academicdetails, attendances or feemanagements).
+// Writes through the raw driver (Model.collection) bypass these hooks; repair the store
+// after them with `npm run rebuild-features`.
+StudentFeaturesSchema.statics.trackChanges = function(schema, collection) {
+  const contribution = CONTRIBUTIONS[collection];
+  const StudentFeatures = this;
+
+  const subtract = (after, before) => {
+    const delta = {};
+    Object.keys(after).forEach(field => { delta[field] = after[field] - (before ? before[field] : 0); });
+    return delta;
+  };
+  const negate = values => subtract(Object.fromEntries(Object.keys(values).map(field => [field, 0])), values);
+
+  // Document saves: remember the stored version, then apply the difference
+  schema.pre('save', async function() {
+    this.$locals.previousRecord = this.isNew
+      ? null
+      : await this.constructor.findById(this._id).lean();
+  });
+
+  schema.post('save', async function(doc) {
+    const previous = doc.$locals.previousRecord;
+    if (previous && String(previous.student_id) !== String(doc.student_id)) {
+      await StudentFeatures.applyDelta(previous.student_id, negate(contribution(previous)));
+      await StudentFeatures.applyDelta(doc.student_id, contribution(doc));
+    } else {
+      await StudentFeatures.applyDelta(doc.student_id, subtract(contribution(doc), previous && contribution(previous)));
+    }
+  });
+
+  // insertMany skips save hooks
+  schema.post('insertMany', async function(docs) {
+    for (const doc of docs) {
+      await StudentFeatures.applyDelta(doc.student_id, contribution(doc));
+    }
+  });
+
+  // Document and single-document query deletes: remove the record's contribution
+  schema.post('deleteOne', { document: true, query: false }, async function(doc) {
+    await StudentFeatures.applyDelta(doc.student_id, negate(contribution(doc)));
+  });
+
+  schema.post('findOneAndDelete', async function(doc) {
+    if (doc) {
+      await StudentFeatures.applyDelta(doc.student_id, negate(contribution(doc)));
+    }
+  });
+
+  // Students a filter matches now, plus any student an update or replacement moves records
+  // to; null when the filter matches every record
+  const affectedStudentIds = async (model, filter, update) => {
+    if (!filter || Object.keys(filter).length === 0) {
+      return null;
+    }
+    const studentIds = await model.distinct('student_id', filter);
+    const movedTo = update && (update.$set ? update.$set.student_id : update.student_id);
+    return movedTo ? [...studentIds, movedTo] : studentIds;
+  };
+
+  const rebuildStudents = async studentIds => {
+    if (studentIds === null) {
+      await StudentFeatures.rebuildAll();
+    } else if (studentIds.length > 0) {
+      await StudentFeatures.rebuildForStudents([...new Set(studentIds.map(String))]);
+    }
+  };
+
+  // Query updates, replacements and deletes bypass document hooks: rebuild the affected students
+  const queryOperations = ['updateOne', 'updateMany', 'findOneAndUpdate', 'replaceOne',
+    'findOneAndReplace', 'deleteOne', 'deleteMany'];
+
+  schema.pre(queryOperations, { document: false, query: true }, async function() {
+    this._featureStudentIds = await affectedStudentIds(this.model, this.getFilter(), this.getUpdate());
+  });
+
+  schema.post(queryOperations, { document: false, query: true }, async function() {
+    await rebuildStudents(this._featureStudentIds);
+  });
+
+  // bulkWrite skips every document and query hook, so the model's bulkWrite is wrapped: the
+  // students its operations touch are collected first and rebuilt once it has run
+  schema.static('bulkWrite', async function(ops, options) {
+    let studentIds = [];
+    for (const op of ops) {
+      const [type, args] = Object.entries(op)[0];
+      if (type === 'insertOne') {
+        studentIds.push(args.document.student_id);
+        continue;
+      }
+      const ids = await affectedStudentIds(this, args.filter, args.update || args.replacement);
+      if (ids === null) {
+        studentIds = null;
+        break;
+      }
+      studentIds.push(...ids);
+    }
+    const result = await mongoose.Model.bulkWrite.call(this, ops, options);
+    await rebuildStudents(studentIds);
+    return result;
+  });
+};
+
+module.exports = mongoose.model('StudentFeatures', StudentFeaturesSchema);
@@ -8,6 +8,7 @@ const Attendance = require('./Attendance');
 const Fee = require('./Fee');
 const Notice = require('./Notice');
 const Helpdesk = require('./Helpdesk');
+const StudentFeatures = require('./StudentFeatures');
 
 module.exports = {
   User,
@@ -18,5 +19,6 @@ module.exports = {
   Attendance,
   Fee,
   Notice,
-  Helpdesk
+  Helpdesk,
+  StudentFeatures
 };
\ No newline at end of file
@@ -0,0 +1,32 @@
+#!/usr/bin/env node
+
+const mongoose = require('mongoose');
+const dotenv = require('dotenv');
+const { StudentFeatures } = require('./models');
+
+// Load environment variables
+dotenv.config();
+
+// Rebuild the dropout prediction feature store from the academic, attendance and fee
+// collections. Needed once for databases created before the store existed; after that
+// the model hooks keep it up to date.
+const rebuildFeatures = async () => {
+  try {
+    const conn = await mongoose.connect(process.env.MONGODB_URI || 'mongodb://localhost:27017/erp_system');
+    console.log(`MongoDB Connected: ${conn.connection.host}`);
+    
+    const count = await StudentFeatures.rebuildAll();
+    console.log(`Rebuilt feature store for ${count} students`);
+    process.exit(0);
+  } catch (error) {
+    console.error('Feature store rebuild failed:', error);
+    process.exit(1);
+  }
+};
+
+// Check if script is run directly
+if (require.main === module) {
+  rebuildFeatures();
+}
+
+module.exports = { rebuildFeatures };
@@ -69,9 +69,10 @@ router.post('/train', authorize(['admin']), asyncHandler(async (req, res) => {
   try {
     const result = await dropoutService.trainModel();
     
-    res.json({
+    // Training runs in the background; poll /api/dropout/train/:jobId for progress
+    res.status(202).json({
       success: true,
-      message: 'Model training completed',
+      message: 'Model training started',
       data: result
     });
   } catch (error) {
@@ -84,6 +85,28 @@ router.post('/train', authorize(['admin']), asyncHandler(async (req, res) => {
   }
 }));
 
+// @route   GET /api/dropout/train/:jobId
+// @desc    Get the status of a background training job
+// @access  Private (Admin)
+router.get('/train/:jobId', authorize(['admin']), asyncHandler(async (req, res) => {
+  try {
+    const job = await dropoutService.getTrainingJob(req.params.jobId);
+    
+    res.json({
+      success: true,
+      data: job.data
+    });
+  } catch (error) {
+    console.error('Error getting training job:', error);
+    const status = error.response && error.response.status === 404 ? 404 : 500;
+    res.status(status).json({
+      success: false,
+      message: 'Error getting training job',
+      error: error.message
+    });
+  }
+}));
+
 // @route   GET /api/dropout/feature-importance
 // @desc    Get feature importance from the trained model
 // @access  Private (Faculty/Admin)
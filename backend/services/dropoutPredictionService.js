@@ -1,10 +1,13 @@
 const mongoose = require('mongoose');
 const axios = require('axios');
-const { Student, AcademicDetails, Attendance, Fee } = require('../models');
+const { Student, StudentFeatures } = require('../models');
 
 // AI Service URL (Flask API)
 const AI_SERVICE_URL = 'http://localhost:5001'; // Reverted to original port 5001 to match api.py
 
+// Maximum students per /predict/batch call (matches MAX_BATCH_SIZE in api.py)
+const AI_BATCH_SIZE = 10000;
+
 class DropoutPredictionService {
   /**
    * Fetch student data from MongoDB for training the model
@@ -12,74 +15,54 @@ class DropoutPredictionService {
   async fetchTrainingData() {
     try {
       // Fetch all students
-      const students = await Student.find({}).select('_id');
-      
-      const trainingData = [];
+      const students = await Student.find({}).select('_id').lean();
       
-      // Process each student
-      for (const student of students) {
-        const studentFeatures = await this.extractStudentFeatures(student._id);
-        if (studentFeatures) {
-          trainingData.push(studentFeatures);
-        }
-      }
+      // One read of the feature store for the whole cohort
+      const featureRows = await this.loadStudentFeatures(students.map(student => student._id));
       
-      return trainingData;
+      return featureRows.map(features => ({
+        ...features,
+        dropout: this.calculateDropoutLabel(features.attendance, features.cgpa, features.backlogs, features.pending_fee_ratio)
+      }));
     } catch (error) {
       console.error('Error fetching training data:', error);
       throw error;
     }
   }
 
+  /**
+   * Load features for many students from the feature store with a single query
+   * Students without an entry yet have it built from their records, as getStudentFeatures does
+   */
+  async loadStudentFeatures(studentIds) {
+    const entries = await StudentFeatures.find({ student_id: { $in: studentIds } }).lean();
+    const entriesByStudent = new Map(entries.map(entry => [String(entry.student_id), entry]));
+    
+    const missingIds = studentIds.filter(studentId => !entriesByStudent.has(String(studentId)));
+    if (missingIds.length > 0) {
+      const rebuilt = await StudentFeatures.rebuildForStudents(missingIds);
+      rebuilt.forEach(entry => entriesByStudent.set(String(entry.student_id), entry));
+    }
+    
+    return studentIds.map(studentId =>
+      StudentFeatures.toModelFeatures(entriesByStudent.get(String(studentId)))
+    );
+  }
+
   /**
    * Extract features for a student
+   * Features come from the student's running sums in the feature store (one indexed lookup)
    */
   async extractStudentFeatures(studentId) {
     try {
-      // Get academic details (for CGPA)
-      const academicSummary = await AcademicDetails.getStudentAcademicSummary(studentId);
-      
-      // Calculate overall CGPA
-      const cgpa = await AcademicDetails.calculateOverallCGPA(studentId);
-      
-      // Get attendance data
-      const attendanceSummary = await Attendance.getStudentAttendanceSummary(studentId);
-      
-      // Calculate average attendance percentage
-      let totalAttendance = 0;
-      let attendanceCount = 0;
-      
-      attendanceSummary.forEach(subject => {
-        totalAttendance += subject.attendance_percentage || 0;
-        attendanceCount++;
-      });
-      
-      const avgAttendance = attendanceCount > 0 ? totalAttendance / attendanceCount : 0;
-      
-      // Count backlogs (subjects with grade 'F')
-      const backlogs = await AcademicDetails.countDocuments({
-        student_id: studentId,
-        grade: 'F'
-      });
-      
-      // Count assignments submitted (using academic details as proxy)
-      const assignmentsSubmitted = academicSummary.length;
-      
-      // Get fee data
-      const feeSummary = await Fee.getStudentFeeSummary(studentId);
-      const pendingFeeRatio = feeSummary.totalFees > 0 ? 
-        feeSummary.totalPending / feeSummary.totalFees : 0;
+      const features = await StudentFeatures.getStudentFeatures(studentId);
       
       // For now, we'll use a simple heuristic for dropout (this would be actual data in a real system)
       // In a real implementation, you would have actual dropout data
-      const dropout = this.calculateDropoutLabel(avgAttendance, cgpa, backlogs, pendingFeeRatio);
+      const dropout = this.calculateDropoutLabel(features.attendance, features.cgpa, features.backlogs, features.pending_fee_ratio);
       
       return {
-        attendance: avgAttendance,
-        cgpa: cgpa,
-        backlogs: backlogs,
-        assignments_submitted: assignmentsSubmitted,
-        pending_fee_ratio: pendingFeeRatio,
+        ...features,
         dropout: dropout
       };
     } catch (error) {
@@ -111,6 +94,8 @@ class DropoutPredictionService {
 
   /**
    * Train the AI model with current data
+   * Training runs as a background job in the AI service; the returned job can be
+   * polled with getTrainingJob until it succeeds or fails
    */
   async trainModel() {
     try {
@@ -130,6 +115,20 @@ class DropoutPredictionService {
     }
   }
 
+  /**
+   * Get the status and progress of a background training job
+   * Any AI service worker can answer: job state is shared between them (see training_jobs.py)
+   */
+  async getTrainingJob(jobId) {
+    try {
+      const response = await axios.get(`${AI_SERVICE_URL}/train/jobs/${encodeURIComponent(jobId)}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error getting training job:', error);
+      throw error;
+    }
+  }
+
   /**
    * Predict dropout risk for a specific student
    */
@@ -168,38 +167,110 @@ class DropoutPredictionService {
     }
   }
 
+  /**
+   * Predict dropout risk for many feature rows with a single AI service call
+   * Returns one result per row, each with either `data` or `error`
+   */
+  async predictBatchRisk(featureRows) {
+    try {
+      const results = [];
+      
+      // Stay under the AI service's per-request batch limit
+      for (let start = 0; start < featureRows.length; start += AI_BATCH_SIZE) {
+        const chunk = featureRows.slice(start, start + AI_BATCH_SIZE);
+        const response = await axios.post(`${AI_SERVICE_URL}/predict/batch`, { students: chunk });
+        results.push(...response.data.data);
+      }
+      
+      return results;
+    } catch (error) {
+      console.error('Error predicting batch risk:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Get at-risk students from the AI service's precomputed score table
+   * Returns null when there is no fresh table (the AI service answers 503)
+   */
+  async getPrecomputedAtRisk() {
+    try {
+      const response = await axios.get(`${AI_SERVICE_URL}/at-risk`);
+      const scores = response.data.data;
+      
+      // Attach the student details the dashboard shows
+      const students = await Student.find({ _id: { $in: scores.map(score => score.student_id) } })
+        .select('_id name roll_no email')
+        .lean();
+      const studentsById = new Map(students.map(student => [String(student._id), student]));
+      
+      return scores
+        .filter(score => studentsById.has(score.student_id))
+        .map(score => {
+          const student = studentsById.get(score.student_id);
+          return {
+            student_id: student._id,
+            name: student.name,
+            roll_no: student.roll_no,
+            email: student.email,
+            risk_score: score.risk_score,
+            risk_level: score.risk_level,
+            top_reasons: score.top_reasons
+          };
+        });
+    } catch (error) {
+      if (error.response && error.response.status === 503) {
+        console.warn('No fresh risk score table:', error.response.data.error);
+        return null;
+      }
+      throw error;
+    }
+  }
+
   /**
    * Get at-risk students for faculty dashboard
+   * Served from the precomputed score table when it is fresh, otherwise every
+   * student is scored on demand
    */
   async getAtRiskStudents(facultyId = null) {
     try {
+      const precomputed = await this.getPrecomputedAtRisk();
+      if (precomputed) {
+        return precomputed;
+      }
+      
       // Fetch all students
       const students = await Student.find({}).select('_id name roll_no email');
       
+      // Read every student's features from the feature store in one query
+      const featureRows = await this.loadStudentFeatures(students.map(student => student._id));
+      
+      // Score the whole cohort in one round trip instead of one request per student
+      const predictions = featureRows.length > 0 ? await this.predictBatchRisk(featureRows) : [];
+      
       const atRiskStudents = [];
       
-      // Predict risk for each student
-      for (const student of students) {
-        try {
-          const prediction = await this.predictStudentRisk(student._id);
-          
-          // Only include students with medium or high risk
-          if (prediction.data.risk_level !== 'Low') {
-            atRiskStudents.push({
-              student_id: student._id,
-              name: student.name,
-              roll_no: student.roll_no,
-              email: student.email,
-              risk_score: prediction.data.risk_score,
-              risk_level: prediction.data.risk_level,
-              top_reasons: prediction.data.top_reasons
-            });
-          }
-        } catch (error) {
-          console.error(`Error predicting risk for student ${student._id}:`, error);
-          // Continue with other students
+      predictions.forEach((prediction, index) => {
+        const student = students[index];
+        
+        if (!prediction.success) {
+          console.error(`Error predicting risk for student ${student._id}:`, prediction.error);
+          return;
         }
-      }
+        
+        // Only include students with medium or high risk
+        if (prediction.data.risk_level !== 'Low') {
+          atRiskStudents.push({
+            student_id: student._id,
+            name: student.name,
+            roll_no: student.roll_no,
+            email: student.email,
+            risk_score: prediction.data.risk_score,
+            risk_level: prediction.data.risk_level,
+            top_reasons: prediction.data.top_reasons
+          });
+        }
+      });
       
       // Sort by risk score (highest first)
       atRiskStudents.sort((a, b) => b.risk_score - a.risk_score);
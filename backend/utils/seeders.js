@@ -1,5 +1,5 @@
 const mongoose = require('mongoose');
-const { User, Student, Faculty, Subject, AcademicDetails, Attendance, Fee, Notice, Helpdesk } = require('../models');
+const { User, Student, Faculty, Subject, AcademicDetails, Attendance, Fee, Notice, Helpdesk, StudentFeatures } = require('../models');
 
 // Comprehensive fake data - 12 Faculty + 30 Students + 2 Admins
 const sampleUsers = [
@@ -78,6 +78,7 @@ const seedDatabase = async () => {
     await Fee.deleteMany({});
     await Notice.deleteMany({});
     await Helpdesk.deleteMany({});
+    await StudentFeatures.deleteMany({});
 
     // Create users
     const users = await User.create(sampleUsers);